@@ -0,0 +1,97 @@
+"""Per-request cost of the API-key and JWT checks.
+
+    python benchmarks/bench_auth.py --requests 5000
+
+Times a trivial route through the Flask test client with no auth, with
+the API key only, and with API key + role check with and without the
+verified-claims cache. Overhead is reported relative to the bare route.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from catalog.api.api import create_app
+from catalog.api.auth import require_api_key, requires_role
+from catalog.api.extensions import limiter
+
+API_KEY = "bench-key"
+
+
+def _make_client(tmp: Path, cache_size: int):
+    app = create_app(
+        {
+            "CATALOG_PATH": str(tmp / "movies.json"),
+            "API_KEY": API_KEY,
+            "JWT_SECRET_KEY": "bench-jwt-secret-with-enough-bytes",
+            "JWT_CLAIMS_CACHE_SIZE": cache_size,
+            "START_BACKGROUND_TASKS": False,
+        }
+    )
+
+    @app.route("/bench/none")
+    def bare():
+        return "ok"
+
+    @app.route("/bench/key")
+    @require_api_key
+    def key_only():
+        return "ok"
+
+    @app.route("/bench/role")
+    @require_api_key
+    @requires_role("admin")
+    def key_and_role():
+        return "ok"
+
+    client = app.test_client()
+    token = client.post(
+        "/auth/login", json={"username": "admin", "password": "password123"}
+    ).get_json()["access_token"]
+    headers = {"X-API-Key": API_KEY, "Authorization": f"Bearer {token}"}
+    return client, headers
+
+
+def _per_request_us(client, path: str, headers: dict, requests: int) -> float:
+    for _ in range(min(requests, 200)):
+        client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        resp = client.get(path, headers=headers)
+        assert resp.status_code == 200, resp.status_code
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    limiter.enabled = False
+    with tempfile.TemporaryDirectory() as tmp:
+        uncached, headers = _make_client(Path(tmp), cache_size=0)
+        cached, cached_headers = _make_client(Path(tmp), cache_size=1024)
+
+        runs = {
+            "none": _per_request_us(uncached, "/bench/none", headers, args.requests),
+            "api_key": _per_request_us(uncached, "/bench/key", headers, args.requests),
+            "api_key+jwt": _per_request_us(
+                uncached, "/bench/role", headers, args.requests
+            ),
+            "api_key+jwt_cached": _per_request_us(
+                cached, "/bench/role", cached_headers, args.requests
+            ),
+        }
+
+    base = runs["none"]
+    report = {
+        name: {"us_per_request": round(us, 1), "overhead_us": round(us - base, 1)}
+        for name, us in runs.items()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Enrichment throughput and tail latency against the local fake OMDb.
+
+    python benchmarks/bench_enrich.py --sizes 1000,10000,100000 \
+        --latency lognormal:-4,0.6 --concurrency 50 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+import aiohttp
+from fake_omdb import FakeOmdbConfig, running_fake_omdb
+
+from catalog import metadata
+from catalog.resilience import RetryPolicy
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _latency_trace(samples: list[float]) -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+
+    async def on_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        samples.append(time.perf_counter() - ctx.started)
+
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    return trace
+
+
+async def run_size(size: int, args: argparse.Namespace) -> dict:
+    config = FakeOmdbConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        seed=size,
+    )
+    policy = RetryPolicy(attempts=args.attempts, deadline=args.deadline)
+    ids = [f"tt{i:07d}" for i in range(size)]
+    samples: list[float] = []
+    metadata.omdb_breaker.reset()
+
+    async with running_fake_omdb(config) as (base_url, stats):
+        os.environ["OMDB_BASE_URL"] = base_url
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        async with aiohttp.ClientSession(
+            connector=connector, trace_configs=[_latency_trace(samples)]
+        ) as session:
+            started = time.perf_counter()
+            results = await metadata._enrich_all(
+                ids, args.concurrency, policy=policy, session=session
+            )
+            elapsed = time.perf_counter() - started
+
+    failed = sum(1 for r in results.values() if "error" in r)
+    return {
+        "size": size,
+        "seconds": round(elapsed, 3),
+        "movies_per_second": round(size / elapsed, 1),
+        "failed": failed,
+        "http_requests": stats["requests"],
+        "latency_ms": {
+            f"p{p}": round(percentile(samples, p) * 1000, 2) for p in (50, 90, 99)
+        }
+        | {"max": round(max(samples, default=math.nan) * 1000, 2)},
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", default="lognormal:-4.5,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--deadline", type=float, default=None)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = asyncio.run(run_size(size, args))
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+
+    report = {"benchmark": "enrich", "params": vars(args), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Payload size and encode time of a full movie listing, per format.
+
+    python benchmarks/bench_formats.py --movies 10000 --repeat 5
+
+JSON is encoded the way jsonify does it (compact separators); MessagePack
+and CBOR go through the streaming encoder the API uses.
+"""
+
+import argparse
+import json
+import random
+import time
+from dataclasses import asdict
+
+from catalog.api.formats import BINARY_FORMATS, encode_stream
+from catalog.models import Movie
+
+GENRES = ["drama", "comedy", "action", "horror", "sci-fi", "crime", "romance"]
+
+
+def make_movies(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        asdict(
+            Movie(
+                id=i,
+                title=f"Movie {i}",
+                year=rng.randint(1950, 2020),
+                genres=rng.sample(GENRES, rng.randint(1, 3)),
+                rating=round(rng.uniform(1, 10), 1),
+                tags=[f"tag{rng.randint(0, 50)}" for _ in range(rng.randint(0, 4))],
+                imdb_id=f"tt{rng.randint(0, 9_999_999):07d}",
+                poster=f"https://img.example.invalid/{i}.jpg",
+                plot="Synthetic plot. " * rng.randint(1, 5),
+                runtime=rng.randint(70, 180),
+            )
+        )
+        for i in range(count)
+    ]
+
+
+def _time(encode, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(encode())
+        best = min(best, time.perf_counter() - started)
+    return best, size
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    payload = {"movies": make_movies(args.movies)}
+    encoders = {
+        "json": lambda: json.dumps(payload, separators=(",", ":")).encode(),
+        **{
+            fmt.name: (lambda fmt=fmt: b"".join(encode_stream(fmt, payload)))
+            for fmt in BINARY_FORMATS.values()
+        },
+    }
+    if len(encoders) == 1:
+        print("msgpack/cbor2 not installed: pip install 'movie-catalog[binary]'")
+
+    results = {name: _time(encode, args.repeat) for name, encode in encoders.items()}
+    json_seconds, json_size = results["json"]
+    report = {
+        name: {
+            "bytes": size,
+            "size_vs_json": round(size / json_size, 3),
+            "encode_ms": round(seconds * 1000, 2),
+            "time_vs_json": round(seconds / json_seconds, 3),
+        }
+        for name, (seconds, size) in results.items()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
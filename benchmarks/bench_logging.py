@@ -0,0 +1,118 @@
+"""Request throughput with DEBUG logging, inline file handler vs queue.
+
+    python benchmarks/bench_logging.py --requests 3000 --threads 4 --lines 20
+
+"sync" reproduces the old setup (StreamHandler + RotatingFileHandler on the
+root logger, written by the request thread); "queue" is configure_logging().
+Each request logs --lines DEBUG records and one INFO record, like a
+request that touches the io and enrichment code paths.
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from catalog.api.api import create_app
+from catalog.api.extensions import limiter
+from catalog.logging_config import configure_logging, shutdown_logging
+
+log = logging.getLogger("catalog.bench")
+
+
+def _sync_logging(log_file: Path) -> list[logging.Handler]:
+    shutdown_logging()
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    console.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)-8s [%(name)s] %(message)s")
+    )
+    file = RotatingFileHandler(
+        log_file, maxBytes=5_000_000, backupCount=3, encoding="utf-8"
+    )
+    file.setLevel(logging.DEBUG)
+    file.setFormatter(
+        logging.Formatter(
+            "%(asctime)s %(levelname)-8s [%(name)s:%(lineno)d] %(message)s"
+        )
+    )
+    for handler in (console, file):
+        root.addHandler(handler)
+    return [console, file]
+
+
+def _make_app(tmp: Path, lines: int):
+    app = create_app(
+        {
+            "CATALOG_PATH": str(tmp / "movies.json"),
+            "LOG_FILE": str(tmp / "queue.log"),
+            "START_BACKGROUND_TASKS": False,
+        }
+    )
+
+    @app.route("/bench/log")
+    def chatty():
+        for i in range(lines):
+            log.debug("step %d of %d for %s", i, lines, "movies.json")
+        log.info("request done")
+        return "ok"
+
+    return app
+
+
+def _throughput(app, requests: int, threads: int) -> float:
+    def worker(count: int) -> None:
+        client = app.test_client()
+        for _ in range(count):
+            assert client.get("/bench/log").status_code == 200
+
+    worker(min(requests, 100))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, [requests // threads] * threads))
+    return (requests // threads * threads) / (time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--lines", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    limiter.enabled = False
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        app = _make_app(tmp, args.lines)
+
+        handlers = _sync_logging(tmp / "sync.log")
+        report["sync"] = _throughput(app, args.requests, args.threads)
+        root = logging.getLogger()
+        for handler in handlers:
+            root.removeHandler(handler)
+            handler.close()
+
+        configure_logging(str(tmp / "queue.log"))
+        report["queue"] = _throughput(app, args.requests, args.threads)
+        shutdown_logging()
+
+    print(
+        json.dumps(
+            {
+                **{f"{k}_requests_per_s": round(v) for k, v in report.items()},
+                "speedup": round(report["queue"] / report["sync"], 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
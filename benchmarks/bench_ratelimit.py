@@ -0,0 +1,79 @@
+"""Per-request cost of rate limit accounting, per storage and strategy.
+
+    python benchmarks/bench_ratelimit.py --hits 20000 --processes 1,4
+
+Every process hits its own keys as fast as it can through the same
+storage; with several processes the SQLite numbers include lock waits.
+"""
+
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import STRATEGIES
+
+import catalog.ratelimit_storage  # noqa: F401
+
+LIMIT = parse("1000000/minute")
+
+
+def _run(uri: str, strategy: str, hits: int, worker: int, results) -> None:
+    rate_limiter = STRATEGIES[strategy](storage_from_string(uri))
+    keys = [f"client-{worker}-{i % 100}" for i in range(hits)]
+    started = time.perf_counter()
+    for key in keys:
+        rate_limiter.hit(LIMIT, key)
+    results.put((time.perf_counter() - started) / hits * 1e6)
+
+
+def measure(uri: str, strategy: str, hits: int, processes: int) -> float:
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_run, args=(uri, strategy, hits, n, results))
+        for n in range(processes)
+    ]
+    for w in workers:
+        w.start()
+    per_hit = [results.get() for _ in workers]
+    for w in workers:
+        w.join()
+    return sum(per_hit) / len(per_hit)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--processes", default="1,4")
+    parser.add_argument(
+        "--strategies", default="fixed-window,moving-window,sliding-window-counter"
+    )
+    args = parser.parse_args(argv)
+
+    report = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in [int(p) for p in args.processes.split(",")]:
+            for strategy in args.strategies.split(","):
+                for name, uri in (
+                    ("memory", "memory://"),
+                    ("sqlite", f"sqlite:///{Path(tmp) / f'{strategy}.db'}"),
+                ):
+                    us = measure(uri, strategy, args.hits, processes)
+                    report.append(
+                        {
+                            "storage": name,
+                            "strategy": strategy,
+                            "processes": processes,
+                            "us_per_hit": round(us, 1),
+                        }
+                    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Read throughput of the production server as the worker count grows.
+
+    python benchmarks/bench_server.py --workers 1,2,4 --movies 5000 \
+        --duration 10 --connections 64
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+API_KEY = "bench-key"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_catalog(path: Path, size: int) -> None:
+    movies = [
+        {"id": i, "title": f"Movie {i}", "year": 1950 + i % 70, "rating": i % 10}
+        for i in range(1, size + 1)
+    ]
+    path.write_text(json.dumps(movies), encoding="utf-8")
+
+
+async def _wait_ready(session: aiohttp.ClientSession, url: str, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.post(
+                f"{url}/auth/login",
+                json={"username": "admin", "password": "password123"},
+            ) as resp:
+                if resp.status == 200:
+                    return (await resp.json())["access_token"]
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+async def load(url: str, args: argparse.Namespace) -> dict:
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = await _wait_ready(session, url)
+        headers = {"X-API-Key": API_KEY, "Authorization": f"Bearer {token}"}
+        samples: list[float] = []
+        errors = 0
+        stop_at = time.monotonic() + args.duration
+
+        async def client(n: int) -> None:
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                movie_id = (n * 7919 + len(samples)) % args.movies + 1
+                path = args.path.format(id=movie_id)
+                started = time.perf_counter()
+                async with session.get(f"{url}{path}", headers=headers) as resp:
+                    await resp.read()
+                    if resp.status != 200:
+                        errors += 1
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(args.connections)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "requests_per_second": round(len(samples) / elapsed, 1),
+        "latency_ms": {
+            f"p{p}": round(percentile(samples, p) * 1000, 2) for p in (50, 90, 99)
+        },
+    }
+
+
+def run_workers(workers: int, args: argparse.Namespace, catalog: Path) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "CATALOG_PATH": str(catalog),
+        "API_KEY": API_KEY,
+        "RATELIMIT_DEFAULT": "1000000 per minute",
+    }
+    cmd = [
+        sys.executable,
+        "-m",
+        "catalog.main_api",
+        "--no-tls",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--threads",
+        str(args.threads),
+    ]
+    server = subprocess.Popen(
+        cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        result = asyncio.run(load(f"http://127.0.0.1:{port}", args))
+    finally:
+        server.terminate()
+        server.wait(timeout=args.duration + 30)
+    return {"workers": workers, "threads": args.threads, **result}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument(
+        "--path", default="/movies/{id}", help="request path, {id} is filled in"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = Path(tmp) / "movies.json"
+        write_catalog(catalog, args.movies)
+        for workers in (int(w) for w in args.workers.split(",")):
+            result = run_workers(workers, args, catalog)
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+
+    report = {"benchmark": "server", "params": vars(args), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Per-worker memory with private, forked and snapshot-backed catalogs.
+
+    python benchmarks/bench_worker_memory.py --movies 100000 --workers 4
+
+Each worker serves one full listing and a batch of lookups, then reports
+its RSS and PSS (proportional set size: shared pages are split between
+the processes sharing them, so PSS adds up to real memory use). Linux only.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+from catalog.services import load_catalog
+from catalog.snapshot import load_packed_catalog
+
+MODES = ("private", "fork", "snapshot")
+
+
+def _memory_kb() -> dict:
+    usage = {}
+    with open("/proc/self/status", encoding="ascii") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                usage["rss"] = int(line.split()[1])
+    with open("/proc/self/smaps_rollup", encoding="ascii") as fh:
+        for line in fh:
+            if line.startswith("Pss:"):
+                usage["pss"] = int(line.split()[1])
+    return usage
+
+
+def _serve(catalog, movies: int) -> None:
+    listing = [asdict(m) for m in catalog]
+    del listing
+    rng = random.Random(os.getpid())
+    for _ in range(1000):
+        catalog.find_by_id(rng.randint(1, movies))
+    gc.collect()
+
+
+def run_mode(mode: str, path: Path, args: argparse.Namespace) -> dict:
+    catalog = None
+    if mode == "fork":
+        catalog = load_catalog(str(path))
+    elif mode == "snapshot":
+        catalog = load_packed_catalog(path)
+
+    pipes = []
+    for _ in range(args.workers):
+        read_fd, write_fd = os.pipe()
+        if os.fork() == 0:
+            os.close(read_fd)
+            own = catalog if catalog is not None else load_catalog(str(path))
+            _serve(own, args.movies)
+            os.write(write_fd, json.dumps(_memory_kb()).encode())
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append(read_fd)
+
+    workers = []
+    for fd in pipes:
+        with os.fdopen(fd, "rb") as fh:
+            workers.append(json.loads(fh.read()))
+    for _ in pipes:
+        os.wait()
+
+    return {
+        "mode": mode,
+        "workers": args.workers,
+        "avg_rss_mb": round(sum(w["rss"] for w in workers) / len(workers) / 1024, 1),
+        "total_pss_mb": round(sum(w["pss"] for w in workers) / 1024, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "movies.json"
+        movies = [
+            {
+                "id": i,
+                "title": f"Movie {i}",
+                "year": 1950 + i % 70,
+                "genres": ["drama", "thriller"],
+                "plot": f"Synthetic plot for movie {i}. " * 4,
+            }
+            for i in range(1, args.movies + 1)
+        ]
+        path.write_text(json.dumps(movies), encoding="utf-8")
+        del movies
+        # publish the snapshot up front, as a running primary would have
+        if os.fork() == 0:
+            load_packed_catalog(path)
+            os._exit(0)
+        os.wait()
+
+        for mode in args.modes.split(","):
+            # each mode runs in its own child so earlier modes don't skew it
+            read_fd, write_fd = os.pipe()
+            if os.fork() == 0:
+                os.close(read_fd)
+                os.write(write_fd, json.dumps(run_mode(mode, path, args)).encode())
+                os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd, "rb") as fh:
+                result = json.loads(fh.read())
+            os.wait()
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+
+    report = {"benchmark": "worker_memory", "params": vars(args), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Local stand-in for the OMDb API, for benchmarks and offline tests.
+
+Serves deterministic synthetic records for ``?i=<imdb id>`` and
+``?t=<title>`` lookups, with configurable latency, error and throttling
+behaviour. Point the enrichment code at it with ``OMDB_BASE_URL``::
+
+    python benchmarks/fake_omdb.py --port 8765 --latency lognormal:-3,0.5
+    OMDB_BASE_URL=http://127.0.0.1:8765 ...
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import zlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    kind, _, raw_args = spec.partition(":")
+    args = [float(a) for a in raw_args.split(",") if a]
+    if kind == "none":
+        return lambda rng: 0.0
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "exponential" and len(args) == 1:
+        return lambda rng: rng.expovariate(1 / args[0])
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: rng.lognormvariate(args[0], args[1])
+    raise ValueError(
+        f"Bad latency spec {spec!r}, expected none, fixed:S, uniform:LO,HI, "
+        "exponential:MEAN or lognormal:MU,SIGMA"
+    )
+
+
+@dataclass
+class FakeOmdbConfig:
+    latency: str = "none"
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    max_rps: float | None = None
+    seed: int = 0
+    rng: random.Random = field(init=False, repr=False)
+    sample_latency: Callable[[random.Random], float] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+        self.sample_latency = parse_latency(self.latency)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+CONFIG_KEY = web.AppKey("config", FakeOmdbConfig)
+STATS_KEY = web.AppKey("stats", dict)
+BUCKET_KEY = web.AppKey("bucket", _TokenBucket)
+TITLES_KEY = web.AppKey("titles", dict)
+
+
+def _imdb_id_for_title(title: str) -> str:
+    return f"tt{zlib.crc32(title.lower().encode()) % 10_000_000:07d}"
+
+
+def synthetic_record(imdb_id: str, title: str | None = None) -> dict:
+    n = zlib.crc32(imdb_id.encode())
+    return {
+        "Title": title or f"Synthetic Movie {n % 100_000}",
+        "Year": str(1950 + n % 75),
+        "Runtime": f"{70 + n % 110} min",
+        "Plot": f"Synthetic plot for {imdb_id}.",
+        "Poster": f"https://img.example.invalid/{imdb_id}.jpg",
+        "imdbID": imdb_id,
+        "Response": "True",
+    }
+
+
+async def handle_lookup(request: web.Request) -> web.Response:
+    config = request.app[CONFIG_KEY]
+    stats = request.app[STATS_KEY]
+    bucket = request.app.get(BUCKET_KEY)
+    stats["requests"] += 1
+
+    delay = config.sample_latency(config.rng)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    if (bucket and not bucket.take()) or config.rng.random() < config.throttle_rate:
+        stats["throttled"] += 1
+        return web.json_response(
+            {"Response": "False", "Error": "Request limit reached!"},
+            status=429,
+            headers={"Retry-After": "1"},
+        )
+    if config.rng.random() < config.error_rate:
+        stats["errors"] += 1
+        return web.json_response({"Response": "False", "Error": "boom"}, status=500)
+
+    imdb_id = request.query.get("i")
+    title = request.query.get("t")
+    titles = request.app[TITLES_KEY]
+    if imdb_id:
+        return web.json_response(synthetic_record(imdb_id, titles.get(imdb_id)))
+    if title:
+        # remember the title so a follow-up ?i= lookup is consistent with it
+        imdb_id = _imdb_id_for_title(title)
+        titles.setdefault(imdb_id, title)
+        return web.json_response(synthetic_record(imdb_id, title))
+    return web.json_response(
+        {"Response": "False", "Error": "Incorrect IMDb ID."}, status=400
+    )
+
+
+def create_app(config: FakeOmdbConfig | None = None) -> web.Application:
+    config = config or FakeOmdbConfig()
+    app = web.Application()
+    app[CONFIG_KEY] = config
+    app[STATS_KEY] = {"requests": 0, "errors": 0, "throttled": 0}
+    app[TITLES_KEY] = {}
+    if config.max_rps:
+        app[BUCKET_KEY] = _TokenBucket(config.max_rps)
+    app.router.add_get("/", handle_lookup)
+    return app
+
+
+@asynccontextmanager
+async def running_fake_omdb(
+    config: FakeOmdbConfig | None = None, host: str = "127.0.0.1", port: int = 0
+) -> AsyncIterator[tuple[str, dict]]:
+    app = create_app(config)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    try:
+        yield f"http://{host}:{bound_port}", app[STATS_KEY]
+    finally:
+        await runner.cleanup()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="none")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = FakeOmdbConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Benchmark suite for the catalog model, io_utils and utils.
+
+    python benchmarks/suite.py run --out results.json
+    python benchmarks/suite.py run --sizes 1k,100k,1m --only io.import_json
+    python benchmarks/suite.py compare baseline.json results.json
+
+Every case runs against a synthetic catalog (benchmarks/synthetic.py) of
+each size; setup is not timed. 1k and 100k run by default (about two
+minutes); 1m takes a quarter of an hour and a few GB, so it is opt-in.
+
+``run`` writes the timings as JSON, ``compare`` lines two such files up by
+case and size and exits with 1 when any case got slower than
+``--threshold`` (default 10%) over the baseline.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from itertools import islice
+from pathlib import Path
+from typing import Callable
+
+from synthetic import SyntheticSpec, generate_catalog
+
+from catalog import io_utils, utils
+from catalog.models import Catalog
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+# repeats per size unless --repeat is given; big sizes are slow but steady
+REPEATS = {1_000: 20, 100_000: 5, 1_000_000: 3}
+
+# a case gets the catalog and a scratch dir, and returns (fn, ops): fn is
+# timed, ops is how many operations one call of fn performs
+Case = Callable[[Catalog, Path], tuple[Callable[[], object], int]]
+CASES: dict[str, Case] = {}
+
+
+def case(name: str):
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+
+    return register
+
+
+def _scan_ops(size: int) -> int:
+    # linear scans: enough lookups to time, without minutes at 1M
+    return min(1000, max(10, 10_000_000 // size))
+
+
+@case("catalog.from_json")
+def _from_json(catalog, tmp):
+    data = [asdict(m) for m in catalog]
+    # from_json normalises the dicts in place; doing it again is a no-op,
+    # so every repeat does the same work
+    return (lambda: Catalog.from_json(data)), len(data)
+
+
+@case("catalog.find_by_id")
+def _find_by_id(catalog, tmp):
+    rng = random.Random(1)
+    ids = [rng.randint(1, len(catalog)) for _ in range(_scan_ops(len(catalog)))]
+    return (lambda: [catalog.find_by_id(i) for i in ids]), len(ids)
+
+
+@case("catalog.find_by_title")
+def _find_by_title(catalog, tmp):
+    rng = random.Random(2)
+    titles = [
+        catalog.movies[rng.randrange(len(catalog))].title.split()[-1]
+        for _ in range(max(1, _scan_ops(len(catalog)) // 10))
+    ]
+    return (lambda: [catalog.find_by_title(t) for t in titles]), len(titles)
+
+
+@case("io.export_json")
+def _export_json(catalog, tmp):
+    out = tmp / "out.json"
+    return (lambda: io_utils.export_catalog_to_json(catalog, out)), len(catalog)
+
+
+@case("io.import_json")
+def _import_json(catalog, tmp):
+    path = io_utils.export_catalog_to_json(catalog, tmp / "in.json")
+    return (lambda: io_utils.import_catalog_from_json(path)), len(catalog)
+
+
+@case("io.export_csv")
+def _export_csv(catalog, tmp):
+    out = tmp / "out.csv"
+    return (lambda: io_utils.export_catalog_to_csv(catalog, out)), len(catalog)
+
+
+@case("io.import_csv")
+def _import_csv(catalog, tmp):
+    path = io_utils.export_catalog_to_csv(catalog, tmp / "in.csv")
+    return (lambda: io_utils.import_catalog_from_csv(path)), len(catalog)
+
+
+@case("utils.genre_to_movies_map")
+def _genre_map(catalog, tmp):
+    return (lambda: utils.genre_to_movies_map(catalog)), len(catalog)
+
+
+@case("utils.count_tags")
+def _count_tags(catalog, tmp):
+    return (lambda: utils.count_tags(catalog)), len(catalog)
+
+
+@case("utils.movie_pairs")
+def _movie_pairs(catalog, tmp):
+    # the full product is quadratic: time the first pairs only
+    pairs = 100_000
+    return (lambda: sum(1 for _ in islice(utils.movie_pairs(catalog), pairs))), pairs
+
+
+@case("utils.retry")
+def _retry(catalog, tmp):
+    calls = 10_000
+    wrapped = utils.retry(3)(len)
+    return (lambda: [wrapped(catalog.movies) for _ in range(calls)]), calls
+
+
+@case("utils.timed")
+def _timed(catalog, tmp):
+    calls = 10_000
+    wrapped = utils.timed(len)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(calls):
+                wrapped(catalog.movies)
+
+    return run, calls
+
+
+@case("utils.temporary_env")
+def _temporary_env(catalog, tmp):
+    calls = 10_000
+
+    def run():
+        for _ in range(calls):
+            with utils.temporary_env("CATALOG_BENCH", "1"):
+                pass
+
+    return run, calls
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> int:
+    selected = [name for name in CASES if not args.only or name in args.only]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        for label in args.sizes:
+            size = SIZES[label]
+            spec = SyntheticSpec(size=size, seed=args.seed)
+            catalog = generate_catalog(spec)
+            repeat = args.repeat or REPEATS[size]
+            for name in selected:
+                fn, ops = CASES[name](catalog, tmp)
+                if size < 1_000_000:
+                    fn()  # warm up caches and the file system
+                times = _measure(fn, repeat)
+                median = statistics.median(times)
+                results.append(
+                    {
+                        "name": name,
+                        "size": size,
+                        "ops": ops,
+                        "repeat": repeat,
+                        "min": min(times),
+                        "median": median,
+                        "mean": statistics.fmean(times),
+                        "per_op_us": median / ops * 1e6,
+                    }
+                )
+                print(
+                    f"{name:28} {label:>5} median {median * 1e3:10.2f} ms"
+                    f"  ({median / ops * 1e6:.3f} us/op)",
+                    file=sys.stderr,
+                )
+            del catalog
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    def load(path: Path) -> dict:
+        report = json.loads(path.read_text(encoding="utf-8"))
+        return {(r["name"], r["size"]): r for r in report["results"]}
+
+    baseline, current = load(args.baseline), load(args.current)
+    regressions = 0
+    print(f"{'case':28} {'size':>8} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key in sorted(baseline.keys() & current.keys()):
+        # per op, so a case whose op count changed still compares
+        before = baseline[key][args.metric] / baseline[key]["ops"]
+        after = current[key][args.metric] / current[key]["ops"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(
+            f"{key[0]:28} {key[1]:>8} {before * 1e6:10.3f}us {after * 1e6:10.3f}us"
+            f" {change:+8.1%}{flag}"
+        )
+    for key in sorted(baseline.keys() ^ current.keys()):
+        side = "baseline" if key in baseline else "current"
+        print(f"{key[0]:28} {key[1]:>8} only in {side}")
+    if regressions:
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def _sizes(value: str) -> list[str]:
+    labels = [v.strip().lower() for v in value.split(",") if v.strip()]
+    unknown = set(labels) - set(SIZES)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown size(s) {', '.join(sorted(unknown))}; pick from {', '.join(SIZES)}"
+        )
+    return labels
+
+
+def _cases(value: str) -> list[str]:
+    names = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown case(s) {', '.join(sorted(unknown))}; pick from {', '.join(CASES)}"
+        )
+    return names
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run the suite")
+    run_cmd.add_argument("--sizes", type=_sizes, default=["1k", "100k"])
+    run_cmd.add_argument("--only", type=_cases, default=None)
+    run_cmd.add_argument("--repeat", type=int, default=None)
+    run_cmd.add_argument("--seed", type=int, default=0)
+    run_cmd.add_argument("--out", type=Path, default=None)
+    run_cmd.set_defaults(handler=run)
+
+    compare_cmd = commands.add_parser("compare", help="flag regressions")
+    compare_cmd.add_argument("baseline", type=Path)
+    compare_cmd.add_argument("current", type=Path)
+    compare_cmd.add_argument("--threshold", type=float, default=0.10)
+    compare_cmd.add_argument("--metric", choices=("min", "median"), default="median")
+    compare_cmd.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Deterministic synthetic catalogs for benchmarks.
+
+    python benchmarks/synthetic.py --size 100000 --seed 1 --out movies.json
+
+The same spec always produces the same movies, so numbers from different
+runs and machines compare like for like. Genres follow the given weights,
+tags a Zipf-like distribution over a fixed vocabulary (a few very common
+tags and a long tail), titles a uniform number of words.
+"""
+
+import argparse
+import itertools
+import json
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from catalog.io_utils import export_catalog_to_csv, export_catalog_to_json
+from catalog.models import Catalog, Movie
+
+WORDS = (
+    "the night last city dark star love war king road black house summer "
+    "blood river ghost dream fire silent lost secret empire moon storm iron "
+    "heart shadow winter little return red wild broken glass golden island "
+    "hunter edge final garden midnight paper stone sun kingdom ocean"
+).split()
+
+GENRE_WEIGHTS = {
+    "drama": 30,
+    "comedy": 20,
+    "action": 15,
+    "thriller": 10,
+    "romance": 8,
+    "horror": 6,
+    "sci-fi": 5,
+    "documentary": 3,
+    "animation": 2,
+    "western": 1,
+}
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    size: int = 1000
+    seed: int = 0
+    genre_weights: dict = field(default_factory=lambda: dict(GENRE_WEIGHTS))
+    genres_per_movie: tuple[int, int] = (1, 3)
+    tag_vocabulary: int = 500
+    # exponent of the tag rank distribution: 0 is uniform, higher is skewed
+    tag_skew: float = 1.1
+    tags_per_movie: tuple[int, int] = (0, 5)
+    title_words: tuple[int, int] = (1, 6)
+    years: tuple[int, int] = (1920, 2024)
+    # share of movies carrying OMDb metadata (imdb id, poster, plot, runtime)
+    enriched: float = 0.5
+
+
+def generate(spec: SyntheticSpec) -> Iterator[dict]:
+    """Movie dicts, ids 1..size, in the shape ``Catalog.from_json`` takes."""
+    rng = random.Random(spec.seed)
+    genres = list(spec.genre_weights)
+    genre_cum = list(itertools.accumulate(spec.genre_weights.values()))
+    tags = [f"tag{rank}" for rank in range(spec.tag_vocabulary)]
+    tag_cum = list(
+        itertools.accumulate(
+            1 / (rank + 1) ** spec.tag_skew for rank in range(spec.tag_vocabulary)
+        )
+    )
+
+    for movie_id in range(1, spec.size + 1):
+        # sampled with replacement, then deduplicated keeping the order
+        n_genres = rng.randint(*spec.genres_per_movie)
+        movie_genres = list(
+            dict.fromkeys(rng.choices(genres, cum_weights=genre_cum, k=n_genres))
+        )
+        n_tags = rng.randint(*spec.tags_per_movie)
+        movie_tags = list(
+            dict.fromkeys(rng.choices(tags, cum_weights=tag_cum, k=n_tags))
+        )
+        title = " ".join(rng.choices(WORDS, k=rng.randint(*spec.title_words)))
+        movie = {
+            "id": movie_id,
+            "title": title.title(),
+            "year": rng.randint(*spec.years),
+            "genres": movie_genres,
+            "rating": round(rng.uniform(1, 10), 1),
+            "tags": movie_tags,
+            "imdb_id": None,
+            "poster": None,
+            "plot": None,
+            "runtime": None,
+        }
+        if rng.random() < spec.enriched:
+            movie.update(
+                imdb_id=f"tt{movie_id:07d}",
+                poster=f"https://img.example.invalid/{movie_id}.jpg",
+                plot=" ".join(rng.choices(WORDS, k=rng.randint(8, 40))).capitalize(),
+                runtime=rng.randint(70, 200),
+            )
+        yield movie
+
+
+def generate_catalog(spec: SyntheticSpec) -> Catalog:
+    catalog = Catalog()
+    catalog.extend(Movie.from_dict(data) for data in generate(spec))
+    return catalog
+
+
+def write(spec: SyntheticSpec, path: Path) -> Path:
+    """The spec's movies as a catalog JSON or CSV file, by ``path`` suffix."""
+    if path.suffix.lower() == ".csv":
+        return export_catalog_to_csv(generate_catalog(spec), path)
+    return export_catalog_to_json(generate_catalog(spec), path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tag-skew", type=float, default=1.1)
+    parser.add_argument("--title-words", default="1,6", help="min,max words")
+    parser.add_argument("--out", type=Path, required=True, help=".json or .csv")
+    args = parser.parse_args(argv)
+
+    low, high = (int(n) for n in args.title_words.split(","))
+    spec = SyntheticSpec(
+        size=args.size,
+        seed=args.seed,
+        tag_skew=args.tag_skew,
+        title_words=(low, high),
+    )
+    print(write(spec, args.out))
+    print(json.dumps(asdict(spec)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Callable, Dict
+
+from catalog.metrics import REGISTRY
+
+# highest priority first; only "heavy" is shed when the SLO is missed
+CLASSES = ("read", "write", "heavy")
+# queue time samples are capped at this many times the SLO
+MAX_QUEUE_SAMPLE = 4
+
+IN_FLIGHT = REGISTRY.gauge(
+    "admission_in_flight", "Requests being served per class", ["cls"]
+)
+LATENCY = REGISTRY.gauge(
+    "admission_latency_seconds", "Moving average of request latency", ["cls"]
+)
+QUEUE_TIME = REGISTRY.gauge(
+    "admission_queue_seconds", "Moving average of time spent queued", ["cls"]
+)
+REJECTED = REGISTRY.counter(
+    "admission_rejected_total", "Requests shed by admission control", ["cls", "reason"]
+)
+
+
+class AdmissionController:
+    # Tracks in-flight requests and a moving average of latency and queue
+    # time per class. Reads are the traffic the SLO protects: when their
+    # latency or the time requests wait before a worker picks them up goes
+    # over the target, heavy requests are turned away until it recovers.
+    # A class over its in-flight cap is always rejected.
+
+    def __init__(
+        self,
+        max_in_flight: Dict[str, int],
+        latency_slo: float,
+        queue_slo: float,
+        alpha: float = 0.2,
+        stale_after: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_in_flight = max_in_flight
+        self.latency_slo = latency_slo
+        self.queue_slo = queue_slo
+        self.alpha = alpha
+        self.stale_after = stale_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.in_flight = {cls: 0 for cls in CLASSES}
+        self.latency = {cls: 0.0 for cls in CLASSES}
+        self.queue_time = {cls: 0.0 for cls in CLASSES}
+        self._last_sample = {cls: 0.0 for cls in CLASSES}
+        self._last_queue_sample = {cls: 0.0 for cls in CLASSES}
+
+    def _ewma(self, old: float, sample: float) -> float:
+        return old + self.alpha * (sample - old)
+
+    def _fresh(self, at: float) -> bool:
+        # averages nobody updated lately say nothing about the current load
+        return self._clock() - at < self.stale_after
+
+    def overloaded(self) -> str | None:
+        if self._fresh(self._last_sample["read"]):
+            if self.latency["read"] > self.latency_slo:
+                return "latency"
+        for cls in CLASSES:
+            if self._fresh(self._last_queue_sample[cls]):
+                if self.queue_time[cls] > self.queue_slo:
+                    return "queue"
+        return None
+
+    def admit(self, cls: str, queued: float | None = None) -> str | None:
+        """Take a slot for a request of ``cls``; returns why it was refused."""
+        with self._lock:
+            if queued is not None and queued >= 0:
+                # one stray clock (or header) must not outweigh all the others
+                queued = min(queued, self.queue_slo * MAX_QUEUE_SAMPLE)
+                self.queue_time[cls] = self._ewma(self.queue_time[cls], queued)
+                self._last_queue_sample[cls] = self._clock()
+                QUEUE_TIME.set(self.queue_time[cls], cls=cls)
+
+            reason = None
+            cap = self.max_in_flight.get(cls, 0)
+            if cap and self.in_flight[cls] >= cap:
+                reason = "in_flight"
+            elif cls == "heavy":
+                reason = self.overloaded()
+            if reason is not None:
+                REJECTED.inc(cls=cls, reason=reason)
+                return reason
+
+            self.in_flight[cls] += 1
+            IN_FLIGHT.set(self.in_flight[cls], cls=cls)
+            return None
+
+    def release(self, cls: str, elapsed: float) -> None:
+        with self._lock:
+            self.in_flight[cls] -= 1
+            IN_FLIGHT.set(self.in_flight[cls], cls=cls)
+            self.latency[cls] = self._ewma(self.latency[cls], elapsed)
+            self._last_sample[cls] = self._clock()
+            LATENCY.set(self.latency[cls], cls=cls)
@@ -0,0 +1,77 @@
+import time
+from typing import cast
+
+from flask import current_app, g, jsonify, request
+
+from catalog.admission import AdmissionController
+from catalog.api.my_flask import Flask
+
+# expensive requests that can wait: full exports, imports, enrichment runs
+HEAVY_ENDPOINTS = {
+    "io.import_json_movies",
+    "io.import_csv_movies",
+    "io.export_json_movies",
+    "io.export_csv_movies",
+    "enrich.enrich_movies_with_iids",
+    "enrich.enrich_movies_with_metadata",
+    "movies.bulk_movies",
+}
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def request_class() -> str:
+    if request.endpoint in HEAVY_ENDPOINTS:
+        return "heavy"
+    return "read" if request.method in READ_METHODS else "write"
+
+
+def queue_time() -> float | None:
+    # X-Request-Start is set by the proxy in front of the server, as
+    # "t=<epoch>" in seconds, milliseconds or microseconds
+    if not current_app.config["ADMISSION_TRUST_REQUEST_START"]:
+        return None
+    raw = request.headers.get("X-Request-Start", "").removeprefix("t=")
+    try:
+        started = float(raw)
+    except ValueError:
+        return None
+    while started > 1e11:
+        started /= 1000
+    return time.time() - started
+
+
+def _admit():
+    app = cast(Flask, current_app)
+    cls = request_class()
+    reason = app.admission.admit(cls, queue_time())
+    if reason is not None:
+        response = jsonify(
+            error="Server is overloaded, retry later", request_class=cls, reason=reason
+        )
+        response.status_code = 503
+        response.headers["Retry-After"] = str(app.config["ADMISSION_RETRY_AFTER"])
+        return response
+    g.admission = (cls, time.monotonic())
+    return None
+
+
+def _release(exc=None) -> None:
+    admitted = g.pop("admission", None)
+    if admitted is not None:
+        cls, started = admitted
+        cast(Flask, current_app).admission.release(cls, time.monotonic() - started)
+
+
+def init_admission(app: Flask) -> None:
+    app.admission = AdmissionController(
+        max_in_flight={
+            "read": app.config["ADMISSION_MAX_READS"],
+            "write": app.config["ADMISSION_MAX_WRITES"],
+            "heavy": app.config["ADMISSION_MAX_HEAVY"],
+        },
+        latency_slo=app.config["ADMISSION_LATENCY_SLO"],
+        queue_slo=app.config["ADMISSION_QUEUE_SLO"],
+    )
+    if app.config["ADMISSION_ENABLED"]:
+        app.before_request(_admit)
+        app.teardown_request(_release)
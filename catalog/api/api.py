@@ -1,3 +1,6 @@
+from functools import partial
+from pathlib import Path
+
 from flask import Response, jsonify
 from flask_cors import CORS  # type: ignore[import-untyped]
 from flask_jwt_extended import JWTManager
@@ -5,27 +8,87 @@ from flask_seasurf import SeaSurf  # type: ignore[import-untyped]
 from flask_talisman import Talisman  # type: ignore[import-untyped]
 from werkzeug.exceptions import HTTPException
 
-from catalog.api.auth import auth_bp
-from catalog.api.enrich import enrich_bp
-from catalog.api.extensions import limiter
+from catalog.api.admission import init_admission
+from catalog.api.auth import ClaimsCache, auth_bp
+from catalog.api.compression import init_compression
+from catalog.api.enrich import enrich_bp, register_enrich_jobs
+from catalog.api.extensions import cache, limiter
 from catalog.api.import_export import io_bp
+from catalog.api.instrumentation import init_instrumentation
 from catalog.api.movies import movies_bp
+from catalog.api.profiling import init_profiling
 from catalog.api.my_flask import Flask
+from catalog.api.replication import init_replication, replication_bp
 from catalog.config import Config
+from catalog.jobs import JobManager
 from catalog.logging_config import configure_logging
+from catalog.models import Catalog
 from catalog.services import load_catalog
+from catalog.snapshot import load_packed_catalog
+from catalog.tracing import configure_tracing
+from catalog.versions import load_versions
+from catalog.watcher import CatalogWatcher, CatalogWriteLock
 
 csrf = SeaSurf()
 
 
-def create_app(config: dict | None = None) -> Flask:
-    configure_logging()
+def _load(config, previous: Catalog | None = None) -> Catalog:
+    # callers hold the catalog write lock: the file and its versions match
+    path = config["CATALOG_PATH"]
+    if config["CATALOG_SNAPSHOT"]:
+        catalog = load_packed_catalog(path)
+    else:
+        catalog = load_catalog(path)
+    load_versions(catalog, path, previous)
+    return catalog
+
+
+def _jobs_path(config) -> Path:
+    if config["JOBS_PATH"]:
+        return Path(config["JOBS_PATH"])
+    catalog_path = Path(config["CATALOG_PATH"])
+    return catalog_path.with_name(f"{catalog_path.stem}.jobs.json")
+
+
+def start_background_tasks(app: Flask) -> None:
+    # threads do not survive fork(), so a preforking server calls this in
+    # each worker instead of letting create_app start them in the master
+    if app.follower:
+        app.follower.start()
+    else:
+        app.jobs.resume()
+    if app.watcher and app.config["CATALOG_WATCH"]:
+        app.watcher.start()
+
 
+def create_app(config: dict | None = None) -> Flask:
     app = Flask(__name__)
     app.config.from_object(Config)
     app.config.update(config or {})
 
-    app.catalog = load_catalog(app.config["CATALOG_PATH"])
+    configure_logging(
+        app.config["LOG_FILE"],
+        app.config["LOG_LEVEL"],
+        queue_size=app.config["LOG_QUEUE_SIZE"],
+        block_timeout=app.config["LOG_QUEUE_BLOCK"],
+    )
+
+    configure_tracing(
+        app.config["TRACE_SAMPLE_RATE"],
+        file=app.config["TRACE_FILE"],
+        otlp_endpoint=app.config["TRACE_OTLP_ENDPOINT"],
+    )
+    app.catalog_lock = CatalogWriteLock(app.config["CATALOG_PATH"])
+    with app.catalog_lock:
+        app.catalog = _load(app.config)
+    app.catalog.changes.resize(app.config["CHANGE_LOG_SIZE"])
+    app.last_import = None
+    app.jobs = JobManager(
+        _jobs_path(app.config),
+        max_running=app.config["JOBS_MAX_RUNNING"],
+        max_queued=app.config["JOBS_MAX_QUEUED"],
+    )
+    register_enrich_jobs(app)
 
     CORS(
         app,
@@ -33,7 +96,29 @@ def create_app(config: dict | None = None) -> Flask:
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "X-API-Key", "Authorization"],
     )
+    init_instrumentation(app)
+    init_profiling(app)
     JWTManager(app)
+    app.claims_cache = ClaimsCache(
+        app.config["JWT_CLAIMS_CACHE_SIZE"], app.config["JWT_CLAIMS_CACHE_TTL"]
+    )
+    init_admission(app)
+    init_replication(app)
+    app.watcher = None
+    if not app.follower:
+        # writers sync through it even when CATALOG_WATCH is off; only the
+        # background polling depends on the setting
+        app.watcher = CatalogWatcher(
+            app.config["CATALOG_PATH"],
+            load=partial(_load, app.config),
+            install=partial(setattr, app, "catalog"),
+            current=lambda: app.catalog,
+            interval=app.config["CATALOG_WATCH_INTERVAL"],
+            debounce=app.config["CATALOG_WATCH_DEBOUNCE"],
+            lock=app.catalog_lock,
+        )
+    if app.config["START_BACKGROUND_TASKS"]:
+        start_background_tasks(app)
     limiter.init_app(app)
     Talisman(
         app,
@@ -46,12 +131,14 @@ def create_app(config: dict | None = None) -> Flask:
         frame_options="DENY",
     )
     # csrf.init_app(app)
-    # cache.init_app(app)
+    cache.init_app(app)
+    init_compression(app)
 
     app.register_blueprint(movies_bp)
     app.register_blueprint(io_bp)
     app.register_blueprint(enrich_bp)
     app.register_blueprint(auth_bp)
+    app.register_blueprint(replication_bp)
 
     @app.errorhandler(400)
     def handle_bad_request(err):
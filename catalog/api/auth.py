@@ -1,10 +1,23 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
 from datetime import timedelta
-from functools import wraps
-from typing import Callable
+from functools import lru_cache, wraps
+from typing import Callable, cast
+
+from flask import Blueprint, abort, current_app, g, jsonify, request
+from flask_jwt_extended import (
+    create_access_token,
+    get_jwt_request_location,
+    verify_jwt_in_request,
+)
+from flask_jwt_extended.exceptions import UserLookupError
 
-from flask import Blueprint, abort, current_app, jsonify, request
-from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 from catalog.api.extensions import limiter
+from catalog.api.my_flask import Flask
+from catalog.metrics import REGISTRY
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -15,13 +28,83 @@ USER_DB = {
     },
 }
 
+# read-only access to the snapshot and change feed, for followers
+REPLICA_ROLE = "replica"
+
+
+CLAIMS_LOOKUPS = REGISTRY.counter(
+    "auth_claims_cache_lookups_total", "Verified JWT claims cache lookups", ["result"]
+)
+
+
+class ClaimsCache:
+    # Claims of tokens that already passed signature verification, keyed by
+    # a digest of the Authorization header. An entry lives until the token's
+    # exp or for ttl seconds, whichever comes first, so non-expiring tokens
+    # are still re-verified now and then.
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, tuple[float, dict, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> tuple[dict, dict] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: bytes, header: dict, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        with self._lock:
+            self._entries[key] = (expires_at, header, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache(maxsize=8)
+def _key_digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
+
+
+def secret_matches(supplied: str | None, expected: str) -> bool:
+    if not supplied:
+        return False
+    # hashing first makes the compare constant time in the key length too
+    return hmac.compare_digest(
+        hashlib.sha256(supplied.encode()).digest(), _key_digest(expected)
+    )
+
+
+def has_api_key() -> bool:
+    return secret_matches(
+        request.headers.get("X-API-Key"), current_app.config["API_KEY"]
+    )
+
 
 def require_api_key(fn: Callable):
     @wraps(fn)
     def decorated(*args, **kwargs):
-        client_key = request.headers.get("X-API-Key")
-        expected = current_app.config["API_KEY"]
-        if not client_key or client_key != expected:
+        if not has_api_key():
             abort(401, description="Invalid or missing API key")
         return fn(*args, **kwargs)
 
@@ -47,14 +130,81 @@ def login():
     return jsonify(access_token=token), 200
 
 
-def requires_role(role: str = "admin"):
+def _token_checks():
+    # the checks verify_jwt_in_request() runs on a decoded token. They are
+    # not public API: where they moved, the cache is off and every request
+    # is verified in full.
+    try:
+        from flask_jwt_extended import internal_utils as checks
+
+        return (
+            checks.verify_token_type,
+            checks.verify_token_not_blocklisted,
+            checks.custom_verification_for_token,
+            checks.has_user_lookup,
+            checks.user_lookup,
+        )
+    except (ImportError, AttributeError):
+        return None
+
+
+_CHECKS = _token_checks()
+
+
+def _check_cached(header: dict, claims: dict) -> None:
+    assert _CHECKS is not None
+    token_type, not_blocklisted, custom, has_user_lookup, user_lookup = _CHECKS
+    token_type(claims, refresh=False)
+    not_blocklisted(header, claims)
+    custom(header, claims)
+    if has_user_lookup() and user_lookup(header, claims) is None:
+        raise UserLookupError(
+            f"user_lookup returned None for {claims.get('sub')}", header, claims
+        )
+
+
+def _verify_jwt() -> None:
+    # verify_jwt_in_request() with a cache in front of its decoding: a token
+    # seen before skips the signature check, and only that. Either way the
+    # claims are kept in g.jwt_claims, read through jwt_claims().
+    app = cast(Flask, current_app)
+    raw = request.headers.get(app.config["JWT_HEADER_NAME"], "")
+    key = hashlib.sha256(raw.encode()).digest() if raw and _CHECKS else None
+    hit = app.claims_cache.get(key) if key else None
+    if hit is not None:
+        header, claims = hit
+        _check_cached(header, claims)
+        CLAIMS_LOOKUPS.inc(result="hit")
+        g.jwt_claims = claims
+        return
+
+    if raw:
+        CLAIMS_LOOKUPS.inc(result="miss")
+    verified = verify_jwt_in_request()
+    g.jwt_claims = verified[1] if verified is not None else {}
+    # only cache what was actually read from the header we key on
+    if key and verified is not None and get_jwt_request_location() == "headers":
+        app.claims_cache.put(key, *verified)
+
+
+def jwt_claims() -> dict:
+    """Claims of the token the current request was authorized with."""
+    return g.get("jwt_claims", {})
+
+
+def requires_role(*roles: str):
+    # any one of the roles will do
+    roles = roles or ("admin",)
+
     def decorator(fn):
-        @jwt_required()
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            claims = get_jwt()
-            if role not in claims["roles"]:
-                abort(403, description=f"Access not authorized for role: {role}")
+            _verify_jwt()
+            if not set(roles) & set(jwt_claims().get("roles", ())):
+                abort(
+                    403,
+                    description=f"Access not authorized for role: {', '.join(roles)}",
+                )
             return fn(*args, **kwargs)
 
         return wrapper
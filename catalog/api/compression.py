@@ -0,0 +1,113 @@
+import zlib
+from typing import Iterable, Iterator, cast
+
+from flask import Response, current_app, request
+
+from catalog.api.my_flask import Flask
+from catalog.cache_backend import LRUCache
+from catalog.metrics import REGISTRY
+
+COMPRESSED = REGISTRY.counter(
+    "response_compression_total", "Responses compressed", ["encoding", "source"]
+)
+
+# wbits for zlib: 31 writes a gzip container, 15 the zlib one HTTP calls deflate
+ENCODINGS = {"gzip": 31, "deflate": 15}
+
+
+def coded_etag(etag: str, encoding: str) -> str:
+    return f"{etag}-{encoding}"
+
+
+def _compressor(encoding: str, level: int):
+    return zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+
+
+def _compress(body: bytes, encoding: str, level: int) -> bytes:
+    compressor = _compressor(encoding, level)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _compress_stream(
+    chunks: Iterable[bytes], encoding: str, level: int
+) -> Iterator[bytes]:
+    compressor = _compressor(encoding, level)
+    try:
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _compressible(response: Response) -> bool:
+    if response.status_code != 200 or "Content-Encoding" in response.headers:
+        return False
+    mimetype = response.mimetype or ""
+    return any(
+        mimetype == m or (m.endswith("/") and mimetype.startswith(m))
+        for m in current_app.config["COMPRESS_MIMETYPES"]
+    )
+
+
+def _cache_key(response: Response, encoding: str, level: int) -> str | None:
+    etag, _ = response.get_etag()
+    if etag is None:
+        return None
+    # lists filtered by query share the catalog ETag, so the query is part
+    # of the key; the format is already part of the ETag
+    return f"{request.full_path}:{etag}:{encoding}:{level}"
+
+
+def compress_response(response: Response) -> Response:
+    app = cast(Flask, current_app)
+    if not app.config["COMPRESS_ENABLED"] or not _compressible(response):
+        return response
+    encoding = request.accept_encodings.best_match(list(ENCODINGS))
+    if encoding is None:
+        return response
+    level = app.config["COMPRESS_LEVEL"]
+
+    if response.is_streamed:
+        # size unknown up front: compress on the fly, always
+        chunks = response.iter_encoded()
+        response.direct_passthrough = False
+        response.response = _compress_stream(chunks, encoding, level)
+        response.headers.pop("Content-Length", None)
+        source = "stream"
+    else:
+        body = response.get_data()
+        if len(body) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+        key = _cache_key(response, encoding, level)
+        compressed = app.compressed_bodies.get(key) if key else None
+        source = "cache"
+        if compressed is None:
+            compressed = _compress(body, encoding, level)
+            source = "body"
+            if key:
+                app.compressed_bodies.set(key, compressed)
+        response.set_data(compressed)
+
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # other bytes, so another strong ETag; conditional.py strips the
+        # suffix again to compare the entity
+        response.set_etag(coded_etag(etag, encoding))
+    COMPRESSED.inc(encoding=encoding, source=source)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    app.compressed_bodies = LRUCache(
+        threshold=app.config["COMPRESS_CACHE_SIZE"],
+        max_bytes=app.config["COMPRESS_CACHE_MAX_BYTES"],
+        default_timeout=0,
+    )
+    app.after_request(compress_response)
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from flask import Response, abort, make_response, request
+from werkzeug.http import is_resource_modified
+
+from catalog.api.compression import ENCODINGS, coded_etag
+from catalog.api.formats import BINARY_FORMATS
+from catalog.models import Catalog
+
+
+def catalog_etag(catalog: Catalog) -> str:
+    return f"{catalog.epoch}-{catalog.version}"
+
+
+def movie_etag(catalog: Catalog, movie_id: int) -> str:
+    version, _ = catalog.movie_version(movie_id)
+    return f"{catalog.epoch}-m{movie_id}-{version}"
+
+
+def format_etag(etag: str, mimetype: str) -> str:
+    # every format has bytes of its own, so an ETag of its own; JSON keeps
+    # the bare one
+    fmt = BINARY_FORMATS.get(mimetype)
+    return etag if fmt is None else f"{etag}-{fmt.name}"
+
+
+def _strip(tag: str, suffixes: set[str]) -> str:
+    base, _, suffix = tag.rpartition("-")
+    return base if base and suffix in suffixes else tag
+
+
+def _state_etag(tag: str) -> str:
+    # the ETag of the catalog state a format's, or a compressed, ETag was
+    # derived from
+    tag = _strip(tag, set(ENCODINGS))
+    return _strip(tag, {fmt.name for fmt in BINARY_FORMATS.values()})
+
+
+def _http_date(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
+def not_modified(etag: str, last_modified: float) -> Response | None:
+    # checked before anything is serialized, so a 304 costs next to nothing.
+    # The client may hold the body compressed, under that coding's ETag
+    for held in (etag, *(coded_etag(etag, coding) for coding in ENCODINGS)):
+        if not is_resource_modified(
+            request.environ, etag=held, last_modified=_http_date(last_modified)
+        ):
+            response = with_validators(make_response("", 304), held, last_modified)
+            # as on the 200 it stands in for, so caches keep variants apart
+            response.vary.add("Accept")
+            if held != etag:
+                response.vary.add("Accept-Encoding")
+            return response
+    return None
+
+
+def with_validators(response: Response, etag: str, last_modified: float) -> Response:
+    response.set_etag(etag)
+    response.last_modified = _http_date(last_modified)
+    return response
+
+
+def require_match(etag: str) -> None:
+    # strong comparison, as If-Match requires: weak tags never match. The
+    # state is what must match, whichever format or coding it was read in
+    if_match = request.if_match
+    if if_match and not (
+        if_match.star_tag or any(_state_etag(tag) == etag for tag in if_match)
+    ):
+        abort(412, description="Resource was modified (If-Match failed)")
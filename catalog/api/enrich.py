@@ -1,33 +1,115 @@
+import threading
+from functools import partial
 from typing import cast
-from flask import Blueprint, current_app, jsonify, request
-from catalog.api.my_flask import Flask
+
+from flask import Blueprint, abort, current_app, jsonify, request, url_for
+
 from catalog.api.auth import require_api_key, requires_role
-from catalog.services import enrich_ids_service, enrich_metadata_service, save_catalog
+from catalog.api.my_flask import Flask
+from catalog.jobs import Job, JobConflictError, JobLimitError, ProgressFn
+from catalog.resilience import RetryPolicy
+from catalog.services import enrich_ids_service, enrich_metadata_service
 
 enrich_bp = Blueprint("enrich", __name__, url_prefix="/movies")
 
 
+def _service_kwargs(
+    app: Flask, job: Job, progress: ProgressFn, cancelled: threading.Event
+) -> dict:
+    return {
+        "max_concurrency": job.params.get(
+            "max_concurrency", app.config["MAX_CONCURRENCY"]
+        ),
+        "policy": RetryPolicy.from_config(app.config),
+        "target_path": app.config["CATALOG_PATH"],
+        "batch_size": app.config["ENRICH_BATCH_SIZE"],
+        "progress": progress,
+        "should_stop": cancelled.is_set,
+        "write": app.writing_catalog,
+    }
+
+
+def _run_ids_job(app: Flask, job: Job, progress, cancelled) -> dict:
+    kwargs = _service_kwargs(app, job, progress, cancelled)
+    report = enrich_ids_service(app.catalog, **kwargs)
+    return {"updated": report.updated, "failed": report.failed}
+
+
+def _run_metadata_job(app: Flask, job: Job, progress, cancelled) -> dict:
+    kwargs = _service_kwargs(app, job, progress, cancelled)
+    report = enrich_metadata_service(app.catalog, **kwargs)
+    return {"enriched": report.updated, "failed": report.failed}
+
+
+def register_enrich_jobs(app: Flask) -> None:
+    app.jobs.register("ids", partial(_run_ids_job, app))
+    app.jobs.register("metadata", partial(_run_metadata_job, app))
+
+
+def _submit(kind: str):
+    payload = request.get_json(silent=True) or {}
+    params = {}
+    if "max_concurrency" in payload:
+        value = payload["max_concurrency"]
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            abort(400, description="max_concurrency must be an integer of at least 1")
+        params["max_concurrency"] = value
+
+    app = cast(Flask, current_app)
+    try:
+        job = app.jobs.submit(kind, params)
+    except JobConflictError as err:
+        return jsonify(error=str(err), job=err.job.to_dict()), 409
+    except JobLimitError as err:
+        return jsonify(error=str(err)), 503, {"Retry-After": "30"}
+
+    location = url_for("enrich.get_job", job_id=job.id)
+    return (
+        jsonify(message="Job accepted", job=job.to_dict()),
+        202,
+        {"Location": location},
+    )
+
+
 @enrich_bp.route("/enrich/ids", methods=["POST"])
 @require_api_key
 @requires_role("admin")
 def enrich_movies_with_iids():
-    payload = request.get_json(silent=True) or {}
-    max_conc = payload.get("max_concurrency", 5)
-    app = cast(Flask, current_app)
-    updated_count = enrich_ids_service(app.catalog, max_conc)
-
-    save_catalog(current_app.catalog, current_app.config["CATALOG_PATH"])
-    return jsonify(message="Update successful", updated=updated_count), 200
+    return _submit("ids")
 
 
 @enrich_bp.route("/enrich/metadata", methods=["POST"])
 @require_api_key
 @requires_role("admin")
 def enrich_movies_with_metadata():
-    payload = request.get_json(silent=True) or {}
-    max_conc = payload.get("max_concurrency", 5)
+    return _submit("metadata")
+
+
+@enrich_bp.route("/enrich/jobs", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def list_jobs():
     app = cast(Flask, current_app)
-    enriched_count = enrich_metadata_service(app.catalog, max_conc)
+    return jsonify(jobs=[j.to_dict() for j in app.jobs.list_jobs()]), 200
+
 
-    save_catalog(current_app.catalog, current_app.config["CATALOG_PATH"])
-    return jsonify(message="Update successful", enriched=enriched_count), 200
+@enrich_bp.route("/enrich/jobs/<job_id>", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def get_job(job_id: str):
+    app = cast(Flask, current_app)
+    job = app.jobs.get(job_id)
+    if not job:
+        abort(404, description=f"Job {job_id} not found")
+    return jsonify(job=job.to_dict()), 200
+
+
+@enrich_bp.route("/enrich/jobs/<job_id>/cancel", methods=["POST"])
+@require_api_key
+@requires_role("admin")
+def cancel_job(job_id: str):
+    app = cast(Flask, current_app)
+    job = app.jobs.cancel(job_id)
+    if not job:
+        abort(404, description=f"Job {job_id} not found")
+    return jsonify(job=job.to_dict()), 202
@@ -5,19 +5,16 @@ from flask_caching import Cache
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+import catalog.ratelimit_storage  # noqa: F401  registers sqlite://
+
 load_dotenv()
 
+# storage and strategy come from Config.RATELIMIT_* in create_app
 limiter = Limiter(
     key_func=get_remote_address,
     headers_enabled=True,
     default_limits=[os.getenv("RATELIMIT_DEFAULT", "3 per minute")],
-    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
 )
 
-cache = Cache(
-    config={
-        "CACHE_TYPE": "RedisCache",
-        "CACHE_REDIS_URL": "redis://localhost:6379/0",
-        "CACHE_DEFAULT_TIMEOUT": 60,
-    }
-)
+# configured from Config.CACHE_* in create_app
+cache = Cache()
@@ -0,0 +1,136 @@
+"""Content negotiation between JSON and compact binary encodings.
+
+MessagePack and CBOR are optional (``pip install 'movie-catalog[binary]'``);
+a format whose library is missing is simply not offered, and a client that
+accepts nothing else gets ``406``. Binary responses are streamed: lists in
+the payload are encoded and sent a batch of items at a time.
+"""
+
+import importlib
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from flask import Response, abort, jsonify, request
+
+JSON = "application/json"
+STREAM_BATCH = 256
+
+
+@dataclass(frozen=True)
+class BinaryFormat:
+    name: str
+    mimetype: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+    map_header: Callable[[int], bytes]
+    array_header: Callable[[int], bytes]
+
+
+def _import(module: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        return None
+
+
+def _msgpack_head(fix: int, marker16: int, length: int) -> bytes:
+    # container headers are written by hand: the libraries only expose them
+    # on stateful encoder objects, which are not safe to share between threads
+    if length < 16:
+        return bytes([fix | length])
+    if length < 1 << 16:
+        return struct.pack(">BH", marker16, length)
+    return struct.pack(">BI", marker16 + 1, length)
+
+
+def _msgpack() -> BinaryFormat | None:
+    msgpack = _import("msgpack")
+    if msgpack is None:
+        return None
+    return BinaryFormat(
+        name="msgpack",
+        mimetype="application/msgpack",
+        encode=msgpack.packb,
+        decode=lambda raw: msgpack.unpackb(raw, strict_map_key=False),
+        map_header=lambda n: _msgpack_head(0x80, 0xDE, n),
+        array_header=lambda n: _msgpack_head(0x90, 0xDC, n),
+    )
+
+
+def _cbor_head(major: int, length: int) -> bytes:
+    if length < 24:
+        return bytes([major << 5 | length])
+    for info, fmt in ((24, ">B"), (25, ">H"), (26, ">I"), (27, ">Q")):
+        if length < 1 << (8 * struct.calcsize(fmt)):
+            return bytes([major << 5 | info]) + struct.pack(fmt, length)
+    raise ValueError("CBOR length out of range")
+
+
+def _cbor() -> BinaryFormat | None:
+    cbor2 = _import("cbor2")
+    if cbor2 is None:
+        return None
+    return BinaryFormat(
+        name="cbor",
+        mimetype="application/cbor",
+        encode=cbor2.dumps,
+        decode=cbor2.loads,
+        map_header=lambda n: _cbor_head(5, n),
+        array_header=lambda n: _cbor_head(4, n),
+    )
+
+
+BINARY_FORMATS = {fmt.mimetype: fmt for fmt in (_msgpack(), _cbor()) if fmt is not None}
+KNOWN_BINARY = ("application/msgpack", "application/cbor")
+# accepted as aliases on requests
+_ALIASES = {"application/x-msgpack": "application/msgpack"}
+
+
+def encode_stream(fmt: BinaryFormat, payload: dict) -> Iterator[bytes]:
+    yield fmt.map_header(len(payload))
+    for key, value in payload.items():
+        yield fmt.encode(key)
+        if not isinstance(value, list):
+            yield fmt.encode(value)
+            continue
+        yield fmt.array_header(len(value))
+        for start in range(0, len(value), STREAM_BATCH):
+            yield b"".join(fmt.encode(v) for v in value[start : start + STREAM_BATCH])
+
+
+def negotiate() -> str:
+    """The mimetype to answer the current request with."""
+    offered = [JSON, *BINARY_FORMATS]
+    if not request.accept_mimetypes:
+        return JSON
+    best = request.accept_mimetypes.best_match(offered)
+    if best is None:
+        abort(406, description=f"Supported response types: {', '.join(offered)}")
+    return best
+
+
+def render(payload: dict, mimetype: str | None = None) -> Response:
+    """``payload`` as ``mimetype``, or as negotiate() picks when not given."""
+    mimetype = mimetype or negotiate()
+    fmt = BINARY_FORMATS.get(mimetype)
+    if fmt is None:
+        response = jsonify(**payload)
+    else:
+        response = Response(encode_stream(fmt, payload), mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
+
+
+def read_payload() -> Any:
+    """Request body decoded according to its Content-Type; JSON otherwise."""
+    mimetype = _ALIASES.get(request.mimetype, request.mimetype)
+    fmt = BINARY_FORMATS.get(mimetype)
+    if fmt is None:
+        if mimetype in KNOWN_BINARY:
+            abort(415, description=f"{mimetype} support is not installed")
+        return request.get_json(force=True)
+    try:
+        return fmt.decode(request.get_data())
+    except Exception as exc:
+        abort(400, description=f"Invalid {fmt.name} body: {exc}")
@@ -1,38 +1,104 @@
+import hashlib
 import shutil
+from dataclasses import asdict
 from typing import cast
 
 from flask import Blueprint, abort, current_app, jsonify, request, send_file
 
-from catalog.api.auth import require_api_key, requires_role
+from catalog.api.auth import REPLICA_ROLE, require_api_key, requires_role
+from catalog.api.formats import read_payload, render
 from catalog.api.my_flask import Flask
 from catalog.services import (
     export_csv_service,
     export_json_service,
     import_csv_service,
     import_json_service,
+    merge_csv_service,
+    merge_json_service,
 )
 
 io_bp = Blueprint("io", __name__, url_prefix="/movies")
 
+IMPORT_MODES = ("replace", "merge")
+
+
+def _import_options() -> tuple[str, bool]:
+    mode = request.args.get("mode", "replace")
+    if mode not in IMPORT_MODES:
+        abort(400, description=f"mode must be one of {', '.join(IMPORT_MODES)}")
+    delete_missing = request.args.get("delete_missing", "").lower() in ("1", "true")
+    return mode, delete_missing
+
+
+def _import_key(content: bytes, mode: str, delete_missing: bool) -> str:
+    digest = hashlib.sha256(content)
+    digest.update(f":{mode}:{delete_missing}".encode())
+    return digest.hexdigest()
+
+
+def _already_imported(app: Flask, key: str) -> bool:
+    # same upload as last time, and nothing changed the catalog since
+    return app.last_import == (key, app.catalog.epoch, app.catalog.version)
+
+
+def _skipped(app: Flask):
+    return (
+        jsonify(
+            message="Import skipped, content unchanged",
+            skipped=True,
+            count=len(app.catalog),
+        ),
+        200,
+    )
+
+
+def _merged(app: Flask, key: str, report):
+    app.last_import = (key, app.catalog.epoch, app.catalog.version)
+    return (
+        jsonify(
+            message="Merged successfully", count=len(app.catalog), **asdict(report)
+        ),
+        200,
+    )
+
 
 @io_bp.route("/import/json", methods=["POST"])
 @require_api_key
 @requires_role("admin")
 def import_json_movies():
     app = cast(Flask, current_app)
-    payload = request.get_json(force=True)
-
-    app.catalog = import_json_service(payload, current_app.config["CATALOG_PATH"])
+    mode, delete_missing = _import_options()
+    payload = read_payload()
+    key = _import_key(request.get_data(), mode, delete_missing)
+    with app.writing_catalog() as catalog:
+        if _already_imported(app, key):
+            return _skipped(app)
+
+        if mode == "merge":
+            report = merge_json_service(
+                payload, catalog, current_app.config["CATALOG_PATH"], delete_missing
+            )
+            return _merged(app, key, report)
+
+        app.catalog = import_json_service(
+            payload, current_app.config["CATALOG_PATH"], catalog
+        )
+        app.last_import = (key, app.catalog.epoch, app.catalog.version)
     return jsonify(message="Imported successfully", count=len(app.catalog)), 201
 
 
 @io_bp.route("/export/json", methods=["GET"])
 @require_api_key
-@requires_role("admin")
+@requires_role("admin", REPLICA_ROLE)
 def export_json_movies():
     app = cast(Flask, current_app)
-    movies = export_json_service(app.catalog)
-    return jsonify(movies=movies), 200
+    catalog = app.catalog
+    # the version lets a client continue with GET /movies/changes?since=. It
+    # is read before the movies: a write landing in between is then sent
+    # again by the change feed, instead of never
+    epoch, version = catalog.epoch, catalog.version
+    movies = export_json_service(catalog)
+    return render({"movies": movies, "epoch": epoch, "version": version}), 200
 
 
 @io_bp.route("/import/csv", methods=["POST"])
@@ -44,7 +110,26 @@ def import_csv_movies():
 
     uploaded_file = request.files["file"]
     app = cast(Flask, current_app)
-    app.catalog = import_csv_service(uploaded_file, current_app.config["CATALOG_PATH"])
+    mode, delete_missing = _import_options()
+    key = _import_key(uploaded_file.stream.read(), mode, delete_missing)
+    uploaded_file.stream.seek(0)
+    with app.writing_catalog() as catalog:
+        if _already_imported(app, key):
+            return _skipped(app)
+
+        if mode == "merge":
+            report = merge_csv_service(
+                uploaded_file,
+                catalog,
+                current_app.config["CATALOG_PATH"],
+                delete_missing,
+            )
+            return _merged(app, key, report)
+
+        app.catalog = import_csv_service(
+            uploaded_file, current_app.config["CATALOG_PATH"], catalog
+        )
+        app.last_import = (key, app.catalog.epoch, app.catalog.version)
 
     return jsonify(message="Imported CSV", count=len(app.catalog)), 201
 
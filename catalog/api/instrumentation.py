@@ -0,0 +1,158 @@
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import cast
+
+from flask import Response, abort, current_app, g, request
+
+from catalog.api.auth import has_api_key, secret_matches
+from catalog.api.extensions import limiter
+from catalog.api.my_flask import Flask
+from catalog.logging_config import request_id
+from catalog.metrics import REGISTRY, SnapshotWriter, render_text
+from catalog.tracing import tracer
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request",
+    ["endpoint", "method", "status"],
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "Requests being served", ["endpoint"]
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "Size of buffered response bodies as sent",
+    ["endpoint"],
+    buckets=tuple(float(4**n) for n in range(4, 13)),  # 256 B .. 16 MiB
+)
+
+EXPOSITION = "text/plain; version=0.0.4; charset=utf-8"
+REQUEST_ID_HEADER = "X-Request-Id"
+_SAFE_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def _endpoint() -> str:
+    # the route, never the raw path: unmatched URLs would be unbounded labels
+    return request.endpoint or "unmatched"
+
+
+def _start() -> None:
+    g.metrics = (_endpoint(), time.perf_counter())
+    IN_FLIGHT.inc(endpoint=g.metrics[0])
+
+
+def _record(response: Response) -> Response:
+    started = g.get("metrics")
+    if started is not None:
+        g.metrics_status = response.status_code
+        # streamed bodies have no length until they are sent
+        if response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, endpoint=started[0])
+    return response
+
+
+def _finish(exc=None) -> None:
+    started = g.pop("metrics", None)
+    if started is None:
+        return
+    endpoint, at = started
+    status = g.pop("metrics_status", 500)
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - at,
+        endpoint=endpoint,
+        method=request.method,
+        status=str(status),
+    )
+    IN_FLIGHT.dec(endpoint=endpoint)
+    writer = cast(Flask, current_app).metrics_writer
+    if writer is not None:
+        writer.maybe_write(REGISTRY)
+
+
+def _scraper() -> bool:
+    # METRICS_TOKEN as a bearer token when set, else the API key
+    token = current_app.config["METRICS_TOKEN"]
+    if not token:
+        return has_api_key()
+    supplied = request.headers.get("Authorization", "")
+    return supplied.startswith("Bearer ") and secret_matches(supplied[7:], token)
+
+
+# scrapers are not rate limited, anyone else is turned away
+@limiter.limit(lambda: current_app.config["RATELIMIT_DEFAULT"], exempt_when=_scraper)
+def metrics() -> Response:
+    if not _scraper():
+        abort(401, description="Invalid or missing metrics credentials")
+    writer = cast(Flask, current_app).metrics_writer
+    text = render_text(REGISTRY) if writer is None else writer.render(REGISTRY)
+    return current_app.response_class(text, mimetype=EXPOSITION)
+
+
+def _bind_request_id() -> None:
+    # reuse the proxy's id so log lines can be matched across hops
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    rid = incoming if _SAFE_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+    g.request_id = (rid, request_id.set(rid))
+
+
+def _echo_request_id(response: Response) -> Response:
+    bound = g.get("request_id")
+    if bound is not None:
+        response.headers[REQUEST_ID_HEADER] = bound[0]
+    return response
+
+
+def _unbind_request_id(exc=None) -> None:
+    bound = g.pop("request_id", None)
+    if bound is not None:
+        request_id.reset(bound[1])
+
+
+def _start_trace() -> None:
+    g.trace = tracer.start(
+        f"{request.method} {_endpoint()}",
+        method=request.method,
+        path=request.path,
+        request_id=request_id.get(),
+    )
+
+
+def _trace_status(response: Response) -> Response:
+    trace = g.get("trace")
+    if trace is not None:
+        trace[0].set(status=response.status_code)
+    return response
+
+
+def _finish_trace(exc=None) -> None:
+    trace = g.pop("trace", None)
+    if trace is not None:
+        span, token = trace
+        tracer.finish(span, token, exc)
+
+
+def init_instrumentation(app: Flask) -> None:
+    # registered before the other hooks so the timing covers them, and so
+    # _record runs after compression and sees the bytes actually sent
+    app.before_request(_bind_request_id)
+    app.after_request(_echo_request_id)
+    app.teardown_request(_unbind_request_id)
+    if app.config["TRACE_SAMPLE_RATE"] > 0:
+        # the request span is the root the service spans nest under
+        app.before_request(_start_trace)
+        app.after_request(_trace_status)
+        app.teardown_request(_finish_trace)
+    app.metrics_writer = None
+    if not app.config["METRICS_ENABLED"]:
+        return
+    if app.config["METRICS_DIR"]:
+        Path(app.config["METRICS_DIR"]).mkdir(parents=True, exist_ok=True)
+        app.metrics_writer = SnapshotWriter(
+            app.config["METRICS_DIR"], app.config["METRICS_WRITE_INTERVAL"]
+        )
+    app.before_request(_start)
+    app.after_request(_record)
+    app.teardown_request(_finish)
+    app.add_url_rule(app.config["METRICS_PATH"], "metrics", metrics)
@@ -1,17 +1,29 @@
 from dataclasses import asdict
-
-# from functools import lru_cache
 from typing import cast
 
-from flask import Blueprint, abort, current_app, jsonify, request
+from flask import Blueprint, abort, current_app, jsonify, request, url_for
 
-from catalog.api.auth import require_api_key, requires_role
+from catalog.api.auth import REPLICA_ROLE, require_api_key, requires_role
+from catalog.api.conditional import (
+    catalog_etag,
+    format_etag,
+    movie_etag,
+    not_modified,
+    require_match,
+    with_validators,
+)
+from catalog.api.extensions import limiter
+from catalog.api.formats import negotiate, render
 from catalog.api.my_flask import Flask
+from catalog.api.response_cache import cached_response, response_cache_stats
 from catalog.services import (
     add_movie_service,
+    bulk_service,
+    changes_service,
     delete_movie_service,
     load_movie_by_id_service,
     load_movies_service,
+    multi_get_service,
     save_catalog,
     update_movie_service,
 )
@@ -22,25 +34,124 @@ movies_bp = Blueprint("movies", __name__, url_prefix="/movies")
 @movies_bp.route("", methods=["GET"])
 @require_api_key
 @requires_role("admin")
+@cached_response
 def list_movies():
     app = cast(Flask, current_app)
-
-    # @lru_cache(maxsize=1)
-    # def load_movies_cached() -> list[dict]:
-    #     return load_movies_service(app.catalog)
-
-    return jsonify(movies=load_movies_service(app.catalog)), 200
+    catalog = app.catalog
+    # the format first: it is part of the ETag, and a 406 beats a 304
+    mimetype = negotiate()
+    etag = format_etag(catalog_etag(catalog), mimetype)
+    unchanged = not_modified(etag, catalog.updated_at)
+    if unchanged:
+        return unchanged
+
+    ids = request.args.get("ids")
+    if ids is not None:
+        response = render(multi_get_service(catalog, _parse_ids(ids)), mimetype)
+    else:
+        response = render({"movies": load_movies_service(catalog)}, mimetype)
+    return with_validators(response, etag, catalog.updated_at), 200
+
+
+def _parse_ids(raw: str) -> list[int]:
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        abort(400, description="Query parameter 'ids' must be comma separated ids")
+
+    limit = current_app.config["BULK_MAX_ITEMS"]
+    if len(ids) > limit:
+        abort(400, description=f"At most {limit} ids per request")
+    return ids
 
 
 @movies_bp.route("/<int:movie_id>", methods=["GET"])
 @require_api_key
 @requires_role("admin")
+@cached_response
 def get_movie(movie_id: int):
     app = cast(Flask, current_app)
     m = load_movie_by_id_service(app.catalog, movie_id)
     if not m:
         abort(404, description=f"Movie {movie_id} not found")
-    return jsonify(movie=asdict(m)), 200
+
+    mimetype = negotiate()
+    etag = format_etag(movie_etag(app.catalog, movie_id), mimetype)
+    _, last_modified = app.catalog.movie_version(movie_id)
+    unchanged = not_modified(etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    response = render({"movie": asdict(m)}, mimetype)
+    return with_validators(response, etag, last_modified), 200
+
+
+@movies_bp.route("/bulk", methods=["POST"])
+@require_api_key
+@requires_role("admin")
+def bulk_movies():
+    app = cast(Flask, current_app)
+    payload = request.get_json(force=True)
+    operations = payload.get("operations") if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        abort(400, description="Must provide JSON with an 'operations' list")
+
+    limit = current_app.config["BULK_MAX_ITEMS"]
+    if len(operations) > limit:
+        abort(413, description=f"At most {limit} operations per request")
+
+    atomic = bool(payload.get("atomic", False))
+    with app.writing_catalog() as catalog:
+        results, committed = bulk_service(catalog, operations, atomic=atomic)
+        if committed:
+            save_catalog(catalog, current_app.config["CATALOG_PATH"])
+        version = catalog.version
+
+    # an atomic batch that was rolled back reports why, but changed nothing
+    status = 422 if atomic and not committed else 200
+    return jsonify(results=results, committed=committed, version=version), status
+
+
+@movies_bp.route("/changes", methods=["GET"])
+@limiter.limit(lambda: current_app.config["CHANGES_RATE_LIMIT"])
+@require_api_key
+@requires_role("admin", REPLICA_ROLE)
+def list_changes():
+    app = cast(Flask, current_app)
+    since = request.args.get("since", type=int)
+    if since is None or since < 0:
+        abort(400, description="Query parameter 'since' must be a version number")
+
+    catalog = app.catalog
+    epoch, version, changes = catalog.changes_since(since)
+    wanted = request.args.get("epoch")
+    if changes is None or (wanted and wanted != epoch):
+        return (
+            jsonify(
+                error="Requested version is no longer available, resync required",
+                resync=True,
+                snapshot=url_for("io.export_json_movies"),
+                epoch=epoch,
+                version=version,
+            ),
+            410,
+        )
+
+    return (
+        jsonify(
+            epoch=epoch,
+            version=version,
+            changes=changes_service(catalog, changes),
+        ),
+        200,
+    )
+
+
+@movies_bp.route("/cache/stats", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def cache_stats():
+    return jsonify(cache=response_cache_stats()), 200
 
 
 @movies_bp.route("", methods=["POST"])
@@ -50,9 +161,13 @@ def add_movie():
     app = cast(Flask, current_app)
     data = request.get_json(force=True)
 
-    movie = add_movie_service(app.catalog, data)
-    save_catalog(app.catalog, current_app.config["CATALOG_PATH"])
-    return jsonify(movie=asdict(movie)), 201
+    with app.writing_catalog() as catalog:
+        movie = add_movie_service(catalog, data)
+        save_catalog(catalog, current_app.config["CATALOG_PATH"])
+        etag = movie_etag(catalog, movie.id)
+    response = jsonify(movie=asdict(movie))
+    response.set_etag(etag)
+    return response, 201
 
 
 @movies_bp.route("/<int:movie_id>", methods=["PUT"])
@@ -61,13 +176,21 @@ def add_movie():
 def update_movie(movie_id: int):
     app = cast(Flask, current_app)
     data = request.get_json(force=True)
+    # the precondition is checked under the write lock, against the latest
+    # saved state, so a concurrent writer cannot slip in after the check
+    with app.writing_catalog() as catalog:
+        if load_movie_by_id_service(catalog, movie_id):
+            require_match(movie_etag(catalog, movie_id))
 
-    m = update_movie_service(app.catalog, movie_id, data)
-    if not m:
-        abort(404, description=f"Movie {movie_id} not found")
+        m = update_movie_service(catalog, movie_id, data)
+        if not m:
+            abort(404, description=f"Movie {movie_id} not found")
 
-    save_catalog(app.catalog, current_app.config["CATALOG_PATH"])
-    return jsonify(movie=asdict(m)), 200
+        save_catalog(catalog, current_app.config["CATALOG_PATH"])
+        etag = movie_etag(catalog, movie_id)
+    response = jsonify(movie=asdict(m))
+    response.set_etag(etag)
+    return response, 200
 
 
 @movies_bp.route("/<int:movie_id>", methods=["DELETE"])
@@ -75,9 +198,13 @@ def update_movie(movie_id: int):
 @requires_role("admin")
 def delete_movie(movie_id: int):
     app = cast(Flask, current_app)
-    removed = delete_movie_service(app.catalog, movie_id)
-    if not removed:
-        abort(404, description=f"Movie {movie_id} not found")
+    with app.writing_catalog() as catalog:
+        if load_movie_by_id_service(catalog, movie_id):
+            require_match(movie_etag(catalog, movie_id))
+
+        removed = delete_movie_service(catalog, movie_id)
+        if not removed:
+            abort(404, description=f"Movie {movie_id} not found")
 
-    save_catalog(app.catalog, current_app.config["CATALOG_PATH"])
+        save_catalog(catalog, current_app.config["CATALOG_PATH"])
     return "", 204
@@ -1,5 +1,44 @@
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
 from flask import Flask as _Flask
+from flask import abort
+from catalog.admission import AdmissionController
+from catalog.cache_backend import LRUCache
+from catalog.jobs import JobManager
+from catalog.metrics import SnapshotWriter
 from catalog.models import Catalog
+from catalog.profiling import ProfileStore
+from catalog.replication import Follower
+from catalog.watcher import CatalogReloadError, CatalogWatcher, CatalogWriteLock
+
+if TYPE_CHECKING:
+    from catalog.api.auth import ClaimsCache
+
 
 class Flask(_Flask):
     catalog: Catalog
+    jobs: JobManager
+    follower: Follower | None
+    watcher: CatalogWatcher | None
+    catalog_lock: CatalogWriteLock
+    claims_cache: "ClaimsCache"
+    admission: AdmissionController
+    compressed_bodies: LRUCache
+    profiles: ProfileStore
+    metrics_writer: SnapshotWriter | None
+    # (content key, epoch, version) of the last import, to skip repeats
+    last_import: tuple[str, str, int] | None
+
+    @contextmanager
+    def writing_catalog(self) -> Iterator[Catalog]:
+        # one writer at a time across threads and the workers sharing
+        # CATALOG_PATH; what another worker saved is loaded first, so this
+        # write is checked against it and does not overwrite it
+        with self.catalog_lock:
+            if self.watcher is not None:
+                try:
+                    self.watcher.sync()
+                except CatalogReloadError:
+                    abort(503, description="Catalog is being rewritten, try again")
+            yield self.catalog
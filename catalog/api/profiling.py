@@ -0,0 +1,129 @@
+import cProfile
+import itertools
+import time
+from typing import cast
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    g,
+    jsonify,
+    request,
+    send_file,
+)
+
+from catalog.api.auth import require_api_key, requires_role
+from catalog.api.my_flask import Flask
+from catalog.metrics import REGISTRY
+from catalog.profiling import ProfileStore
+
+profiles_bp = Blueprint("profiles", __name__, url_prefix="/admin/profiles")
+
+PROFILED = REGISTRY.counter("profiled_requests_total", "Requests profiled", ["reason"])
+
+_requests = itertools.count(1)
+
+
+@require_api_key
+@requires_role("admin")
+def _check_admin() -> None:
+    return None
+
+
+def _profile_reason(app: Flask) -> str | None:
+    if request.headers.get(app.config["PROFILE_HEADER"]):
+        # asking is an admin privilege: anyone else gets 401/403 here
+        _check_admin()
+        return "header"
+    every = app.config["PROFILE_SAMPLE_EVERY"]
+    if every and next(_requests) % every == 0:
+        return "sampled"
+    return None
+
+
+def _start() -> None:
+    app = cast(Flask, current_app)
+    if request.blueprint == profiles_bp.name:
+        return
+    reason = _profile_reason(app)
+    if reason is None:
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return  # another profiler (a debugger, coverage) owns this thread
+    g.profile = (profile, reason, time.perf_counter())
+
+
+def _mark(response: Response) -> Response:
+    running = g.get("profile")
+    if running is not None:
+        g.profile_status = response.status_code
+        if running[1] == "header":
+            # reserved now, written once the request is done
+            g.profile_id = cast(Flask, current_app).profiles.new_id()
+            response.headers["X-Profile-Id"] = g.profile_id
+    return response
+
+
+def _finish(exc=None) -> None:
+    running = g.pop("profile", None)
+    if running is None:
+        return
+    profile, reason, started = running
+    profile.disable()
+    app = cast(Flask, current_app)
+    app.profiles.save(
+        profile,
+        profile_id=g.pop("profile_id", None),
+        reason=reason,
+        method=request.method,
+        path=request.full_path.rstrip("?"),
+        endpoint=request.endpoint,
+        status=g.pop("profile_status", 500),
+        duration=time.perf_counter() - started,
+    )
+    PROFILED.inc(reason=reason)
+
+
+@profiles_bp.route("", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def list_profiles():
+    limit = request.args.get("limit", default=20, type=int)
+    app = cast(Flask, current_app)
+    return jsonify(profiles=app.profiles.recent(limit)), 200
+
+
+@profiles_bp.route("/<profile_id>", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def profile_top(profile_id: str):
+    limit = request.args.get("limit", default=20, type=int)
+    sort = request.args.get("sort", default="cumulative")
+    app = cast(Flask, current_app)
+    top = app.profiles.top(profile_id, limit, sort)
+    if top is None:
+        abort(404, description=f"Profile {profile_id} not found")
+    return jsonify(id=profile_id, sort=sort, functions=top), 200
+
+
+@profiles_bp.route("/<profile_id>/pstats", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def download_profile(profile_id: str):
+    path = cast(Flask, current_app).profiles.pstats_path(profile_id)
+    if path is None:
+        abort(404, description=f"Profile {profile_id} not found")
+    return send_file(path, mimetype="application/octet-stream", download_name=path.name)
+
+
+def init_profiling(app: Flask) -> None:
+    app.profiles = ProfileStore(app.config["PROFILE_DIR"], app.config["PROFILE_KEEP"])
+    app.before_request(_start)
+    app.after_request(_mark)
+    app.teardown_request(_finish)
+    app.register_blueprint(profiles_bp)
@@ -0,0 +1,101 @@
+import ssl
+from datetime import timedelta
+from typing import cast
+
+from flask import Blueprint, current_app, jsonify, redirect, request
+from flask_jwt_extended import create_access_token
+
+from catalog.api.auth import REPLICA_ROLE, require_api_key, requires_role
+from catalog.api.my_flask import Flask
+from catalog.replication import Follower
+
+replication_bp = Blueprint("replication", __name__, url_prefix="/movies")
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# still answered locally on a follower
+LOCAL_ENDPOINTS = {"auth.login", "static"}
+
+
+@replication_bp.route("/replication", methods=["GET"])
+@require_api_key
+@requires_role("admin")
+def replication_status():
+    app = cast(Flask, current_app)
+    if app.follower:
+        return jsonify(replication=app.follower.status()), 200
+    return (
+        jsonify(
+            replication={
+                "role": "primary",
+                "epoch": app.catalog.epoch,
+                "version": app.catalog.version,
+                "change_log": {
+                    "entries": len(app.catalog.changes),
+                    "floor": app.catalog.changes.floor,
+                },
+            }
+        ),
+        200,
+    )
+
+
+def _guard_follower():
+    app = cast(Flask, current_app)
+    follower = app.follower
+    if follower is None or request.endpoint in LOCAL_ENDPOINTS:
+        return None
+
+    if request.method in WRITE_METHODS:
+        # 307 keeps the method and body, so clients can simply follow it
+        response = redirect(f"{follower.primary}{request.full_path.rstrip('?')}", 307)
+        response.headers["X-Catalog-Primary"] = follower.primary
+        return response
+
+    if (
+        not follower.ready.is_set()
+        and request.endpoint != "replication.replication_status"
+    ):
+        response = jsonify(error="Replica is still loading its snapshot")
+        response.status_code = 503
+        response.headers["Retry-After"] = "1"
+        return response
+    return None
+
+
+def init_replication(app: Flask) -> None:
+    app.follower = None
+    primary = app.config["REPLICA_OF"]
+    if not primary:
+        return
+
+    # followers share the primary's API key and JWT secret. The token is
+    # read-only and short lived; a new one is minted when the primary
+    # answers 401
+    ttl = timedelta(seconds=app.config["REPLICA_TOKEN_TTL"])
+
+    def authorize() -> str:
+        with app.app_context():
+            return create_access_token(
+                identity="replica",
+                additional_claims={"roles": [REPLICA_ROLE]},
+                expires_delta=ttl,
+            )
+
+    headers = {"X-API-Key": app.config["API_KEY"], "Accept": "application/json"}
+    ssl_context = None
+    if app.config["REPLICA_CA_FILE"]:
+        ssl_context = ssl.create_default_context(cafile=app.config["REPLICA_CA_FILE"])
+
+    def install(catalog):
+        app.catalog = catalog
+
+    app.follower = Follower(
+        primary,
+        headers,
+        install=install,
+        current=lambda: app.catalog,
+        interval=app.config["REPLICA_POLL_INTERVAL"],
+        ssl_context=ssl_context,
+        authorize=authorize,
+    )
+    app.before_request(_guard_follower)
@@ -0,0 +1,79 @@
+from functools import wraps
+from typing import Callable, cast
+
+from flask import Response, current_app, make_response, request
+
+from catalog.api.conditional import not_modified
+from catalog.api.extensions import cache
+from catalog.api.formats import negotiate
+from catalog.api.my_flask import Flask
+from catalog.cache_backend import EVICTIONS, LRUCache
+from catalog.metrics import REGISTRY
+
+LOOKUPS = REGISTRY.counter(
+    "response_cache_lookups_total", "Response cache lookups", ["endpoint", "result"]
+)
+
+# headers worth replaying on a hit; everything else is added per request
+_KEPT_HEADERS = {"content-type", "etag", "last-modified", "vary"}
+
+
+def response_cache_key() -> str:
+    app = cast(Flask, current_app)
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    # the catalog version is part of the key, so any write makes every
+    # cached response unreachable and they simply age out of the LRU
+    catalog = app.catalog
+    return (
+        f"resp:{request.path}?{query}:{negotiate()}:{catalog.epoch}:{catalog.version}"
+    )
+
+
+def cached_response(fn: Callable):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not current_app.config["RESPONSE_CACHE_ENABLED"]:
+            return fn(*args, **kwargs)
+
+        key = response_cache_key()
+        hit = cache.get(key)
+        if hit is not None:
+            LOOKUPS.inc(endpoint=request.endpoint or "", result="hit")
+            body, headers = hit
+            response = Response(body, status=200, headers=headers)
+            etag, _ = response.get_etag()
+            if etag is not None and response.last_modified is not None:
+                unchanged = not_modified(etag, response.last_modified.timestamp())
+                if unchanged:
+                    return unchanged
+            return response
+
+        LOOKUPS.inc(endpoint=request.endpoint or "", result="miss")
+        response = make_response(fn(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            headers = [
+                (k, v) for k, v in response.headers if k.lower() in _KEPT_HEADERS
+            ]
+            cache.set(key, (response.get_data(), headers))
+        return response
+
+    return wrapper
+
+
+def response_cache_stats() -> dict:
+    counts = {labels["result"]: 0 for labels, _ in LOOKUPS.samples()}
+    for labels, value in LOOKUPS.samples():
+        counts[labels["result"]] += int(value)
+
+    stats = {
+        "backend": current_app.config["CACHE_TYPE"],
+        "hits": counts.get("hit", 0),
+        "misses": counts.get("miss", 0),
+        "evictions": {
+            labels["reason"]: int(value) for labels, value in EVICTIONS.samples()
+        },
+    }
+    backend = cache.cache
+    if isinstance(backend, LRUCache):
+        stats.update(entries=len(backend), bytes=backend.bytes)
+    return stats
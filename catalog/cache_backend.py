@@ -0,0 +1,113 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any
+
+from flask_caching.backends.base import BaseCache
+
+from catalog.metrics import REGISTRY
+
+EVICTIONS = REGISTRY.counter(
+    "response_cache_evictions_total", "Entries evicted from the LRU cache", ["reason"]
+)
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, tuple) and value and isinstance(value[0], bytes):
+        # (body, headers) pairs stored by the response cache
+        return len(value[0]) + sum(len(k) + len(v) for k, v in value[1])
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class LRUCache(BaseCache):
+    """In-process LRU cache with a TTL and a cap on the total size of values.
+
+    Unlike flask-caching's SimpleCache it is thread safe and evicts least
+    recently used entries first, so large serialized movie lists cannot
+    grow the process without bound.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_timeout: int = 300,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            threshold=config["CACHE_THRESHOLD"],
+            max_bytes=config.get("CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        )
+        return cls(*args, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expires_at(self, timeout: int | timedelta | None) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return time.monotonic() + timeout if timeout > 0 else float("inf")
+
+    def _drop(self, key: str, reason: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+        EVICTIONS.inc(reason=reason)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(key, "expired")
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, timeout: int | timedelta | None = None) -> bool:
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                _, _, old_size = self._entries.pop(key)
+                self.bytes -= old_size
+            self._entries[key] = (self._expires_at(timeout), value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._entries) > self.threshold:
+                self._drop(next(iter(self._entries)), "capacity")
+        return True
+
+    def add(self, key: str, value: Any, timeout: int | timedelta | None = None) -> bool:
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def has(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self.bytes -= entry[2]
+            return True
+
+    def clear(self) -> bool:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+        return True
@@ -0,0 +1,103 @@
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Deque, Dict, List
+
+DEFAULT_CHANGE_LOG_SIZE = 10_000
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class Change:
+    version: int
+    movie_id: int
+    op: str = UPDATE
+
+    @property
+    def deleted(self) -> bool:
+        return self.op == DELETE
+
+
+class ChangeLog:
+    # Keeps the most recent mutations of a catalog. ``floor`` is the newest
+    # version that is no longer fully covered: a reader that has seen
+    # ``floor`` or anything after it can catch up from the log, anyone
+    # older has to resync from a full snapshot.
+
+    def __init__(self, maxlen: int = DEFAULT_CHANGE_LOG_SIZE):
+        self._entries: Deque[Change] = deque(maxlen=maxlen)
+        self.floor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def maxlen(self) -> int:
+        return self._entries.maxlen or 0
+
+    def resize(self, maxlen: int) -> None:
+        with self._lock:
+            entries = list(self._entries)
+            dropped = entries[: max(len(entries) - maxlen, 0)]
+            if dropped:
+                self.floor = dropped[-1].version
+            self._entries = deque(entries[len(dropped) :], maxlen=maxlen)
+
+    def record(self, version: int, movie_id: int, op: str = UPDATE) -> None:
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self.floor = self._entries[0].version
+            self._entries.append(Change(version, movie_id, op))
+
+    def reset(self, version: int) -> None:
+        # the whole catalog was replaced, nothing before this can be replayed
+        with self._lock:
+            self._entries.clear()
+            self.floor = version
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "floor": self.floor,
+                "entries": [[c.version, c.movie_id, c.op] for c in self._entries],
+            }
+
+    def load(self, data: dict) -> None:
+        # takes over another process's log, keeping this one's size
+        entries = [Change(v, movie_id, op) for v, movie_id, op in data["entries"]]
+        with self._lock:
+            self.floor = data["floor"]
+            self._entries.clear()
+            self._entries.extend(entries)
+            dropped = len(entries) - len(self._entries)
+            if dropped > 0:
+                self.floor = entries[dropped - 1].version
+
+    def since(self, version: int) -> List[Change] | None:
+        """Latest change per movie after ``version``, or None if too old."""
+        with self._lock:
+            if version < self.floor:
+                return None
+            entries = list(self._entries)
+
+        first: Dict[int, str] = {}
+        latest: Dict[int, Change] = {}
+        for change in entries:
+            if change.version > version:
+                first.setdefault(change.movie_id, change.op)
+                latest[change.movie_id] = change
+
+        # a reader at ``version`` had the movie unless these changes created
+        # it: insert then update is an insert to them, delete then insert an
+        # update
+        merged = []
+        for change in sorted(latest.values(), key=lambda c: c.version):
+            if not change.deleted:
+                created = first[change.movie_id] == INSERT
+                change = replace(change, op=INSERT if created else UPDATE)
+            merged.append(change)
+        return merged
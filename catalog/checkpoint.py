@@ -0,0 +1,83 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_path_for(catalog_path: str | Path, phase: str) -> Path:
+    path = Path(catalog_path)
+    return path.with_name(f"{path.stem}.{phase}.ckpt.json")
+
+
+@dataclass
+class EnrichCheckpoint:
+    phase: str
+    total: int = 0
+    cursor: int | None = None  # id of the last movie processed
+    # (id, title): a movie renamed since is done again
+    completed: set[tuple[int, str]] = field(default_factory=set)
+    failures: dict[int, str] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "phase": self.phase,
+            "total": self.total,
+            "cursor": self.cursor,
+            "completed": [list(entry) for entry in sorted(self.completed)],
+            "failures": {str(k): v for k, v in self.failures.items()},
+        }
+
+    def retain(self, entries: set[tuple[int, str]]) -> None:
+        # movies deleted, renamed or no longer needing this phase since the
+        # last run
+        ids = {movie_id for movie_id, _ in entries}
+        self.completed &= entries
+        self.failures = {k: v for k, v in self.failures.items() if k in ids}
+
+    def rotate(self) -> None:
+        # the run got through every movie: the next one starts over, and
+        # only this run's failures are kept
+        self.cursor = None
+        self.completed.clear()
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        tmp.replace(path)
+        logger.debug("Saved %s checkpoint at %s: %s", self.phase, self.cursor, path)
+
+    @classmethod
+    def load(cls, path: Path | None, phase: str) -> "EnrichCheckpoint":
+        if path is None or not path.is_file():
+            return cls(phase=phase)
+
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if raw.get("phase") != phase:
+                raise ValueError(f"Checkpoint is for phase {raw.get('phase')!r}")
+            ckpt = cls(
+                phase=phase,
+                total=int(raw.get("total", 0)),
+                cursor=raw.get("cursor"),
+                completed={(int(i), str(t)) for i, t in raw.get("completed", [])},
+                failures={int(k): v for k, v in raw.get("failures", {}).items()},
+            )
+        except (ValueError, TypeError, AttributeError):
+            logger.warning("Ignoring unreadable checkpoint: %s", path, exc_info=True)
+            return cls(phase=phase)
+
+        logger.info(
+            "Resuming %s from checkpoint: %d completed, %d failed",
+            phase,
+            len(ckpt.completed),
+            len(ckpt.failures),
+        )
+        return ckpt
+
+    @staticmethod
+    def clear(path: Path | None) -> None:
+        if path is not None:
+            path.unlink(missing_ok=True)
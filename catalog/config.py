@@ -3,10 +3,106 @@ from pathlib import Path
 
 
 class Config:
-    CATALOG_PATH: str = str(Path.home() / "catalog.json")
+    CATALOG_PATH: str = os.getenv("CATALOG_PATH", str(Path.home() / "catalog.json"))
     API_KEY: str = os.getenv("API_KEY", "changeme")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-jwt-secret")
     JWT_ACCESS_TOKEN_EXPIRES = False  # timedelta(minutes=60)
+    # verified tokens are trusted for at most this long without re-checking
+    JWT_CLAIMS_CACHE_SIZE: int = 1024
+    JWT_CLAIMS_CACHE_TTL: float = 300.0
     MAX_CONCURRENCY: int = 5
+    OMDB_RETRY_ATTEMPTS: int = 3
+    OMDB_RETRY_BASE_DELAY: float = 0.2
+    OMDB_RETRY_MAX_DELAY: float = 5.0
+    OMDB_REQUEST_TIMEOUT: float = 10.0
+    ENRICH_DEADLINE: float | None = 120.0
+    ENRICH_BATCH_SIZE: int = 200
+    # serve from a packed, mmap'd snapshot shared by all worker processes
+    CATALOG_SNAPSHOT: bool = os.getenv("CATALOG_SNAPSHOT", "") in ("1", "true")
+    # reload the catalog when another process rewrites CATALOG_PATH
+    CATALOG_WATCH: bool = os.getenv("CATALOG_WATCH", "") in ("1", "true")
+    CATALOG_WATCH_INTERVAL: float = 1.0
+    CATALOG_WATCH_DEBOUNCE: float = 0.5
+    # false when a preforking server starts them per worker after fork
+    START_BACKGROUND_TASKS: bool = True
+    JOBS_PATH: str | None = None  # defaults to <catalog>.jobs.json
+    JOBS_MAX_RUNNING: int = 1
+    JOBS_MAX_QUEUED: int = 10
+    BULK_MAX_ITEMS: int = 1000
+    CHANGE_LOG_SIZE: int = 10_000
+    CHANGES_RATE_LIMIT: str = os.getenv("CHANGES_RATE_LIMIT", "120 per minute")
+    # base URL of a primary; when set this instance is a read-only follower
+    REPLICA_OF: str | None = os.getenv("REPLICA_OF")
+    REPLICA_POLL_INTERVAL: float = float(os.getenv("REPLICA_POLL_INTERVAL", "1.0"))
+    REPLICA_CA_FILE: str | None = os.getenv("REPLICA_CA_FILE")
+    REPLICA_TOKEN_TTL: int = 300  # seconds; refreshed when the primary says 401
+    # load shedding: heavy requests (imports, exports, enrichment, bulk) get
+    # 503 + Retry-After while reads miss their latency or queue-time SLO;
+    # any class over its in-flight cap (0 = no cap) is rejected
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_READS: int = 0
+    ADMISSION_MAX_WRITES: int = 32
+    ADMISSION_MAX_HEAVY: int = 2
+    ADMISSION_LATENCY_SLO: float = 0.25  # seconds, moving average of reads
+    ADMISSION_QUEUE_SLO: float = 0.1  # seconds, from X-Request-Start
+    # only when the proxy in front sets (and overwrites) X-Request-Start;
+    # otherwise any client could claim its request waited for hours
+    ADMISSION_TRUST_REQUEST_START: bool = os.getenv(
+        "ADMISSION_TRUST_REQUEST_START", ""
+    ) in ("1", "true")
+    ADMISSION_RETRY_AFTER: int = 5
+    RESPONSE_CACHE_ENABLED: bool = True
+    # JSON lines, written from a background thread; when LOG_QUEUE_SIZE
+    # records are waiting, DEBUG/INFO are dropped and WARNING+ wait up to
+    # LOG_QUEUE_BLOCK seconds
+    LOG_FILE: str = os.getenv("LOG_FILE", "logs/app.log")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG")
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_QUEUE_BLOCK: float = 1.0
+    # per-endpoint latency/size histograms, Prometheus text at METRICS_PATH
+    METRICS_ENABLED: bool = True
+    METRICS_PATH: str = "/metrics"
+    # scrapers send it as a bearer token; without one they need the API key
+    METRICS_TOKEN: str | None = os.getenv("METRICS_TOKEN")
+    # metrics are per process: with several workers, each writes its samples
+    # here every METRICS_WRITE_INTERVAL seconds and a scrape merges them all
+    METRICS_DIR: str | None = os.getenv("METRICS_DIR")
+    METRICS_WRITE_INTERVAL: float = 5.0
+    # fraction of requests traced; spans go to TRACE_OTLP_ENDPOINT (OTLP/HTTP
+    # JSON, e.g. http://localhost:4318/v1/traces) or else to TRACE_FILE
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    TRACE_FILE: str | None = os.getenv("TRACE_FILE", "logs/traces.jsonl")
+    TRACE_OTLP_ENDPOINT: str | None = os.getenv("TRACE_OTLP_ENDPOINT")
+    # cProfile of single requests: admins send PROFILE_HEADER, or every
+    # PROFILE_SAMPLE_EVERY-th request is profiled (0 = off); listed and
+    # summarised under /admin/profiles
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_SAMPLE_EVERY: int = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+    PROFILE_KEEP: int = 50
+    # gzip/deflate by Accept-Encoding; bodies under COMPRESS_MIN_SIZE are
+    # sent as is, streamed responses are always compressed
+    COMPRESS_ENABLED: bool = True
+    COMPRESS_LEVEL: int = int(os.getenv("COMPRESS_LEVEL", "6"))
+    COMPRESS_MIN_SIZE: int = 1024
+    COMPRESS_MIMETYPES: tuple = (
+        "application/json",
+        "application/msgpack",
+        "application/cbor",
+        "text/",
+    )
+    # compressed bodies by ETag, so unchanged popular lists compress once
+    COMPRESS_CACHE_SIZE: int = 256
+    COMPRESS_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # any flask-caching backend works, e.g. CACHE_TYPE=RedisCache with
+    # CACHE_REDIS_URL to share entries between workers
+    CACHE_TYPE: str = os.getenv("CACHE_TYPE", "catalog.cache_backend.LRUCache")
+    CACHE_REDIS_URL: str | None = os.getenv("CACHE_REDIS_URL")
+    CACHE_DEFAULT_TIMEOUT: int = 300
+    CACHE_THRESHOLD: int = 1024
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
     RATELIMIT_DEFAULT = os.getenv("RATELIMIT_DEFAULT", "3 per minute")
+    # memory:// is per process; sqlite:///path/limits.db is shared by all
+    # workers on the host
     RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+    RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "fixed-window")
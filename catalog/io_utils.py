@@ -3,13 +3,15 @@ import json
 import logging
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Literal, Sequence
+from typing import Iterator, Literal, Sequence
 
 from .models import Catalog, Movie
+from .tracing import traced, tracer
 
 logger = logging.getLogger(__name__)
 
 
+@traced()
 def export_catalog_to_csv(catalog: Catalog, path: Path | str | None = None) -> Path:
     if isinstance(path, str):
         path = Path(path)
@@ -44,20 +46,7 @@ def export_catalog_to_csv(catalog: Catalog, path: Path | str | None = None) -> P
     return path
 
 
-def import_catalog_from_csv(path: Path | None = None) -> "Catalog":
-    logger.debug("Importing catalog from CSV: %s", path)
-    if path is None:
-        path = Path.home() / "catalog.csv"
-
-    if path.suffix.lower() != ".csv":
-        logger.error("Path doesn't end with .csv")
-        raise ValueError("CSV path must end with .csv")
-
-    if not path.is_file() or path.stat().st_size == 0:
-        logger.warning("CSV file missing/empty, returning empty catalog: %s", path)
-        return Catalog()
-
-    cat = Catalog()
+def read_csv_rows(path: Path) -> Iterator[dict]:
     with path.open(mode="r", newline="", encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
         required = {"id", "title", "year", "genres", "rating", "tags"}
@@ -67,7 +56,7 @@ def import_catalog_from_csv(path: Path | None = None) -> "Catalog":
             raise ValueError(f"CSV missing columns: {missing}")
 
         for row in reader:
-            movie_data = {
+            yield {
                 "id": int(row["id"]),
                 "title": row["title"],
                 "year": int(row["year"]),
@@ -75,11 +64,33 @@ def import_catalog_from_csv(path: Path | None = None) -> "Catalog":
                 "rating": float(row["rating"]),
                 "tags": row["tags"].split("|") if row["tags"] else [],
             }
-            cat.add_movie(Movie.from_dict(movie_data))
+
+
+@traced()
+def import_catalog_from_csv(path: Path | None = None) -> "Catalog":
+    logger.debug("Importing catalog from CSV: %s", path)
+    if path is None:
+        path = Path.home() / "catalog.csv"
+
+    if path.suffix.lower() != ".csv":
+        logger.error("Path doesn't end with .csv")
+        raise ValueError("CSV path must end with .csv")
+
+    if not path.is_file() or path.stat().st_size == 0:
+        logger.warning("CSV file missing/empty, returning empty catalog: %s", path)
+        return Catalog()
+
+    # one span for both: rows become movies as they stream through, and are
+    # never all held as dicts next to the movies
+    with tracer.span("parse_csv", bytes=path.stat().st_size) as span:
+        cat = Catalog()
+        cat.extend(Movie.from_dict(movie_data) for movie_data in read_csv_rows(path))
+        span.set(rows=len(cat))
 
     return cat
 
 
+@traced()
 def export_catalog_to_json(catalog: Catalog, path: Path | str | None = None) -> Path:
     if isinstance(path, str):
         path = Path(path)
@@ -88,7 +99,7 @@ def export_catalog_to_json(catalog: Catalog, path: Path | str | None = None) ->
     try:
         if path is None:
             path = Path.home() / "catalog.json"
-            logger.warning(f"No path specified, using default path: {str(path)}")
+            logger.warning("No path specified, using default path: %s", path)
 
         if path.suffix.lower() != ".json":
             path = path.with_suffix(".json")
@@ -96,9 +107,13 @@ def export_catalog_to_json(catalog: Catalog, path: Path | str | None = None) ->
 
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        tmp.write_text(catalog.to_json(), encoding="utf-8")
-        tmp.replace(path)
+        with tracer.span("serialize_json", movies=len(catalog)) as span:
+            data = catalog.to_json()
+            span.set(chars=len(data))
+        with tracer.span("write_file"):
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            tmp.replace(path)
     except Exception:
         logger.exception("Failed to export catalog to JSON at %s", path)
         raise
@@ -107,6 +122,7 @@ def export_catalog_to_json(catalog: Catalog, path: Path | str | None = None) ->
     return path
 
 
+@traced()
 def import_catalog_from_json(path: Path | None = None) -> "Catalog":
     if path is None:
         path = Path.home() / "catalog.json"
@@ -120,7 +136,8 @@ def import_catalog_from_json(path: Path | None = None) -> "Catalog":
         return Catalog()
 
     try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
+        with tracer.span("parse_json", bytes=path.stat().st_size):
+            raw = json.loads(path.read_text(encoding="utf-8"))
     except json.JSONDecodeError as err:
         logger.exception("The file is not a valid JSON format")
         raise ValueError("Not a valid JSON file") from err
@@ -129,7 +146,8 @@ def import_catalog_from_json(path: Path | None = None) -> "Catalog":
         logger.error("The file should contain a list of objects, but didn't.")
         raise ValueError(f"Expected list of movies in {path}")
 
-    return Catalog.from_json(raw)
+    with tracer.span("build_movies", rows=len(raw)):
+        return Catalog.from_json(raw)
 
 
 @contextmanager
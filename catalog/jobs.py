@@ -0,0 +1,372 @@
+import fcntl
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+from catalog.watcher import file_stamp
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+ProgressFn = Callable[[int, int, int], None]
+JobRunner = Callable[["Job", ProgressFn, threading.Event], dict]
+
+
+class JobLimitError(RuntimeError):
+    pass
+
+
+class JobConflictError(RuntimeError):
+    def __init__(self, job: "Job"):
+        super().__init__(f"A {job.kind} job is already {job.status}: {job.id}")
+        self.job = job
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: dict = field(default_factory=dict)
+    status: str = QUEUED
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    resumed_from: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    result: dict | None = None
+    cancel_requested: bool = False
+
+    @property
+    def eta(self) -> float | None:
+        processed = self.done - self.resumed_from
+        if self.status != RUNNING or not self.started_at or processed <= 0:
+            return None
+        rate = processed / (time.time() - self.started_at)
+        return round((self.total - self.done) / rate, 1)
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "eta": self.eta}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        data = {k: v for k, v in data.items() if k != "eta"}
+        return cls(**data)
+
+
+class JobManager:
+    # Processes sharing the jobs file (gunicorn workers) share its jobs: every
+    # change is made under a flock on the file, after taking in what the
+    # others wrote. One of them runs the jobs; the others are delegate()d:
+    # they only record submissions and cancellations, which the runner picks
+    # up from the file.
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_running: int = 1,
+        max_queued: int = 10,
+        history: int = 100,
+        poll_interval: float = 1.0,
+    ):
+        self.path = path
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.history = history
+        self.poll_interval = poll_interval
+        self.runs_jobs = True
+        self._runners: Dict[str, JobRunner] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._futures: Dict[str, Future] = {}
+        self._cancel: Dict[str, threading.Event] = {}
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._queue: "queue.Queue[tuple[Job, Future]]" = queue.Queue()
+        self._workers: list[threading.Thread] = []
+        self._written: tuple | None = None
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._jobs = self._read()
+
+    def register(self, kind: str, runner: JobRunner) -> None:
+        self._runners[kind] = runner
+
+    def submit(self, kind: str, params: dict | None = None) -> Job:
+        if kind not in self._runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._locked():
+            self._merge()
+            active = [j for j in self._jobs.values() if j.status in ACTIVE_STATES]
+            for other in active:
+                # two jobs of one kind would fight over the same checkpoint
+                if other.kind == kind:
+                    raise JobConflictError(other)
+            if len(active) >= self.max_running + self.max_queued:
+                raise JobLimitError("Too many jobs queued, try again later")
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=params or {})
+            self._jobs[job.id] = job
+            if self.runs_jobs:
+                self._enqueue(job)
+            self._save()
+        logger.info("Queued %s job %s", kind, job.id)
+        return job
+
+    def delegate(self) -> None:
+        # another process sharing the file runs the jobs
+        self.runs_jobs = False
+
+    def resume(self) -> None:
+        with self._locked():
+            # the file may be newer than what this process loaded, e.g. in a
+            # master process before it forked this one
+            jobs = self._read()
+            jobs.update({i: j for i, j in self._jobs.items() if i in self._futures})
+            self._jobs = jobs
+            for job in self._jobs.values():
+                if job.status in ACTIVE_STATES and job.id not in self._futures:
+                    logger.info("Resuming %s job %s after restart", job.kind, job.id)
+                    job.status = QUEUED
+                    self._enqueue(job)
+            self._save()
+
+        if self.path is not None and self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch,
+                args=(self.path,),
+                name="catalog-jobs-watch",
+                daemon=True,
+            )
+            self._watcher.start()
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._merge()
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        with self._lock:
+            self._merge()
+            return self._sorted()
+
+    def cancel(self, job_id: str) -> Job | None:
+        with self._locked():
+            self._merge()
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATES:
+                return job
+
+            if self.runs_jobs:
+                self._request_cancel(job)
+                self._prune()
+            else:
+                job.cancel_requested = True
+            self._save()
+            logger.info("Cancellation requested for job %s", job_id)
+            return job
+
+    def wait(self, job_id: str, timeout: float | None = None) -> Job | None:
+        future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        return self.get(job_id)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        with self._lock:
+            for event in self._cancel.values():
+                event.set()
+            for future in self._futures.values():
+                future.cancel()
+
+    def _enqueue(self, job: Job) -> None:
+        future: Future = Future()
+        self._cancel[job.id] = threading.Event()
+        self._futures[job.id] = future
+        self._queue.put((job, future))
+
+        # daemon workers, started lazily: an interrupted job is picked up
+        # again from its checkpoint by resume() on the next start
+        if len(self._workers) < self.max_running:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"catalog-job-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self) -> None:
+        while True:
+            job, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._run(job)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(job)
+
+    def _run(self, job: Job) -> None:
+        cancelled = self._cancel[job.id]
+        with self._lock:
+            if cancelled.is_set():
+                self._finish(job, CANCELLED)
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._save()
+
+        first_report = True
+
+        def progress(done: int, total: int, failed: int) -> None:
+            nonlocal first_report
+            with self._lock:
+                if first_report:
+                    # work skipped thanks to a checkpoint doesn't count for the ETA
+                    job.resumed_from = done
+                    first_report = False
+                job.done, job.total, job.failed = done, total, failed
+                self._save()
+
+        try:
+            job.result = self._runners[job.kind](job, progress, cancelled)
+        except Exception as exc:
+            logger.exception("Job %s failed", job.id)
+            with self._lock:
+                job.error = str(exc) or type(exc).__name__
+                self._finish(job, FAILED)
+            return
+
+        with self._lock:
+            self._finish(job, CANCELLED if cancelled.is_set() else SUCCEEDED)
+        logger.info("Job %s finished as %s", job.id, job.status)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        self._prune()
+        self._save()
+
+    def _request_cancel(self, job: Job) -> None:
+        job.cancel_requested = True
+        self._cancel[job.id].set()
+        if self._futures[job.id].cancel():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+
+    def _sorted(self) -> list[Job]:
+        return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def _prune(self) -> None:
+        finished = [j for j in self._sorted() if j.status not in ACTIVE_STATES]
+        for job in finished[self.history :]:
+            del self._jobs[job.id]
+            self._futures.pop(job.id, None)
+            self._cancel.pop(job.id, None)
+
+    def _watch(self, path: Path) -> None:
+        # picks up jobs submitted, or cancelled, by the other processes
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if file_stamp(path) != self._written:
+                    with self._lock:
+                        self._merge()
+            except Exception:
+                logger.exception("Polling the jobs file failed")
+
+    def _merge(self) -> None:
+        # takes in what other processes wrote; callers hold _lock
+        if self.path is None:
+            return
+        if not self.runs_jobs:
+            self._jobs = self._read()
+            return
+        for job in self._read().values():
+            mine = self._jobs.get(job.id)
+            if mine is None:
+                # pruned here, or submitted by a delegate
+                if job.status in ACTIVE_STATES:
+                    logger.info("Picked up %s job %s", job.kind, job.id)
+                    self._jobs[job.id] = job
+                    self._enqueue(job)
+            elif job.cancel_requested and mine.status in ACTIVE_STATES:
+                self._request_cancel(mine)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # _lock for the threads of this process, a flock on a sidecar file
+        # for the other processes; re-entrant like _lock
+        with self._lock:
+            if self.path is None or self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(
+                self.path.with_name(self.path.name + ".lock"),
+                os.O_RDWR | os.O_CREAT,
+                0o644,
+            )
+            self._depth += 1
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                self._depth -= 1
+                os.close(fd)
+
+    def _read(self) -> Dict[str, Job]:
+        if self.path is None or not self.path.is_file():
+            return {}
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            return {d["id"]: Job.from_dict(d) for d in raw}
+        except (ValueError, TypeError, KeyError):
+            logger.warning(
+                "Ignoring unreadable jobs file: %s", self.path, exc_info=True
+            )
+            return {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        with self._locked():
+            if self.runs_jobs:
+                # a delegate merged before making its change
+                self._merge()
+            # one tmp file per process, they share the directory
+            tmp = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps([asdict(j) for j in self._jobs.values()]), encoding="utf-8"
+            )
+            tmp.replace(self.path)
+            self._written = file_stamp(self.path)
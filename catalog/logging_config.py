@@ -1,29 +1,184 @@
+"""Logging setup: request threads hand records to a queue, nothing more.
+
+A listener thread formats them and does the file writes and rotation. The
+queue is bounded: when it is full, records below WARNING are dropped (and
+counted in ``log_records_dropped_total``) while WARNING and above wait up
+to ``block_timeout`` seconds for room. The file gets one JSON object per
+line; both outputs carry the id of the request that logged the record.
+"""
+
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from queue import Full, Queue
+
+from catalog.metrics import REGISTRY
+
+# set per request by the API; "-" outside of one
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "Log records dropped on a full queue", ["level"]
+)
+
+
+_TRACEBACKS = logging.Formatter()
+
 
+class JsonFormatter(logging.Formatter):
+    # runs on the listener thread only, so the per-second timestamp cache
+    # needs no lock
+    _second = -1
+    _stamp = ""
 
-def configure_logging(log_file: str = "logs/app.log") -> None:
-    log_path = Path(log_file)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+    def format(self, record: logging.LogRecord) -> str:
+        second = int(record.created)
+        if second != self._second:
+            self._second = second
+            self._stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        entry = {
+            "time": f"{self._stamp}.{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        rid = getattr(record, "request_id", "-")
+        if rid != "-":
+            entry["request_id"] = rid
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
 
-    root = logging.getLogger()
-    root.setLevel(logging.DEBUG)
 
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    ch.setFormatter(
-        logging.Formatter("%(asctime)s %(levelname)-8s [%(name)s] %(message)s")
-    )
-    root.addHandler(ch)
+class BoundedQueueHandler(QueueHandler):
+    queue: Queue
 
-    fh = RotatingFileHandler(
-        filename=log_file, maxBytes=5_000_000, backupCount=3, encoding="utf-8"
-    )
-    fh.setLevel(logging.DEBUG)
-    fh.setFormatter(
-        logging.Formatter(
-            "%(asctime)s %(levelname)-8s [%(name)s:%(lineno)d] %(message)s"
+    def __init__(self, q: Queue, block_timeout: float = 1.0):
+        super().__init__(q)
+        self.block_timeout = block_timeout
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # only what cannot wait for the listener: the message while its args
+        # still hold these values, the traceback while its frames exist,
+        # and the request id, which lives in this thread's context. On a
+        # copy, as other handlers get the same record.
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        if record.args:
+            record.msg, record.args = record.getMessage(), None
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except Full:
+            DROPPED.inc(level=record.levelname)
+
+
+class _Pipeline:
+    def __init__(
+        self, log_file: str, level: int, queue_size: int, block_timeout: float
+    ):
+        self.key = (log_file, level, queue_size, block_timeout)
+
+        console = logging.StreamHandler()
+        console.setLevel(logging.INFO)
+        console.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(levelname)-8s [%(name)s] [%(request_id)s] %(message)s"
+            )
+        )
+        file = RotatingFileHandler(
+            filename=log_file, maxBytes=5_000_000, backupCount=3, encoding="utf-8"
         )
-    )
-    root.addHandler(fh)
+        file.setLevel(level)
+        file.setFormatter(JsonFormatter())
+        self.handlers = (console, file)
+
+        self.queue_size = queue_size
+        self.handler = BoundedQueueHandler(Queue(queue_size), block_timeout)
+        self.listener: QueueListener | None = None
+
+    def start(self) -> None:
+        # a fresh queue every time: after a fork the inherited one may hold
+        # records and locks of threads that do not exist in the child
+        self.handler.queue = Queue(self.queue_size)
+        self.listener = QueueListener(
+            self.handler.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()  # drains what is queued
+            self.listener = None
+        for handler in self.handlers:
+            handler.close()
+
+
+_pipeline: _Pipeline | None = None
+_install_lock = threading.Lock()
+
+
+def configure_logging(
+    log_file: str = "logs/app.log",
+    level: int | str = logging.DEBUG,
+    queue_size: int = 10_000,
+    block_timeout: float = 1.0,
+) -> None:
+    """Install the queue pipeline on the root logger; repeat calls are no-ops."""
+    global _pipeline
+    if isinstance(level, str):
+        name, level = level, logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {name}")
+    key = (log_file, level, queue_size, block_timeout)
+    with _install_lock:
+        if _pipeline is not None and _pipeline.key == key:
+            return
+        root = logging.getLogger()
+        if _pipeline is not None:
+            root.removeHandler(_pipeline.handler)
+            _pipeline.stop()
+
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        _pipeline = _Pipeline(log_file, level, queue_size, block_timeout)
+        _pipeline.start()
+        root.addHandler(_pipeline.handler)
+        # no lower than the most verbose handler, so disabled levels are
+        # rejected before a record is even built
+        root.setLevel(min(level, logging.INFO))
+
+
+def shutdown_logging() -> None:
+    global _pipeline
+    with _install_lock:
+        if _pipeline is not None:
+            logging.getLogger().removeHandler(_pipeline.handler)
+            _pipeline.stop()
+            _pipeline = None
+
+
+def _restart_in_child() -> None:
+    if _pipeline is not None:
+        _pipeline.start()
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -1,18 +1,167 @@
+import argparse
+import fcntl
+import logging
+import os
 from pathlib import Path
 
-from catalog.api.api import create_app
+from catalog.api.api import create_app, start_background_tasks
+from catalog.api.my_flask import Flask
+from catalog.config import Config
+from catalog.services import load_catalog
+from catalog.snapshot import load_packed_catalog
+from catalog.watcher import file_stamp
 
+logger = logging.getLogger(__name__)
 
-def main():
-    app = create_app()
-    base = Path(__file__).resolve().parent.parent  # project root
-    cert = base / "certs" / "server.crt"
-    key = base / "certs" / "server.key"
-    app.run(
-        host="127.0.0.1",
-        port=5000,
-        ssl_context=(str(cert), str(key)),
+BASE = Path(__file__).resolve().parent.parent  # project root
+CERT = BASE / "certs" / "server.crt"
+KEY = BASE / "certs" / "server.key"
+
+
+def _claim_jobs(app: Flask):
+    # every worker has its own JobManager over the same jobs file; only the
+    # worker holding this lock runs jobs, including interrupted ones. The fd
+    # is kept open for the life of the worker, so the lock moves on when it
+    # exits.
+    if app.jobs.path is None:
+        return None
+    fd = os.open(app.jobs.path.with_suffix(".lock"), os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _metrics_dir() -> Path:
+    return Path(Config.METRICS_DIR or Path(Config.CATALOG_PATH).with_suffix(".metrics"))
+
+
+def _serve_gunicorn(args: argparse.Namespace, tls: tuple[str, str] | None) -> None:
+    from gunicorn.app.base import BaseApplication  # type: ignore[import-untyped]
+
+    state: dict = {}
+
+    def load_app() -> Flask:
+        config: dict = {"START_BACKGROUND_TASKS": False}
+        if args.workers > 1:
+            # workers only see each other's writes through the file
+            config["CATALOG_WATCH"] = True
+            if Config.RATELIMIT_STORAGE_URI == "memory://":
+                # per-worker counters would give every client N times the limit
+                limits_db = Path(Config.CATALOG_PATH).with_suffix(".limits.db")
+                config["RATELIMIT_STORAGE_URI"] = f"sqlite:///{limits_db}"
+            if not Config.METRICS_DIR:
+                # so a scrape of any worker covers all of them
+                config["METRICS_DIR"] = str(_metrics_dir())
+        app = create_app(config)
+        state["stamp"] = file_stamp(app.config["CATALOG_PATH"])
+        return app
+
+    def on_starting(server) -> None:
+        # samples left by the workers of a previous run would be added in
+        if args.workers > 1:
+            for path in _metrics_dir().glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def post_worker_init(worker) -> None:
+        app: Flask = worker.wsgi
+        path = app.config["CATALOG_PATH"]
+        # a preloaded catalog is shared with the master (copy-on-write, or
+        # through the mmap'd snapshot); if other workers saved since the
+        # master loaded it, start from disk
+        if file_stamp(path) != state.get("stamp"):
+            if app.watcher:
+                # under the write lock, with the versions saved alongside
+                app.watcher.reload()
+            else:
+                if app.config["CATALOG_SNAPSHOT"]:
+                    fresh = load_packed_catalog(path)
+                else:
+                    fresh = load_catalog(path)
+                fresh.continue_from(app.catalog)
+                app.catalog = fresh
+        claimed = _claim_jobs(app) is not None
+        if not claimed:
+            # jobs submitted here are run by the worker holding the claim
+            app.jobs.delegate()
+        if app.follower or claimed:
+            start_background_tasks(app)
+        logger.info("Worker %s ready", worker.pid)
+
+    def worker_exit(server, worker) -> None:
+        app = getattr(worker, "wsgi", None)
+        if isinstance(app, Flask):
+            if app.follower:
+                app.follower.stop(timeout=5)
+            if app.watcher:
+                app.watcher.stop(timeout=5)
+            app.jobs.shutdown()
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread" if args.threads > 1 else "sync",
+        "preload_app": args.preload,
+        "graceful_timeout": args.graceful_timeout,
+        "timeout": args.timeout,
+        "on_starting": on_starting,
+        "post_worker_init": post_worker_init,
+        "worker_exit": worker_exit,
+    }
+    if tls:
+        options["certfile"], options["keyfile"] = tls
+
+    class CatalogServer(BaseApplication):
+        # SIGHUP: reload config and replace workers gracefully.
+        # SIGTERM: stop accepting, let in-flight requests finish within
+        # graceful_timeout, then exit.
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    CatalogServer().run()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Serve the movie catalog API")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
+    parser.add_argument("--threads", type=int, default=int(os.getenv("THREADS", "4")))
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="load the catalog once in the master and fork workers from it",
+    )
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    parser.add_argument("--timeout", type=int, default=60)
+    parser.add_argument("--no-tls", action="store_true")
+    parser.add_argument(
+        "--dev", action="store_true", help="use the Flask development server"
     )
+    args = parser.parse_args(argv)
+
+    tls = None if args.no_tls else (str(CERT), str(KEY))
+    if args.dev:
+        app = create_app()
+        app.run(host=args.host, port=args.port, ssl_context=tls)
+        return
+
+    try:
+        import gunicorn  # type: ignore[import-untyped]  # noqa: F401
+    except ImportError:
+        parser.error("gunicorn is required: pip install 'movie-catalog[server]'")
+    _serve_gunicorn(args, tls)
 
 
 if __name__ == "__main__":
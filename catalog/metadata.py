@@ -1,112 +1,398 @@
 import asyncio
 import logging
 import os
-from typing import Dict
-from urllib.parse import quote_plus
+import time
+from contextlib import AbstractContextManager, AsyncExitStack, nullcontext
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Coroutine, Dict, TypeVar, cast
+from urllib.parse import urlencode
 
 import aiohttp
 from dotenv import load_dotenv
 
-from catalog.models import Catalog
+from catalog.checkpoint import EnrichCheckpoint
+from catalog.metrics import REGISTRY
+from catalog.models import Catalog, Movie
+from catalog.resilience import CircuitBreaker, RetryPolicy, call_with_retry
+from catalog.singleflight import SingleFlight
+from catalog.tracing import tracer
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+DEFAULT_OMDB_BASE_URL = "https://www.omdbapi.com"
+DEADLINE_EXCEEDED = "Enrichment deadline exceeded"
+
+omdb_breaker = CircuitBreaker()
+omdb_flight = SingleFlight("omdb")
+
+PHASE_SECONDS = REGISTRY.histogram(
+    "enrich_phase_seconds",
+    "Duration of enrichment phases",
+    ["phase"],
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+
+
+@dataclass
+class EnrichReport:
+    updated: int = 0
+    failed: Dict[int, str] = field(default_factory=dict)
+    skipped: int = 0
+    stopped: bool = False
+
+
+def omdb_base_url() -> str:
+    return os.getenv("OMDB_BASE_URL", DEFAULT_OMDB_BASE_URL).rstrip("/")
+
+
+async def _omdb_get(params: Dict[str, str], session: aiohttp.ClientSession) -> Dict:
+    # identical lookups share one request, even across concurrent enrich runs;
+    # the api key is the same for everyone so it stays out of the key
+    key = tuple(sorted(params.items()))
+
+    async def request() -> Dict:
+        query = urlencode({**params, "apikey": os.getenv("OMDB_API_KEY")})
+        async with session.get(f"{omdb_base_url()}/?{query}") as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    with tracer.span("omdb.get", lookup=",".join(sorted(params))):
+        return await omdb_flight.do(key, request)
+
 
 async def fetch_metadata(imdb_id: str, session: aiohttp.ClientSession) -> Dict:
-    url = f"https://www.omdbapi.com/?i={imdb_id}&apikey={os.getenv('OMDB_API_KEY')}"
-    async with session.get(url) as resp:
-        resp.raise_for_status()
-        return await resp.json()
+    return await _omdb_get({"i": imdb_id}, session)
 
 
-async def _enrich_all(imdb_ids: list[str], max_concurrency: int = 5) -> Dict[str, Dict]:
+async def _gather_bounded(
+    keys: list[str],
+    fetch: Callable[[str], Awaitable[T]],
+    max_concurrency: int,
+    policy: RetryPolicy,
+) -> Dict[str, T | BaseException]:
     sem = asyncio.Semaphore(max_concurrency)
-    async with aiohttp.ClientSession() as session:
 
-        async def sem_fetch(iid: str):
-            async with sem:
-                return iid, await fetch_metadata(iid, session)
-
-        tasks = [asyncio.create_task(sem_fetch(iid)) for iid in imdb_ids]
-        results: list[tuple[str, Dict]] = await asyncio.gather(*tasks)
-
-        meta = {}
-        for iid, payload in results:
-            if isinstance(payload, Exception):
-                logger.warning("Error fetching metadata for %s: %s", iid, payload)
-                meta[iid] = {"error": str(payload)}
-            else:
-                meta[iid] = payload
-        return meta
-
-
-def enrich_catalog(catalog: Catalog, max_concurrency: int = 5) -> int:
-    imdb_ids = [m.imdb_id for m in catalog if m.imdb_id]
-    metadata = asyncio.run(_enrich_all(imdb_ids, max_concurrency))
-    enriched_count = 0
-    for movie in catalog:
-        data = metadata.get(movie.imdb_id, {})
-        if "error" in data:
-            logger.warning("No movie metadata for %s: %s", movie.imdb_id, data["error"])
+    async def sem_fetch(key: str) -> T:
+        async with sem:
+            return await call_with_retry(lambda: fetch(key), policy, omdb_breaker)
+
+    tasks = {key: asyncio.create_task(sem_fetch(key)) for key in keys}
+    if not tasks:
+        return {}
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=policy.deadline)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results: Dict[str, T | BaseException] = {}
+    for key, task in tasks.items():
+        if task in pending:
+            results[key] = asyncio.TimeoutError(DEADLINE_EXCEEDED)
+        elif task.exception() is not None:
+            results[key] = cast(BaseException, task.exception())
+        else:
+            results[key] = task.result()
+    return results
+
+
+async def _enrich_all(
+    imdb_ids: list[str],
+    max_concurrency: int = 5,
+    policy: RetryPolicy | None = None,
+    session: aiohttp.ClientSession | None = None,
+) -> Dict[str, Dict]:
+    policy = policy or RetryPolicy()
+    unique_ids = list(dict.fromkeys(imdb_ids))
+    async with AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+        client = session
+        results = await _gather_bounded(
+            unique_ids,
+            lambda iid: fetch_metadata(iid, client),
+            max_concurrency,
+            policy,
+        )
+
+    meta = {}
+    for iid, payload in results.items():
+        if isinstance(payload, BaseException):
+            logger.warning("Error fetching metadata for %s: %r", iid, payload)
+            meta[iid] = {"error": str(payload) or type(payload).__name__}
         else:
-            movie.poster = data.get("Poster")
-            movie.plot = data.get("Plot")
-            runtime_str = data.get("Runtime", "")
-            movie.runtime = (
-                int(runtime_str.split()[0])
-                if runtime_str and runtime_str != "N/A"
-                else None
+            meta[iid] = payload
+    return meta
+
+
+def _select_work(candidates: list[Movie], ckpt: EnrichCheckpoint) -> list[Movie]:
+    todo = [m for m in candidates if (m.id, m.title) not in ckpt.completed]
+    # resume right after the cursor, then wrap around to pick up earlier
+    # failures and anything inserted before it since the last run
+    for i, movie in enumerate(todo):
+        if movie.id == ckpt.cursor:
+            return todo[i + 1 :] + todo[: i + 1]
+    return todo
+
+
+async def _run_batches(
+    catalog: Catalog,
+    movies: list[Movie],
+    key: Callable[[Movie], str],
+    fetch: Callable[[list[str], RetryPolicy], Awaitable[Dict[str, Any]]],
+    error_of: Callable[[Any], str | None],
+    changes_for: Callable[[Movie, Any], Dict[str, Any]],
+    policy: RetryPolicy,
+    ckpt: EnrichCheckpoint,
+    checkpoint_path: Path | None,
+    batch_size: int,
+    persist: Callable[[Catalog], object] | None,
+    progress: Callable[[int, int], None] | None,
+    should_stop: Callable[[], bool] | None,
+    write: Callable[[], AbstractContextManager[Catalog]] | None = None,
+) -> EnrichReport:
+    report = EnrichReport()
+    started = time.monotonic()
+
+    for start in range(0, len(movies), batch_size):
+        if should_stop is not None and should_stop():
+            logger.info("Enrichment stopped with %d movies left", len(movies) - start)
+            report.stopped = True
+            break
+
+        batch = movies[start : start + batch_size]
+        remaining = None
+        if policy.deadline is not None:
+            remaining = policy.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                for movie in movies[start:]:
+                    report.failed[movie.id] = DEADLINE_EXCEEDED
+                break
+
+        with tracer.span("enrich.fetch", movies=len(batch)):
+            results = await fetch(
+                [key(m) for m in batch], replace(policy, deadline=remaining)
             )
-            enriched_count += 1
+        updates: Dict[int, Dict[str, Any]] = {}
+        for movie in batch:
+            result = results.get(key(movie))
+            error = error_of(result)
+            if error is not None:
+                report.failed[movie.id] = ckpt.failures[movie.id] = error
+                continue
+            changes = changes_for(movie, result)
+            if changes:
+                updates[movie.id] = changes
+            ckpt.completed.add((movie.id, movie.title))
+            ckpt.failures.pop(movie.id, None)
+        ckpt.cursor = batch[-1].id
+
+        # ``write`` hands out the current catalog under the write lock: the
+        # fetch took a while, and another writer may have saved meanwhile
+        if updates:
+            with write() if write is not None else nullcontext(catalog) as target:
+                for movie_id, changes in updates.items():
+                    if target.update_movie(movie_id, **changes):
+                        report.updated += 1
+                # data first, checkpoint second: a crash in between redoes a
+                # batch instead of losing one
+                if persist is not None:
+                    persist(target)
+        if checkpoint_path is not None:
+            ckpt.save(checkpoint_path)
+        if progress is not None:
+            progress(start + len(batch), len(report.failed))
+
+    return report
+
+
+def _run_checkpointed(
+    catalog: Catalog,
+    phase: str,
+    candidates: list[Movie],
+    run: Callable[..., Coroutine[Any, Any, EnrichReport]],
+    checkpoint_path: Path | None,
+    progress: Callable[[int, int, int], None] | None,
+) -> EnrichReport:
+    ckpt = EnrichCheckpoint.load(checkpoint_path, phase)
+    ckpt.total = len(candidates)
+    ckpt.retain({(m.id, m.title) for m in candidates})
+    work = _select_work(candidates, ckpt)
+    skipped = len(candidates) - len(work)
+
+    batch_progress = None
+    if progress is not None:
+        progress(skipped, len(candidates), 0)
+
+        def batch_progress(processed: int, failed: int) -> None:
+            progress(skipped + processed, len(candidates), failed)
+
+    with tracer.span(
+        f"enrich.{phase}", candidates=len(candidates), skipped=skipped
+    ) as span, PHASE_SECONDS.time(phase=phase):
+        report = asyncio.run(run(work, ckpt, batch_progress))
+        span.set(updated=report.updated, failed=len(report.failed))
+    report.skipped = skipped
+
+    # a run cut short by should_stop or the deadline resumes where it was
+    interrupted = report.stopped or DEADLINE_EXCEEDED in report.failed.values()
+    if checkpoint_path is not None and not interrupted:
+        if ckpt.failures:
+            ckpt.rotate()
+            ckpt.save(checkpoint_path)
+        else:
+            EnrichCheckpoint.clear(checkpoint_path)
+    return report
 
-    return enriched_count
+
+def _metadata_error(data: Dict | None) -> str | None:
+    if data is None:
+        return "No result"
+    return data.get("error")
+
+
+def _metadata_changes(movie: Movie, data: Dict) -> Dict[str, Any]:
+    runtime_str = data.get("Runtime", "")
+    return {
+        "poster": data.get("Poster"),
+        "plot": data.get("Plot"),
+        "runtime": (
+            int(runtime_str.split()[0])
+            if runtime_str and runtime_str != "N/A"
+            else None
+        ),
+    }
+
+
+def enrich_catalog(
+    catalog: Catalog,
+    max_concurrency: int = 5,
+    policy: RetryPolicy | None = None,
+    checkpoint_path: Path | None = None,
+    persist: Callable[[Catalog], object] | None = None,
+    batch_size: int = 200,
+    progress: Callable[[int, int, int], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    write: Callable[[], AbstractContextManager[Catalog]] | None = None,
+) -> EnrichReport:
+    policy = policy or RetryPolicy()
+
+    async def run(
+        work: list[Movie],
+        ckpt: EnrichCheckpoint,
+        batch_progress: Callable[[int, int], None] | None,
+    ) -> EnrichReport:
+        return await _run_batches(
+            catalog,
+            work,
+            key=lambda m: cast(str, m.imdb_id),
+            fetch=lambda ids, p: _enrich_all(ids, max_concurrency, policy=p),
+            error_of=_metadata_error,
+            changes_for=_metadata_changes,
+            policy=policy,
+            ckpt=ckpt,
+            checkpoint_path=checkpoint_path,
+            batch_size=batch_size,
+            persist=persist,
+            progress=batch_progress,
+            should_stop=should_stop,
+            write=write,
+        )
+
+    candidates = [m for m in catalog if m.imdb_id]
+    report = _run_checkpointed(
+        catalog, "metadata", candidates, run, checkpoint_path, progress
+    )
+    for movie_id, error in report.failed.items():
+        logger.warning("No movie metadata for movie %s: %s", movie_id, error)
+    return report
 
 
 async def fetch_id_for_title(title: str, session: aiohttp.ClientSession) -> str | None:
-    encoded = quote_plus(title)
-    url = f"https://www.omdbapi.com/?t={encoded}&apikey={os.getenv('OMDB_API_KEY')}"
-    async with session.get(url) as resp:
-        resp.raise_for_status()
-        data = await resp.json()
-        return data.get("imdbID")
+    data = await _omdb_get({"t": title}, session)
+    return data.get("imdbID")
 
 
 async def _fetch_ids(
-    titles: list[str], max_concurrency: int = 5
-) -> Dict[str, str | None]:
-    sem = asyncio.Semaphore(max_concurrency)
+    titles: list[str],
+    max_concurrency: int = 5,
+    policy: RetryPolicy | None = None,
+) -> Dict[str, str | None | BaseException]:
+    policy = policy or RetryPolicy()
+    unique_titles = list(dict.fromkeys(titles))
     async with aiohttp.ClientSession() as session:
+        results = await _gather_bounded(
+            unique_titles,
+            lambda title: fetch_id_for_title(title, session),
+            max_concurrency,
+            policy,
+        )
+
+    for title, result in results.items():
+        if isinstance(result, BaseException):
+            logger.warning("Error fetching ID for %s: %r", title, result)
+    return results
+
+
+def _id_error(result: str | None | BaseException) -> str | None:
+    if isinstance(result, BaseException):
+        return str(result) or type(result).__name__
+    return None
 
-        async def sem_fetch(title: str):
-            async with sem:
-                return title, await fetch_id_for_title(title, session)
 
-        tasks = [asyncio.create_task(sem_fetch(t)) for t in titles]
-        results: list[tuple[str, str]] = await asyncio.gather(*tasks)
+def _imdb_id_changes(movie: Movie, imdb_id: str | None) -> Dict[str, Any]:
+    if movie.imdb_id == imdb_id:
+        return {}
+    return {"imdb_id": imdb_id}
 
-        id_map: Dict[str, str | None] = {}
-        for title, result in results:
-            if isinstance(result, Exception):
-                logger.warning("Error fetching ID for %s: %s", title, result)
-                id_map[title] = None
-            else:
-                id_map[title] = result
-        return id_map
 
+def fetch_imdb_ids(
+    catalog: Catalog,
+    max_concurrency: int = 5,
+    policy: RetryPolicy | None = None,
+    checkpoint_path: Path | None = None,
+    persist: Callable[[Catalog], object] | None = None,
+    batch_size: int = 200,
+    progress: Callable[[int, int, int], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    write: Callable[[], AbstractContextManager[Catalog]] | None = None,
+) -> EnrichReport:
+    policy = policy or RetryPolicy()
 
-def fetch_imdb_ids(catalog: Catalog, max_concurrency: int = 5) -> int:
-    titles = [m.title for m in catalog]
-    id_map = asyncio.run(_fetch_ids(titles, max_concurrency))
-    updated_count = 0
-    for movie in catalog:
-        if not movie.imdb_id or movie.imdb_id != id_map.get(movie.title):
-            movie.imdb_id = id_map.get(movie.title)
-            updated_count += 1
+    async def run(
+        work: list[Movie],
+        ckpt: EnrichCheckpoint,
+        batch_progress: Callable[[int, int], None] | None,
+    ) -> EnrichReport:
+        return await _run_batches(
+            catalog,
+            work,
+            key=lambda m: m.title,
+            fetch=lambda titles, p: _fetch_ids(titles, max_concurrency, policy=p),
+            # a failed lookup keeps whatever id the movie already had
+            error_of=_id_error,
+            changes_for=_imdb_id_changes,
+            policy=policy,
+            ckpt=ckpt,
+            checkpoint_path=checkpoint_path,
+            batch_size=batch_size,
+            persist=persist,
+            progress=batch_progress,
+            should_stop=should_stop,
+            write=write,
+        )
 
-    return updated_count
+    return _run_checkpointed(
+        catalog, "ids", list(catalog), run, checkpoint_path, progress
+    )
 
 
-def full_enrich(catalog: Catalog, max_concurrency: int = 5) -> None:
-    fetch_imdb_ids(catalog, max_concurrency)
-    enrich_catalog(catalog, max_concurrency)
+def full_enrich(
+    catalog: Catalog, max_concurrency: int = 5, policy: RetryPolicy | None = None
+) -> None:
+    fetch_imdb_ids(catalog, max_concurrency, policy)
+    enrich_catalog(catalog, max_concurrency, policy)
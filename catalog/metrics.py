@@ -0,0 +1,303 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[Dict[str, str], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(dict(zip(self.labelnames, key)), val) for key, val in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: observations per bucket (not cumulative, the last
+        # one is +Inf) and their sum; made cumulative only when exported
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def merge(self, counts: List[int], total: float, **labels: str) -> None:
+        # adds observations counted elsewhere, in the same per-bucket form
+        key = self._key(labels)
+        if len(counts) != len(self.buckets) + 1:
+            raise ValueError(f"{self.name} expects {len(self.buckets) + 1} buckets")
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            for index, count in enumerate(counts):
+                series[0][index] += count
+            series[1][0] += total
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def series(self) -> list[tuple[Dict[str, str], List[int], float]]:
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in self._series.items()]
+        return [
+            (dict(zip(self.labelnames, key)), counts, total)
+            for key, counts, total in items
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labelnames, **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help, tuple(labelnames), **options)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+        if metric.buckets != tuple(sorted(buckets)):
+            raise ValueError(f"Metric {name} already registered with other buckets")
+        return metric
+
+    def collect(self) -> list[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _labels(labels: Dict[str, str], **extra: str) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    escaped = (
+        str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for v in pairs.values()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(pairs, escaped)) + "}"
+
+
+def render_text(registry: "Registry") -> str:
+    """The registry in the Prometheus text exposition format."""
+    lines = []
+    for metric in sorted(registry.collect(), key=lambda m: m.name):
+        help_text = metric.help.replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {metric.name} {help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Histogram):
+            for labels, counts, total in metric.series():
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, math.inf), counts):
+                    cumulative += count
+                    le = _labels(labels, le=_number(bound))
+                    lines.append(f"{metric.name}_bucket{le} {cumulative}")
+                lines.append(f"{metric.name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{metric.name}_count{_labels(labels)} {cumulative}")
+        else:
+            for labels, value in metric.samples():
+                lines.append(f"{metric.name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Each process has its own registry, so behind a preforking server a scrape
+# only sees the worker that answered it. With a metrics directory every
+# worker writes its samples there (SnapshotWriter) and the scraped worker
+# renders them all merged: counters and histograms summed, gauges kept per
+# worker under a "pid" label and dropped once that worker is gone.
+
+
+def snapshot(registry: Registry) -> dict:
+    metrics: dict = {}
+    for metric in registry.collect():
+        entry: dict = {
+            "kind": metric.kind,
+            "help": metric.help,
+            "labelnames": list(metric.labelnames),
+        }
+        if isinstance(metric, Histogram):
+            entry["buckets"] = list(metric.buckets)
+            entry["series"] = [list(s) for s in metric.series()]
+        else:
+            entry["samples"] = [list(s) for s in metric.samples()]
+        metrics[metric.name] = entry
+    return metrics
+
+
+def write_snapshot(
+    registry: Registry, directory: str | Path, pid: int | None = None
+) -> Path:
+    path = Path(directory) / f"{os.getpid() if pid is None else pid}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot(registry)), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(directory: str | Path) -> Registry:
+    """One registry holding the snapshots of every process in ``directory``."""
+    merged = Registry()
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            pid = int(path.stem)
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable metrics file: %s", path)
+            continue
+        # totals of exited workers still count, their gauges no longer hold
+        alive = _alive(pid)
+        for name, entry in data.items():
+            labelnames = tuple(entry["labelnames"])
+            if entry["kind"] == "counter":
+                counter = merged.counter(name, entry["help"], labelnames)
+                for labels, value in entry["samples"]:
+                    counter.inc(value, **labels)
+            elif entry["kind"] == "histogram":
+                hist = merged.histogram(
+                    name, entry["help"], labelnames, tuple(entry["buckets"])
+                )
+                for labels, counts, total in entry["series"]:
+                    hist.merge(counts, total, **labels)
+            elif alive:
+                gauge = merged.gauge(name, entry["help"], (*labelnames, "pid"))
+                for labels, value in entry["samples"]:
+                    gauge.set(value, pid=str(pid), **labels)
+    return merged
+
+
+class SnapshotWriter:
+    """Writes this process's registry to ``directory`` every ``interval``."""
+
+    def __init__(self, directory: str | Path, interval: float = 5.0):
+        self.directory = Path(directory)
+        self.interval = interval
+        self._written = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_write(self, registry: Registry) -> None:
+        now = time.monotonic()
+        if now - self._written < self.interval or not self._lock.acquire(False):
+            return
+        try:
+            self._written = now
+            write_snapshot(registry, self.directory)
+        finally:
+            self._lock.release()
+
+    def render(self, registry: Registry) -> str:
+        with self._lock:
+            self._written = time.monotonic()
+            write_snapshot(registry, self.directory)
+        return render_text(merge_snapshots(self.directory))
+
+
+REGISTRY = Registry()
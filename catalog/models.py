@@ -1,7 +1,13 @@
 import json
-from dataclasses import asdict, dataclass, field
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
-from typing import List
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from catalog.changelog import DELETE, INSERT, UPDATE, Change, ChangeLog
+from catalog.pvector import PVector
 
 
 @dataclass
@@ -42,10 +48,189 @@ class Movie:
 
 @dataclass
 class Catalog:
-    movies: List[Movie] = field(default_factory=list)
+    # movies is immutable: writers build a new vector and publish it with a
+    # single assignment, so readers iterate a consistent snapshot without
+    # taking a lock. Movies are replaced, never edited in place.
+    movies: PVector[Movie] = field(default_factory=PVector)
+    # bumped by every mutation; together with the epoch it identifies a state
+    # of the catalog, and is what ETags and Last-Modified are derived from
+    version: int = field(default=0, compare=False)
+    epoch: str = field(default_factory=lambda: uuid.uuid4().hex[:8], compare=False)
+    updated_at: float = field(default_factory=time.time, compare=False)
+    _movie_versions: Dict[int, Tuple[int, float]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    changes: ChangeLog = field(
+        default_factory=ChangeLog, init=False, repr=False, compare=False
+    )
+    # version of movies not touched since restamp(), kept instead of an entry
+    # per movie so restamping a large (or snapshot backed) catalog is cheap
+    _base_version: Tuple[int, float] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # serializes writers only
+    _lock: threading.RLock = field(
+        default_factory=threading.RLock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        if isinstance(self.movies, (list, tuple)):
+            self.movies = PVector(self.movies)
+
+    def touch(self, movie_id: int | None = None, op: str = UPDATE) -> int:
+        with self._lock:
+            self.version += 1
+            self.updated_at = time.time()
+            if movie_id is not None:
+                if op == DELETE:
+                    self._movie_versions.pop(movie_id, None)
+                else:
+                    self._movie_versions[movie_id] = (self.version, self.updated_at)
+                self.changes.record(self.version, movie_id, op)
+            return self.version
+
+    def movie_version(self, movie_id: int) -> Tuple[int, float]:
+        default = self._base_version or (0, self.updated_at)
+        return self._movie_versions.get(movie_id, default)
+
+    def changes_since(self, version: int) -> Tuple[str, int, List[Change] | None]:
+        # the state is read together with the changes, so every change up to
+        # the returned version is among them
+        with self._lock:
+            return self.epoch, self.version, self.changes.since(version)
+
+    def restamp(self, epoch: str, version: int) -> None:
+        self.epoch = epoch
+        self.version = version
+        self.updated_at = time.time()
+        self._movie_versions = {}
+        self._base_version = (self.version, self.updated_at)
+        self.changes.reset(self.version)
+
+    def continue_from(self, previous: "Catalog") -> None:
+        # a catalog that replaces another one (import, reload) keeps counting
+        # from where the old one stopped so versions never go backwards
+        self.changes = previous.changes
+        self.restamp(previous.epoch, previous.version + 1)
+
+    def export_versions(self) -> dict:
+        # everything ETags, Last-Modified and the change feed are derived
+        # from, so another process can take over this exact state
+        with self._lock:
+            return {
+                "epoch": self.epoch,
+                "version": self.version,
+                "updated_at": self.updated_at,
+                "base": self._base_version,
+                "movies": {str(k): v for k, v in self._movie_versions.items()},
+                "changes": self.changes.to_dict(),
+            }
+
+    def import_versions(self, state: dict) -> None:
+        with self._lock:
+            self.epoch = state["epoch"]
+            self.version = state["version"]
+            self.updated_at = state["updated_at"]
+            base = state["base"]
+            self._base_version = tuple(base) if base else None
+            self._movie_versions = {
+                int(k): (v[0], v[1]) for k, v in state["movies"].items()
+            }
+            self.changes.load(state["changes"])
+
+    def stage(self, size: int) -> "Catalog":
+        # a scratch catalog over the same, immutable, movies: changes made to
+        # it stay invisible until published. Its change log holds ``size``
+        # changes.
+        staged = Catalog(self.movies)
+        staged.changes = ChangeLog(max(size, 1))
+        return staged
+
+    def _publish(self, movies: PVector[Movie], changes: Iterable[Change]) -> None:
+        # swaps in a vector built off to the side and records its changes;
+        # callers hold _lock from reading self.movies up to here
+        with self._lock:
+            self.movies = movies
+            for change in changes:
+                self.touch(change.movie_id, change.op)
+
+    def apply_batch(self, size: int, apply: Callable[["Catalog"], bool]) -> bool:
+        """Run ``apply`` on a staged copy holding up to ``size`` changes.
+
+        Its changes are published together if it returns True, and dropped
+        otherwise; other writers wait until then.
+        """
+        with self._lock:
+            staged = self.stage(size)
+            if not apply(staged):
+                return False
+            self._publish(staged.movies, staged.changes.since(0) or [])
+            return True
+
+    def rebase_movies(self, current: PVector[Movie], movies: PVector[Movie]) -> bool:
+        # swaps the list for an equal one (same movies, same order) backed
+        # differently; False when a writer replaced ``current`` meanwhile
+        with self._lock:
+            if self.movies is not current:
+                return False
+            self.movies = movies
+            return True
+
+    def apply_change(self, version: int, movie_id: int, movie: Movie | None) -> None:
+        # replays a change made elsewhere (replication) under its own version
+        with self._lock:
+            index = self.index_of(movie_id)
+            op = UPDATE
+            if movie is None:
+                op = DELETE
+                if index is not None:
+                    self.movies = self.movies.delete(index)
+            elif index is None:
+                op = INSERT
+                self.movies = self.movies.append(movie)
+            else:
+                self.movies = self.movies.set(index, movie)
+            self.version = version - 1
+            self.touch(movie_id, op)
 
     def add_movie(self, movie: Movie) -> None:
-        self.movies.append(movie)
+        with self._lock:
+            self.movies = self.movies.append(movie)
+            self.touch(movie.id, INSERT)
+
+    def extend(self, movies: Iterable[Movie]) -> None:
+        # one rebuild instead of a copy-on-write append per movie
+        with self._lock:
+            added = list(movies)
+            self.movies = PVector([*self.movies, *added])
+            for movie in added:
+                self.touch(movie.id, INSERT)
+
+    def insert_movie(self, index: int, movie: Movie) -> None:
+        with self._lock:
+            self.movies = self.movies.insert(index, movie)
+            self.touch(movie.id, INSERT)
+
+    def replace_movie(self, movie: Movie) -> bool:
+        with self._lock:
+            index = self.index_of(movie.id)
+            if index is None:
+                return False
+            self.movies = self.movies.set(index, movie)
+            self.touch(movie.id)
+            return True
+
+    def update_movie(self, movie_id: int, **changes) -> Movie | None:
+        # builds an edited copy, readers keep seeing the old movie until the
+        # new vector is published
+        with self._lock:
+            index = self.index_of(movie_id)
+            if index is None:
+                return None
+            movie = replace(self.movies[index], **changes)
+            self.movies = self.movies.set(index, movie)
+            self.touch(movie_id)
+            return movie
 
     def get_all_titles(self) -> list[str]:
         return [m.title for m in self.movies]
@@ -63,21 +248,57 @@ class Catalog:
         return json.dumps([asdict(m) for m in self.movies], indent=2)
 
     def find_by_id(self, movie_id: int) -> Movie | None:
-        for m in self.movies:
+        movies = self.movies
+        # snapshot backed movie lists can look ids up without decoding
+        find = getattr(movies, "find", None)
+        if find is not None:
+            return find(movie_id)
+        for m in movies:
             if m.id == movie_id:
                 return m
         return None
 
-    def remove(self, movie_id: int) -> bool:
-        for i, m in enumerate(self.movies):
+    def index_of(self, movie_id: int) -> int | None:
+        movies = self.movies
+        index_of = getattr(movies, "index_of", None)
+        if index_of is not None:
+            return index_of(movie_id)
+        for i, m in enumerate(movies):
             if m.id == movie_id:
-                del self.movies[i]
-                return True
-        return False
+                return i
+        return None
+
+    def remove(self, movie_id: int) -> bool:
+        with self._lock:
+            index = self.index_of(movie_id)
+            if index is None:
+                return False
+            self.movies = self.movies.delete(index)
+            self.touch(movie_id, DELETE)
+            return True
+
+    def remove_many(self, movie_ids: Iterable[int]) -> list[int]:
+        # one rebuild instead of a lookup and copy-on-write delete per id;
+        # returns the ids that were actually removed
+        with self._lock:
+            doomed = set(movie_ids)
+            movies = self.movies
+            removed = [m.id for m in movies if m.id in doomed]
+            if not removed:
+                return []
+            without = getattr(movies, "without", None)
+            if without is not None:
+                # snapshot backed lists stay backed by their snapshot
+                self.movies = without(set(removed))
+            else:
+                self.movies = PVector(m for m in movies if m.id not in doomed)
+            for movie_id in removed:
+                self.touch(movie_id, DELETE)
+            return removed
 
     @classmethod
     def from_json(cls, data: list[dict]) -> "Catalog":
-        cat = cls()
+        movies = []
         for entry in data:
             if not {"id", "title", "year"}.issubset(entry):
                 raise ValueError(f"Missing keys in JSON entry: {entry}")
@@ -87,6 +308,8 @@ class Catalog:
             entry["rating"] = float(entry.get("rating", 0))
             entry["genres"] = entry.get("genres", [])
             entry["tags"] = entry.get("tags", [])
-            cat.add_movie(Movie.from_dict(entry))
+            movies.append(Movie.from_dict(entry))
 
+        cat = cls()
+        cat.extend(movies)
         return cat
@@ -0,0 +1,94 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+SORT_KEYS = ("cumulative", "tottime", "calls")
+_PROFILE_ID = re.compile(r"^\d+-[0-9a-f]{6}$")
+
+
+class ProfileStore:
+    # cProfile runs kept as <id>.pstats (load with pstats or snakeviz) next
+    # to <id>.json describing the request; ids sort by creation time and
+    # only the newest ``keep`` profiles are kept.
+
+    def __init__(self, directory: str | Path, keep: int = 50):
+        self.directory = Path(directory)
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str, suffix: str) -> Path | None:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{time.time_ns() // 1_000_000}-{os.urandom(3).hex()}"
+
+    def save(
+        self, profile: cProfile.Profile, profile_id: str | None = None, **meta
+    ) -> str:
+        profile_id = profile_id or self.new_id()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(self.directory / f"{profile_id}.pstats"))
+        meta = {"id": profile_id, "created": time.time(), **meta}
+        (self.directory / f"{profile_id}.json").write_text(
+            json.dumps(meta), encoding="utf-8"
+        )
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        with self._lock:
+            for meta in sorted(self.directory.glob("*.json"))[: -max(self.keep, 1)]:
+                meta.unlink(missing_ok=True)
+                meta.with_suffix(".pstats").unlink(missing_ok=True)
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        if not self.directory.is_dir():
+            return []
+        found = []
+        for meta in sorted(self.directory.glob("*.json"), reverse=True)[:limit]:
+            try:
+                found.append(json.loads(meta.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue  # pruned or half written by another worker
+        return found
+
+    def pstats_path(self, profile_id: str) -> Path | None:
+        return self._path(profile_id, ".pstats")
+
+    def top(
+        self, profile_id: str, limit: int = 20, sort: str = "cumulative"
+    ) -> List[dict] | None:
+        """The ``limit`` most expensive functions of a profile, by ``sort``."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+        path = self.pstats_path(profile_id)
+        if path is None:
+            return None
+        stats = pstats.Stats(str(path))
+        stats.sort_stats(sort)
+        rows = []
+        for func in stats.fcn_list[:limit]:  # type: ignore[attr-defined]
+            primitive, calls, own, cumulative, _ = stats.stats[func]  # type: ignore[attr-defined]
+            filename, line, name = func
+            rows.append(
+                {
+                    "function": name,
+                    "file": filename,
+                    "line": line,
+                    "calls": calls,
+                    "primitive_calls": primitive,
+                    "total_time": own,
+                    "cumulative_time": cumulative,
+                }
+            )
+        return rows
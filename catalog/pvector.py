@@ -0,0 +1,113 @@
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Generic, Iterable, Iterator, Tuple, TypeVar, overload
+
+T = TypeVar("T")
+
+CHUNK = 256
+
+
+class PVector(Sequence, Generic[T]):
+    # An immutable sequence stored as a tuple of tuple chunks. Updates return
+    # a new vector that shares every chunk except the one that changed, so a
+    # write costs O(CHUNK + len / CHUNK) and readers holding the old vector
+    # are unaffected.
+
+    __slots__ = ("_chunks", "_starts", "_len")
+
+    def __init__(self, items: Iterable[T] = ()):
+        flat = tuple(items)
+        self._set_chunks(tuple(flat[i : i + CHUNK] for i in range(0, len(flat), CHUNK)))
+
+    def _set_chunks(self, chunks: Tuple[Tuple[T, ...], ...]) -> None:
+        starts = []
+        total = 0
+        for chunk in chunks:
+            starts.append(total)
+            total += len(chunk)
+        self._chunks = chunks
+        self._starts = tuple(starts)
+        self._len = total
+
+    @classmethod
+    def _from_chunks(cls, chunks, starts=None, length=None) -> "PVector[T]":
+        vector = cls.__new__(cls)
+        if starts is None:
+            vector._set_chunks(tuple(c for c in chunks if c))
+        else:
+            # the caller knows the chunk boundaries did not move
+            vector._chunks, vector._starts, vector._len = chunks, starts, length
+        return vector
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("PVector index out of range")
+        chunk = bisect_right(self._starts, index) - 1
+        return chunk, index - self._starts[chunk]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[T]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        chunk, offset = self._locate(index)
+        return self._chunks[chunk][offset]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PVector, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PVector({list(self)!r})"
+
+    def _replace_chunk(self, index: int, *chunks: Tuple[T, ...]) -> "PVector[T]":
+        return self._from_chunks(
+            self._chunks[:index] + chunks + self._chunks[index + 1 :]
+        )
+
+    def set(self, index: int, value: T) -> "PVector[T]":
+        c, offset = self._locate(index)
+        chunk = self._chunks[c]
+        chunks = (
+            self._chunks[:c]
+            + (chunk[:offset] + (value,) + chunk[offset + 1 :],)
+            + self._chunks[c + 1 :]
+        )
+        return self._from_chunks(chunks, self._starts, self._len)
+
+    def append(self, value: T) -> "PVector[T]":
+        if self._chunks and len(self._chunks[-1]) < CHUNK:
+            chunks = self._chunks[:-1] + (self._chunks[-1] + (value,),)
+            return self._from_chunks(chunks, self._starts, self._len + 1)
+        return self._from_chunks(
+            self._chunks + ((value,),), self._starts + (self._len,), self._len + 1
+        )
+
+    def insert(self, index: int, value: T) -> "PVector[T]":
+        if index >= self._len:
+            return self.append(value)
+        c, offset = self._locate(max(index, -self._len))
+        chunk = self._chunks[c]
+        chunk = chunk[:offset] + (value,) + chunk[offset:]
+        if len(chunk) > 2 * CHUNK:
+            return self._replace_chunk(c, chunk[:CHUNK], chunk[CHUNK:])
+        return self._replace_chunk(c, chunk)
+
+    def delete(self, index: int) -> "PVector[T]":
+        c, offset = self._locate(index)
+        chunk = self._chunks[c]
+        return self._replace_chunk(c, chunk[:offset] + chunk[offset + 1 :])
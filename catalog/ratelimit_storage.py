@@ -0,0 +1,240 @@
+"""SQLite storage for Flask-Limiter, shared by every worker on a host.
+
+Selected with ``RATELIMIT_STORAGE_URI=sqlite:////var/lib/catalog/limits.db``
+(three slashes before a relative path, four before an absolute one).
+The database runs in WAL mode, so readers never wait for the writer and
+a hit is one short IMMEDIATE transaction. Counters are not durable
+(``synchronous=OFF``): after a crash limits restart from zero, which is
+what the in-memory storage does on every restart anyway.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from math import floor
+from typing import Iterator
+
+from limits.storage.base import (
+    MovingWindowSupport,
+    SlidingWindowCounterSupport,
+    Storage,
+    TimestampedSlidingWindow,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT NOT NULL,
+    ts REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_key_ts ON events (key, ts);
+CREATE INDEX IF NOT EXISTS events_expires ON events (expires);
+CREATE INDEX IF NOT EXISTS counters_expires ON counters (expires);
+"""
+
+
+class SQLiteStorage(
+    Storage, MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow
+):
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        cleanup_interval: float = 30.0,
+        busy_timeout: float = 5.0,
+        **options,
+    ):
+        _, _, self.path = uri.partition(":///")
+        if not self.path:
+            raise ValueError(f"Bad rate limit storage {uri!r}, expected sqlite:///PATH")
+        self.cleanup_interval = float(cleanup_interval)
+        self.busy_timeout = float(busy_timeout)
+        self._local = threading.local()
+        self._next_cleanup = 0.0
+        self._connect().executescript(_SCHEMA)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def _connect(self) -> sqlite3.Connection:
+        # one connection per thread, and never one inherited through fork
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _cleanup(self, conn: sqlite3.Connection, now: float) -> None:
+        # piggybacks on writes instead of running a thread in every worker
+        if now < self._next_cleanup:
+            return
+        self._next_cleanup = now + self.cleanup_interval
+        conn.execute("DELETE FROM counters WHERE expires <= ?", (now,))
+        conn.execute("DELETE FROM events WHERE expires <= ?", (now,))
+
+    def _incr(
+        self, conn: sqlite3.Connection, key: str, expiry: float, amount: int, now: float
+    ) -> int:
+        row = conn.execute(
+            """
+            INSERT INTO counters (key, value, expires) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                value = CASE WHEN expires <= ? THEN excluded.value
+                             ELSE value + excluded.value END,
+                expires = CASE WHEN expires <= ? THEN excluded.expires
+                               ELSE expires END
+            RETURNING value
+            """,
+            (key, amount, now + expiry, now, now),
+        ).fetchone()
+        return row[0]
+
+    def _get(self, conn: sqlite3.Connection, key: str, now: float) -> int:
+        row = conn.execute(
+            "SELECT value FROM counters WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            self._cleanup(conn, now)
+            return self._incr(conn, key, expiry, amount, now)
+
+    def get(self, key: str) -> int:
+        return self._get(self._connect(), key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = (
+            self._connect()
+            .execute(
+                "SELECT expires FROM counters WHERE key = ? AND expires > ?",
+                (key, now),
+            )
+            .fetchone()
+        )
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connect().execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def reset(self) -> int | None:
+        with self._transaction() as conn:
+            counters = conn.execute("SELECT COUNT(*) FROM counters").fetchone()
+            events = conn.execute("SELECT COUNT(DISTINCT key) FROM events").fetchone()
+            conn.execute("DELETE FROM counters")
+            conn.execute("DELETE FROM events")
+        return counters[0] + events[0]
+
+    def clear(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM events WHERE key = ?", (key,))
+
+    # moving window: one row per hit
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as conn:
+            self._cleanup(conn, now)
+            used = conn.execute(
+                "SELECT COUNT(*) FROM events WHERE key = ? AND ts > ?",
+                (key, now - expiry),
+            ).fetchone()[0]
+            if used + amount > limit:
+                return False
+            conn.executemany(
+                "INSERT INTO events (key, ts, expires) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+        return True
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple[float, int]:
+        now = time.time()
+        oldest, count = (
+            self._connect()
+            .execute(
+                "SELECT MIN(ts), COUNT(*) FROM events WHERE key = ? AND ts > ?",
+                (key, now - expiry),
+            )
+            .fetchone()
+        )
+        return (oldest if count else now), count
+
+    # sliding window counter: two fixed windows, the previous one weighted
+
+    def _sliding_window(
+        self, conn: sqlite3.Connection, key: str, expiry: int, now: float
+    ) -> tuple[str, int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous = self._get(conn, previous_key, now)
+        current = self._get(conn, current_key, now)
+        previous_ttl = (
+            (1 - (((now - expiry) / expiry) % 1)) * expiry if previous else 0.0
+        )
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return current_key, previous, previous_ttl, current, current_ttl
+
+    def acquire_sliding_window_entry(
+        self, key: str, limit: int, expiry: int, amount: int = 1
+    ) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as conn:
+            self._cleanup(conn, now)
+            current_key, previous, previous_ttl, current, _ = self._sliding_window(
+                conn, key, expiry, now
+            )
+            # the whole check-and-increment holds the write lock, so unlike
+            # the in-memory storage there is no race to undo
+            if floor(previous * previous_ttl / expiry + current) + amount > limit:
+                return False
+            self._incr(conn, current_key, 2 * expiry, amount, now)
+        return True
+
+    def get_sliding_window(
+        self, key: str, expiry: int
+    ) -> tuple[int, float, int, float]:
+        _, previous, previous_ttl, current, current_ttl = self._sliding_window(
+            self._connect(), key, expiry, time.time()
+        )
+        return previous, previous_ttl, current, current_ttl
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        for window_key in self.sliding_window_keys(key, expiry, time.time()):
+            self.clear(window_key)
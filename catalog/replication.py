@@ -0,0 +1,214 @@
+import json
+import logging
+import random
+import ssl
+import threading
+import time
+from typing import Callable, Dict
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from catalog.metrics import REGISTRY
+from catalog.models import Catalog, Movie
+
+logger = logging.getLogger(__name__)
+
+LAG = REGISTRY.gauge(
+    "replication_lag_seconds", "Seconds since the follower last caught up"
+)
+APPLIED = REGISTRY.counter(
+    "replication_changes_applied_total", "Changes applied from the primary"
+)
+RESYNCS = REGISTRY.counter(
+    "replication_resyncs_total", "Full snapshots loaded from the primary"
+)
+
+
+class ResyncRequired(Exception):
+    pass
+
+
+class PrimaryUnavailable(Exception):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Follower:
+    # Tails a primary's change feed: bootstrap from GET /movies/export/json,
+    # then poll GET /movies/changes?since=<applied version>. The catalog
+    # keeps the primary's epoch and versions, so ETags match across nodes
+    # and a reconnect simply resumes from the last applied version.
+
+    def __init__(
+        self,
+        primary: str,
+        headers: Dict[str, str],
+        install: Callable[[Catalog], None],
+        current: Callable[[], Catalog],
+        interval: float = 1.0,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+        ssl_context: ssl.SSLContext | None = None,
+        authorize: Callable[[], str] | None = None,
+    ):
+        self.primary = primary.rstrip("/")
+        self.headers = headers
+        self.install = install
+        self.current = current
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        # returns a fresh bearer token; called again whenever one is refused
+        self.authorize = authorize
+        self._token = authorize() if authorize is not None else None
+
+        self.ready = threading.Event()
+        self.epoch: str | None = None
+        self.applied_version = 0
+        self.primary_version = 0
+        self.last_sync: float | None = None
+        self.connected = False
+        self.failures = 0
+        self.last_error: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _open(self, url: str) -> dict:
+        headers = dict(self.headers)
+        if self._token is not None:
+            headers["Authorization"] = f"Bearer {self._token}"
+        request = Request(url, headers=headers)
+        with urlopen(request, timeout=self.timeout, context=self.ssl_context) as r:
+            return json.load(r)
+
+    def _get(self, path: str, **params) -> dict:
+        url = f"{self.primary}{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        try:
+            try:
+                return self._open(url)
+            except HTTPError as err:
+                if err.code != 401 or self.authorize is None:
+                    raise
+                # most likely the token expired: mint a new one, retry once
+                self._token = self.authorize()
+                return self._open(url)
+        except HTTPError as err:
+            if err.code == 410:
+                raise ResyncRequired() from err
+            retry_after = err.headers.get("Retry-After")
+            raise PrimaryUnavailable(
+                f"{url} answered {err.code}",
+                float(retry_after) if retry_after else None,
+            ) from err
+        except (URLError, OSError, ValueError) as err:
+            raise PrimaryUnavailable(f"{url} failed: {err}") from err
+
+    def bootstrap(self) -> None:
+        body = self._get("/movies/export/json")
+        catalog = Catalog.from_json(body["movies"])
+        catalog.restamp(body["epoch"], body["version"])
+        self.install(catalog)
+
+        self.epoch = catalog.epoch
+        self.applied_version = self.primary_version = catalog.version
+        self.last_sync = time.time()
+        RESYNCS.inc()
+        self.ready.set()
+        logger.info(
+            "Loaded snapshot %s-%s (%d movies) from %s",
+            self.epoch,
+            self.applied_version,
+            len(catalog),
+            self.primary,
+        )
+
+    def poll_once(self) -> int:
+        if self.epoch is None:
+            self.bootstrap()
+            return 0
+
+        body = self._get(
+            "/movies/changes", since=self.applied_version, epoch=self.epoch
+        )
+        catalog = self.current()
+        for change in body["changes"]:
+            movie = Movie.from_dict(change["movie"]) if "movie" in change else None
+            catalog.apply_change(change["version"], change["id"], movie)
+        catalog.version = max(catalog.version, body["version"])
+
+        APPLIED.inc(len(body["changes"]))
+        self.applied_version = catalog.version
+        self.primary_version = body["version"]
+        self.last_sync = time.time()
+        return len(body["changes"])
+
+    def _next_delay(self, err: PrimaryUnavailable) -> float:
+        backoff = min(self.max_backoff, self.interval * 2**self.failures)
+        return max(err.retry_after or 0.0, random.uniform(backoff / 2, backoff))
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            delay = self.interval
+            try:
+                self.poll_once()
+            except ResyncRequired:
+                logger.warning("Primary can no longer replay our version, resyncing")
+                self.epoch = None
+                delay = 0
+            except PrimaryUnavailable as err:
+                self.connected = False
+                self.failures += 1
+                self.last_error = str(err)
+                delay = self._next_delay(err)
+                logger.warning(
+                    "Replication poll failed (%s), retry in %.1fs", err, delay
+                )
+            else:
+                if not self.connected:
+                    logger.info("Connected to primary %s", self.primary)
+                self.connected = True
+                self.failures = 0
+                self.last_error = None
+
+            lag = self.lag_seconds
+            if lag is not None:
+                LAG.set(lag)
+            self._stop.wait(delay)
+
+    @property
+    def lag_seconds(self) -> float | None:
+        if self.last_sync is None:
+            return None
+        return max(time.time() - self.last_sync, 0.0)
+
+    def status(self) -> dict:
+        return {
+            "role": "follower",
+            "primary": self.primary,
+            "ready": self.ready.is_set(),
+            "connected": self.connected,
+            "epoch": self.epoch,
+            "applied_version": self.applied_version,
+            "primary_version": self.primary_version,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+        }
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="replication-follower", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    request_timeout: float = 10.0
+    deadline: float | None = 120.0
+
+    def backoff(self, attempt: int) -> float:
+        # "full jitter": uniform in [0, min(max_delay, base * 2^attempt)]
+        cap = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, cap)
+
+    @classmethod
+    def from_config(cls, config) -> "RetryPolicy":
+        return cls(
+            attempts=config.get("OMDB_RETRY_ATTEMPTS", cls.attempts),
+            base_delay=config.get("OMDB_RETRY_BASE_DELAY", cls.base_delay),
+            max_delay=config.get("OMDB_RETRY_MAX_DELAY", cls.max_delay),
+            request_timeout=config.get("OMDB_REQUEST_TIMEOUT", cls.request_timeout),
+            deadline=config.get("ENRICH_DEADLINE", cls.deadline),
+        )
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRYABLE_STATUSES
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._state()
+            if state == self.OPEN:
+                raise CircuitOpenError("OMDb circuit is open, failing fast")
+            if state == self.HALF_OPEN:
+                # let a single trial request through, reject the rest
+                if self._trial_in_flight:
+                    raise CircuitOpenError("OMDb circuit is half-open, trial pending")
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(
+                        "Opening OMDb circuit after %d failures", self._failures
+                    )
+                self._opened_at = self._clock()
+
+    def release_trial(self) -> None:
+        # the call was abandoned (cancelled) without an answer: says nothing
+        # about the upstream, but the next call may try again
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+async def call_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    for attempt in range(policy.attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = await asyncio.wait_for(fn(), timeout=policy.request_timeout)
+        except Exception as exc:
+            if not is_retryable(exc):
+                # the upstream answered; a 4xx says nothing about its health
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt + 1 >= policy.attempts:
+                raise
+            delay = policy.backoff(attempt)
+            logger.debug(
+                "Retrying after %s (attempt %d), sleeping %.2fs",
+                exc,
+                attempt + 1,
+                delay,
+            )
+            await asyncio.sleep(delay)
+        except BaseException:
+            if breaker is not None:
+                breaker.release_trial()
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+    raise RuntimeError("RetryPolicy.attempts must be >= 1")
@@ -1,27 +1,59 @@
 import shutil
 import tempfile
-from dataclasses import asdict
+import threading
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Iterable, List, Optional, cast
 
 from werkzeug.datastructures import FileStorage
 
+from .changelog import Change
+from .checkpoint import checkpoint_path_for
 from .io_utils import (
     export_catalog_to_csv,
     export_catalog_to_json,
     import_catalog_from_csv,
     import_catalog_from_json,
+    read_csv_rows,
 )
-from .metadata import enrich_catalog, fetch_imdb_ids
+from .metadata import EnrichReport, enrich_catalog, fetch_imdb_ids
+from .metrics import REGISTRY
 from .models import Catalog, Movie
+from .resilience import RetryPolicy
+from .snapshot import PackedMovies, publish_snapshot, snapshot_path_for
+from .tracing import current_span, traced, tracer
+from .versions import save_versions
+from .watcher import note_own_write
+
+OPERATION_SECONDS = REGISTRY.histogram(
+    "catalog_operation_seconds", "Time to load or save the catalog", ["operation"]
+)
+
+_save_lock = threading.Lock()
 
 
+@traced()
 def load_catalog(path: Optional[str] = None) -> Catalog:
-    return import_catalog_from_json(Path(path)) if path else import_catalog_from_json()
+    with OPERATION_SECONDS.time(operation="load"):
+        if path:
+            return import_catalog_from_json(Path(path))
+        return import_catalog_from_json()
 
 
+@traced()
 def save_catalog(catalog: Catalog, path: str) -> Path:
-    return export_catalog_to_json(catalog, Path(path))
+    current_span().set(movies=len(catalog))
+    # background enrich jobs save from their own threads
+    with _save_lock, OPERATION_SECONDS.time(operation="save"):
+        saved = export_catalog_to_json(catalog, Path(path))
+        if isinstance(catalog.movies, PackedMovies):
+            # keep the shared snapshot current for workers (re)loading it,
+            # and serve this one from it too
+            publish_snapshot(catalog, snapshot_path_for(saved))
+        save_versions(catalog, saved)
+        note_own_write(saved, catalog)
+        return saved
 
 
 def load_movies_service(catalog: Catalog) -> list[dict]:
@@ -32,6 +64,18 @@ def load_movie_by_id_service(catalog: Catalog, movie_id: int) -> Movie | None:
     return catalog.find_by_id(movie_id)
 
 
+def multi_get_service(catalog: Catalog, ids: List[int]) -> dict:
+    found: List[dict] = []
+    missing: List[int] = []
+    for movie_id in ids:
+        movie = catalog.find_by_id(movie_id)
+        if movie is None:
+            missing.append(movie_id)
+        else:
+            found.append(asdict(movie))
+    return {"movies": found, "missing": missing}
+
+
 def add_movie_service(catalog: Catalog, data: dict) -> Movie:
     if not all(k in data for k in ("id", "title", "year")):
         raise ValueError("Missing fields")
@@ -50,19 +94,102 @@ def update_movie_service(catalog: Catalog, movie_id: int, data: dict) -> Movie |
         raise ValueError("Empty payload")
 
     allowed = {"title", "year", "genres", "rating", "tags", "imdb_id"}
-    for key, val in data.items():
-        if key in allowed:
-            setattr(movie, key, val)
-        else:
+    for key in data:
+        if key not in allowed:
             raise ValueError(f"Field not allowed: {key}")
-    return movie
+    return catalog.update_movie(movie_id, **data)
 
 
 def delete_movie_service(catalog: Catalog, movie_id: int) -> bool:
     return catalog.remove(movie_id)
 
 
-def import_json_service(payload: dict, target_path: str) -> Catalog:
+def _bulk_create(catalog: Catalog, op: dict) -> dict:
+    data = op.get("data") or {}
+    if "id" in data and catalog.find_by_id(int(data["id"])):
+        return {"status": 409, "error": f"Movie {data['id']} already exists"}
+
+    movie = add_movie_service(catalog, data)
+    return {"status": 201, "id": movie.id, "movie": asdict(movie)}
+
+
+def _bulk_update(catalog: Catalog, op: dict) -> dict:
+    movie_id = int(op["id"])
+    if not catalog.find_by_id(movie_id):
+        return {"status": 404, "error": f"Movie {movie_id} not found"}
+
+    updated = update_movie_service(catalog, movie_id, op.get("data") or {})
+    return {"status": 200, "movie": asdict(cast(Movie, updated))}
+
+
+def _bulk_delete(catalog: Catalog, op: dict) -> dict:
+    movie_id = int(op["id"])
+    if not catalog.remove(movie_id):
+        return {"status": 404, "error": f"Movie {movie_id} not found"}
+    return {"status": 204}
+
+
+_BULK_OPS = {"create": _bulk_create, "update": _bulk_update, "delete": _bulk_delete}
+
+
+def _apply_bulk(catalog: Catalog, operations: list, atomic: bool) -> List[dict]:
+    results: List[dict] = []
+    for index, op in enumerate(operations):
+        result: dict = {"index": index}
+        try:
+            if not isinstance(op, dict) or op.get("op") not in _BULK_OPS:
+                raise ValueError(f"op must be one of {', '.join(_BULK_OPS)}")
+            result.update(op=op["op"], id=op.get("id"))
+            result.update(_BULK_OPS[op["op"]](catalog, op))
+        except KeyError as err:
+            result.update(status=400, error=f"Missing field: {err.args[0]}")
+        except (TypeError, ValueError) as err:
+            result.update(status=400, error=str(err))
+        results.append(result)
+
+        if atomic and result["status"] >= 400:
+            break
+    return results
+
+
+def bulk_service(
+    catalog: Catalog, operations: list, atomic: bool = False
+) -> tuple[List[dict], bool]:
+    """Apply operations in order; returns per-item results and whether
+    anything was committed. An atomic batch is staged on a copy and only
+    published if every operation succeeded."""
+    if not atomic:
+        applied = _apply_bulk(catalog, operations, atomic=False)
+        return applied, any(r["status"] < 400 for r in applied)
+
+    # readers, the change log and followers see the whole batch or nothing
+    results: List[dict] = []
+
+    def apply(staged: Catalog) -> bool:
+        results.extend(_apply_bulk(staged, operations, atomic=True))
+        return results[-1]["status"] < 400
+
+    committed = catalog.apply_batch(len(operations), apply)
+    return results, committed
+
+
+def changes_service(catalog: Catalog, changes: List[Change]) -> List[dict]:
+    feed = []
+    for change in changes:
+        movie = None if change.deleted else catalog.find_by_id(change.movie_id)
+        entry: dict = {"id": change.movie_id, "version": change.version}
+        if movie is None:
+            entry["op"] = "delete"
+        else:
+            entry.update(op=change.op, movie=asdict(movie))
+        feed.append(entry)
+    return feed
+
+
+@traced()
+def import_json_service(
+    payload: dict, target_path: str, current: Catalog | None = None
+) -> Catalog:
     if (
         not payload
         or "movies" not in payload
@@ -70,13 +197,19 @@ def import_json_service(payload: dict, target_path: str) -> Catalog:
     ):
         raise ValueError("Must provide JSON with a 'movies' list")
 
-    catalog = Catalog.from_json(payload["movies"])
+    with tracer.span("build_movies", rows=len(payload["movies"])):
+        catalog = Catalog.from_json(payload["movies"])
+    if current is not None:
+        catalog.continue_from(current)
 
     save_catalog(catalog, target_path)
     return catalog
 
 
-def import_csv_service(uploaded_file: FileStorage, target_path: str) -> Catalog:
+@traced()
+def import_csv_service(
+    uploaded_file: FileStorage, target_path: str, current: Catalog | None = None
+) -> Catalog:
     if uploaded_file.filename == "":
         raise ValueError("No file selected")
     
@@ -85,18 +218,132 @@ def import_csv_service(uploaded_file: FileStorage, target_path: str) -> Catalog:
 
     tmp_dir = tempfile.mkdtemp()
     tmp_path = Path(tmp_dir) / uploaded_file.filename
-    uploaded_file.save(tmp_path)
+    with tracer.span("save_upload") as span:
+        uploaded_file.save(tmp_path)
+        span.set(bytes=tmp_path.stat().st_size)
     catalog = import_catalog_from_csv(tmp_path)
     shutil.rmtree(tmp_dir)
+    if current is not None:
+        catalog.continue_from(current)
 
     save_catalog(catalog, target_path)
     return catalog
 
 
+@dataclass
+class MergeReport:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+_MOVIE_FIELDS = {f.name for f in fields(Movie)}
+
+
+def _merge_row(entry: dict) -> dict:
+    if not isinstance(entry, dict) or not {"id", "title", "year"}.issubset(entry):
+        raise ValueError(f"Missing keys in entry: {entry}")
+    unknown = set(entry) - _MOVIE_FIELDS
+    if unknown:
+        raise ValueError(f"Fields not allowed: {', '.join(sorted(unknown))}")
+
+    row = dict(entry, id=int(entry["id"]), year=int(entry["year"]))
+    if "rating" in row:
+        row["rating"] = float(row["rating"])
+    if not Movie.validate_year(row["year"]):
+        raise ValueError(f"Invalid movie year: {row['year']}")
+    return row
+
+
+def merge_rows(
+    catalog: Catalog, entries: Iterable[dict], delete_missing: bool = False
+) -> MergeReport:
+    # validate everything up front so a bad row cannot leave a half merge
+    with tracer.span("validate_rows") as span:
+        rows = [_merge_row(entry) for entry in entries]
+        span.set(rows=len(rows))
+    seen = {row["id"] for row in rows}
+    if len(seen) != len(rows):
+        raise ValueError("Duplicate ids in import")
+
+    report = MergeReport()
+    by_id = {m.id: m for m in catalog}
+    for row in rows:
+        movie = by_id.get(row["id"])
+        if movie is None:
+            catalog.add_movie(Movie.from_dict(row))
+            report.inserted += 1
+            continue
+
+        # only fields present in the input are compared, so enrichment
+        # data the import does not carry (poster, plot, ...) is kept
+        diff = {k: v for k, v in row.items() if getattr(movie, k) != v}
+        if not diff:
+            report.unchanged += 1
+            continue
+        catalog.update_movie(movie.id, **diff)
+        report.updated += 1
+
+    if delete_missing:
+        missing = [m.id for m in catalog if m.id not in seen]
+        report.deleted = len(catalog.remove_many(missing))
+    return report
+
+
+@traced()
+def merge_json_service(
+    payload: dict, catalog: Catalog, target_path: str, delete_missing: bool = False
+) -> MergeReport:
+    if (
+        not payload
+        or "movies" not in payload
+        or not isinstance(payload["movies"], list)
+    ):
+        raise ValueError("Must provide JSON with a 'movies' list")
+
+    report = merge_rows(catalog, payload["movies"], delete_missing)
+    if report.changed:
+        save_catalog(catalog, target_path)
+    return report
+
+
+@traced()
+def merge_csv_service(
+    uploaded_file: FileStorage,
+    catalog: Catalog,
+    target_path: str,
+    delete_missing: bool = False,
+) -> MergeReport:
+    if not uploaded_file.filename or not uploaded_file.filename.lower().endswith(
+        ".csv"
+    ):
+        raise ValueError("Uploaded file must be .csv")
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        tmp_path = Path(tmp_dir) / "upload.csv"
+        with tracer.span("save_upload") as span:
+            uploaded_file.save(tmp_path)
+            span.set(bytes=tmp_path.stat().st_size)
+        report = merge_rows(catalog, read_csv_rows(tmp_path), delete_missing)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    if report.changed:
+        save_catalog(catalog, target_path)
+    return report
+
+
 def export_json_service(catalog: Catalog) -> List[dict]:
     return load_movies_service(catalog)
 
 
+@traced()
 def export_csv_service(catalog: Catalog, filename: str = "export.csv") -> Path:
     tmp_dir = tempfile.mkdtemp()
     tmp_path = Path(tmp_dir) / filename
@@ -104,9 +351,60 @@ def export_csv_service(catalog: Catalog, filename: str = "export.csv") -> Path:
     return tmp_path
 
 
-def enrich_ids_service(catalog: Catalog, max_concurrency: int = 5) -> int:
-    return fetch_imdb_ids(catalog, max_concurrency)
-
-
-def enrich_metadata_service(catalog: Catalog, max_concurrency: int = 5) -> int:
-    return enrich_catalog(catalog, max_concurrency)
+def _enrich_persistence(
+    target_path: str | None, phase: str
+) -> tuple[Path | None, Callable[[Catalog], Path] | None]:
+    if target_path is None:
+        return None, None
+    path = target_path
+    return checkpoint_path_for(path, phase), lambda cat: save_catalog(cat, path)
+
+
+@traced()
+def enrich_ids_service(
+    catalog: Catalog,
+    max_concurrency: int = 5,
+    policy: RetryPolicy | None = None,
+    target_path: str | None = None,
+    batch_size: int = 200,
+    progress: Callable[[int, int, int], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    write: Callable[[], AbstractContextManager[Catalog]] | None = None,
+) -> EnrichReport:
+    checkpoint_path, persist = _enrich_persistence(target_path, "ids")
+    return fetch_imdb_ids(
+        catalog,
+        max_concurrency,
+        policy,
+        checkpoint_path=checkpoint_path,
+        persist=persist,
+        batch_size=batch_size,
+        progress=progress,
+        should_stop=should_stop,
+        write=write,
+    )
+
+
+@traced()
+def enrich_metadata_service(
+    catalog: Catalog,
+    max_concurrency: int = 5,
+    policy: RetryPolicy | None = None,
+    target_path: str | None = None,
+    batch_size: int = 200,
+    progress: Callable[[int, int, int], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    write: Callable[[], AbstractContextManager[Catalog]] | None = None,
+) -> EnrichReport:
+    checkpoint_path, persist = _enrich_persistence(target_path, "metadata")
+    return enrich_catalog(
+        catalog,
+        max_concurrency,
+        policy,
+        checkpoint_path=checkpoint_path,
+        persist=persist,
+        batch_size=batch_size,
+        progress=progress,
+        should_stop=should_stop,
+        write=write,
+    )
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from catalog.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CALLS = REGISTRY.counter(
+    "singleflight_calls_total", "Calls made through a singleflight group", ["group"]
+)
+COALESCED = REGISTRY.counter(
+    "singleflight_coalesced_total",
+    "Calls that waited on an identical in-flight call instead of making their own",
+    ["group"],
+)
+
+
+class SingleFlight:
+    # In-flight entries are concurrent.futures.Future rather than asyncio
+    # futures so that callers running on different event loops (one per
+    # background job thread) can share a single result.
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        CALLS.inc(group=self.name)
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is None:
+                shared = self._calls[key] = Future()
+                shared.set_running_or_notify_cancel()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            COALESCED.inc(group=self.name)
+            logger.debug("Coalesced %s call for %r", self.name, key)
+            # shield: a follower giving up must not cancel the leader's call
+            return await asyncio.shield(asyncio.wrap_future(shared))
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            shared.set_exception(
+                asyncio.TimeoutError(f"Shared {self.name} call was cancelled")
+            )
+            raise
+        except BaseException as exc:
+            shared.set_exception(exc)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": CALLS.value(group=self.name),
+            "coalesced": COALESCED.value(group=self.name),
+            "in_flight": self.in_flight,
+        }
@@ -0,0 +1,278 @@
+"""Packed, read-only catalog snapshots shared between worker processes.
+
+A snapshot is a single file that is mmap'd by every process that opens it,
+so the page cache holds one copy of the catalog no matter how many workers
+serve it. Movies are decoded on access; a process only keeps the movies it
+wrote itself (its overlay) as Python objects.
+
+Layout (little endian, 8-byte fields)::
+
+    header      magic, count, version, epoch, updated_at
+    offsets     count + 1 record offsets into the blob, catalog order
+    ids         count movie ids, catalog order
+    sorted_ids  count movie ids, ascending
+    sorted_pos  count positions matching sorted_ids
+    blob        JSON records
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import weakref
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Set, cast
+
+from catalog.io_utils import import_catalog_from_json
+from catalog.models import Catalog, Movie
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCSNAP01"
+HEADER = struct.Struct("<8sqq8sd")
+
+
+def snapshot_path_for(catalog_path: str | Path) -> Path:
+    path = Path(catalog_path)
+    return path.with_name(f"{path.stem}.snapshot")
+
+
+def write_snapshot(
+    catalog: Catalog, path: Path, movies: Iterable[Movie] | None = None
+) -> Path:
+    # ``movies`` pins the list written when the catalog may change meanwhile
+    movies = list(catalog if movies is None else movies)
+    records = [json.dumps(asdict(m), separators=(",", ":")).encode() for m in movies]
+    offsets = array("q", [0])
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    ids = array("q", (m.id for m in movies))
+    order = sorted(range(len(movies)), key=lambda i: movies[i].id)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as fh:
+        fh.write(
+            HEADER.pack(
+                MAGIC,
+                len(movies),
+                catalog.version,
+                catalog.epoch.encode().ljust(8)[:8],
+                catalog.updated_at,
+            )
+        )
+        fh.write(offsets.tobytes())
+        fh.write(ids.tobytes())
+        fh.write(array("q", (ids[i] for i in order)).tobytes())
+        fh.write(array("q", order).tobytes())
+        for record in records:
+            fh.write(record)
+    tmp.replace(path)
+    logger.info("Published snapshot of %d movies to %s", len(movies), path)
+    return path
+
+
+class PackedSnapshot:
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, version, epoch, updated_at = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        self.count = count
+        self.version = version
+        self.epoch = epoch.decode().strip()
+        self.updated_at = updated_at
+
+        view = memoryview(self._mmap)
+        start = HEADER.size
+
+        def table(length: int):
+            nonlocal start
+            end = start + 8 * length
+            section = view[start:end].cast("q")
+            start = end
+            return section
+
+        self._offsets = table(count + 1)
+        self._ids = table(count)
+        self._sorted_ids = table(count)
+        self._sorted_pos = table(count)
+        self._blob = view[start:]
+
+    def id_at(self, position: int) -> int:
+        return self._ids[position]
+
+    def position(self, movie_id: int) -> int | None:
+        i = bisect_left(self._sorted_ids, movie_id)
+        if i < self.count and self._sorted_ids[i] == movie_id:
+            return self._sorted_pos[i]
+        return None
+
+    def record(self, position: int) -> Movie:
+        raw = self._blob[self._offsets[position] : self._offsets[position + 1]]
+        return Movie.from_dict(json.loads(bytes(raw)))
+
+
+class PackedMovies(Sequence):
+    # The movie list of a snapshot-backed Catalog. Reads decode from the
+    # snapshot; decoded movies are only weakly cached, so they go away once
+    # a request is done with them. Like PVector it is never changed in place:
+    # set/append/insert/delete return a new list whose overlay holds the
+    # movies written since the snapshot was published.
+
+    def __init__(self, snapshot: PackedSnapshot):
+        self.snapshot = snapshot
+        self._order: array | None = None  # ids, once inserts/deletes happened
+        self._positions: Dict[int, int] | None = None  # of _order, built lazily
+        self._overlay: Dict[int, Movie] = {}
+        self._deleted: Set[int] = set()
+        self._live: "weakref.WeakValueDictionary[int, Movie]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    @property
+    def overlay_size(self) -> int:
+        return len(self._overlay)
+
+    def _evolve(self, reorder: bool = False) -> "PackedMovies":
+        new = PackedMovies.__new__(PackedMovies)
+        new.snapshot = self.snapshot
+        new._order = self._order
+        new._positions = self._positions
+        if reorder:
+            order = self._order if self._order is not None else self.snapshot._ids
+            new._order = array("q", order)
+            new._positions = None
+        new._overlay = dict(self._overlay)
+        new._deleted = set(self._deleted)
+        new._live = self._live
+        return new
+
+    def _id_at(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("catalog index out of range")
+        if self._order is not None:
+            return self._order[index]
+        return self.snapshot.id_at(index)
+
+    def __len__(self) -> int:
+        return len(self._order) if self._order is not None else self.snapshot.count
+
+    def __iter__(self) -> Iterator[Movie]:
+        for i in range(len(self)):
+            movie = self.find(self._id_at(i))
+            if movie is not None:
+                yield movie
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        movie = self.find(self._id_at(index))
+        if movie is None:
+            raise IndexError("catalog index out of range")
+        return movie
+
+    def set(self, index: int, movie: Movie) -> "PackedMovies":
+        old_id = self._id_at(index)
+        new = self._evolve(reorder=movie.id != old_id)
+        if movie.id != old_id:
+            cast(array, new._order)[index] = movie.id
+            new._deleted.add(old_id)
+            new._overlay.pop(old_id, None)
+        new._deleted.discard(movie.id)
+        new._overlay[movie.id] = movie
+        return new
+
+    def delete(self, index: int) -> "PackedMovies":
+        movie_id = self._id_at(index)
+        new = self._evolve(reorder=True)
+        del cast(array, new._order)[index]
+        new._overlay.pop(movie_id, None)
+        new._deleted.add(movie_id)
+        return new
+
+    def without(self, movie_ids: Set[int]) -> "PackedMovies":
+        new = self._evolve()
+        order = self._order if self._order is not None else self.snapshot._ids
+        new._order = array("q", (i for i in order if i not in movie_ids))
+        new._positions = None
+        for movie_id in movie_ids:
+            new._overlay.pop(movie_id, None)
+        new._deleted |= movie_ids
+        return new
+
+    def insert(self, index: int, movie: Movie) -> "PackedMovies":
+        new = self._evolve(reorder=True)
+        cast(array, new._order).insert(index, movie.id)
+        new._deleted.discard(movie.id)
+        new._overlay[movie.id] = movie
+        return new
+
+    def append(self, movie: Movie) -> "PackedMovies":
+        return self.insert(len(self), movie)
+
+    def find(self, movie_id: int) -> Movie | None:
+        if movie_id in self._deleted:
+            return None
+        movie = self._overlay.get(movie_id) or self._live.get(movie_id)
+        if movie is not None:
+            return movie
+        position = self.snapshot.position(movie_id)
+        if position is None:
+            return None
+        movie = self.snapshot.record(position)
+        self._live[movie_id] = movie
+        return movie
+
+    def index_of(self, movie_id: int) -> int | None:
+        if self._order is not None:
+            if self._positions is None:
+                # shared by the lists evolved from this one until the order
+                # changes again, as edits in place keep it
+                self._positions = {i: pos for pos, i in enumerate(self._order)}
+            return self._positions.get(movie_id)
+        return self.snapshot.position(movie_id)
+
+
+def publish_snapshot(catalog: Catalog, path: Path) -> Path:
+    """Write ``catalog`` to ``path`` and serve it from there from now on.
+
+    The movies written since the catalog's snapshot was opened are in the
+    new file, so its overlay can go; unless a write landed meanwhile, then
+    the next save drops it.
+    """
+    movies = catalog.movies
+    write_snapshot(catalog, path, movies)
+    catalog.rebase_movies(movies, PackedMovies(PackedSnapshot(path)))  # type: ignore[arg-type]
+    return path
+
+
+def open_snapshot_catalog(path: Path) -> Catalog:
+    snapshot = PackedSnapshot(path)
+    catalog = Catalog(movies=PackedMovies(snapshot))  # type: ignore[arg-type]
+    catalog.restamp(snapshot.epoch, snapshot.version)
+    catalog.updated_at = snapshot.updated_at
+    return catalog
+
+
+def load_packed_catalog(catalog_path: str | Path) -> Catalog:
+    # reuse a published snapshot unless the JSON file is newer than it
+    json_path = Path(catalog_path)
+    snap_path = snapshot_path_for(json_path)
+    if not snap_path.is_file() or (
+        json_path.is_file()
+        and json_path.stat().st_mtime_ns > snap_path.stat().st_mtime_ns
+    ):
+        write_snapshot(import_catalog_from_json(json_path), snap_path)
+    return open_snapshot_catalog(snap_path)
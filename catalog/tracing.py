@@ -0,0 +1,351 @@
+"""Span tracing for the import, export and enrichment paths.
+
+    with tracer.span("import_csv", filename=name) as span:
+        ...
+        span.set(rows=len(catalog))
+
+Spans nest through a context variable, so they follow the code into
+asyncio tasks (and threads started with ``contextvars.copy_context()``).
+A trace is sampled once, at its root span (``TRACE_SAMPLE_RATE``); below
+an unsampled root a span costs one context variable lookup. Finished
+traces go to an exporter: a JSON-lines file (``TRACE_FILE``) or an
+OTLP/HTTP collector using the JSON encoding (``TRACE_OTLP_ENDPOINT``).
+"""
+
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Protocol, TypeVar
+
+from catalog.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SPANS = REGISTRY.counter("trace_spans_total", "Spans exported", ["outcome"])
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    # finished spans of the whole trace, shared with the root
+    trace: List["Span"] = field(default_factory=list, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP = _NoopSpan()
+
+_current: ContextVar[Span | _NoopSpan | None] = ContextVar("span", default=None)
+
+
+class Exporter(Protocol):
+    def export(self, spans: List[Span]) -> None: ...
+
+
+class Tracer:
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        exporter: Exporter | None = None,
+        rand: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._rand = rand
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_rate > 0
+
+    def start(self, name: str, **attributes: Any) -> tuple[Span | _NoopSpan, Token]:
+        """Open a span and make it current; hand both to ``finish``."""
+        parent = _current.get()
+        if parent is NOOP or (
+            parent is None and not (self.enabled and self._rand() < self.sample_rate)
+        ):
+            # children of an unsampled root see NOOP and are not sampled again
+            return NOOP, _current.set(NOOP)
+        if isinstance(parent, Span):
+            trace_id, parent_id, trace = parent.trace_id, parent.span_id, parent.trace
+        else:
+            trace_id, parent_id, trace = os.urandom(16).hex(), None, []
+        span = Span(
+            name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+            trace=trace,
+        )
+        return span, _current.set(span)
+
+    def finish(
+        self, span: Span | _NoopSpan, token: Token, exc: BaseException | None = None
+    ) -> None:
+        _current.reset(token)
+        if not isinstance(span, Span):
+            return
+        span.end_ns = time.time_ns()
+        if exc is not None:
+            span.error = f"{type(exc).__name__}: {exc}"
+        span.trace.append(span)
+        if span.parent_id is None and self.exporter is not None:
+            try:
+                self.exporter.export(span.trace)
+            except Exception:
+                SPANS.inc(len(span.trace), outcome="failed")
+                logger.exception("Failed to export trace %s", span.trace_id)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+        if not self.enabled and _current.get() is None:
+            yield NOOP
+            return
+        span, token = self.start(name, **attributes)
+        try:
+            yield span
+        except BaseException as exc:
+            self.finish(span, token, exc)
+            raise
+        self.finish(span, token)
+
+
+def current_span() -> Span | _NoopSpan:
+    span = _current.get()
+    return NOOP if span is None else span
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """Run every call of the decorated function in a span of its own."""
+
+    def decorate(fn: F) -> F:
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(span_name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+class JsonLinesExporter:
+    """One JSON object per span, appended to ``path``."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+        SPANS.inc(len(spans), outcome="exported")
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+class OTLPHttpExporter:
+    """Batches traces to an OTLP/HTTP collector from a background thread.
+
+    Requests never wait on the collector: when the queue is full new traces
+    are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "movie-catalog",
+        timeout: float = 2.0,
+        max_queue: int = 1000,
+        max_batch: int = 512,
+    ):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.start()
+
+    def start(self) -> None:
+        # a fresh queue every time: after a fork the inherited one may hold
+        # traces and locks of a thread that does not exist in the child
+        self._queue: queue.Queue[List[Span]] = queue.Queue(self.max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="trace-export", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            SPANS.inc(len(spans), outcome="dropped")
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            spans = len(batch[0])
+            while spans < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                spans += len(batch[-1])
+            try:
+                self._post([span for trace in batch for span in trace])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _post(self, spans: List[Span]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "catalog"},
+                            "spans": [_otlp_span(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        req = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body, default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+        except OSError as exc:
+            SPANS.inc(len(spans), outcome="failed")
+            logger.warning("Trace export to %s failed: %s", self.endpoint, exc)
+            return
+        SPANS.inc(len(spans), outcome="exported")
+
+
+def configure_tracing(
+    sample_rate: float, file: str | None = None, otlp_endpoint: str | None = None
+) -> None:
+    exporter: Exporter | None = None
+    current = tracer.exporter
+    if sample_rate <= 0:
+        pass
+    elif otlp_endpoint:
+        # keep the running export thread when nothing changed
+        if isinstance(current, OTLPHttpExporter) and current.endpoint == otlp_endpoint:
+            exporter = current
+        else:
+            exporter = OTLPHttpExporter(otlp_endpoint)
+    elif file:
+        exporter = JsonLinesExporter(file)
+    tracer.sample_rate = sample_rate
+    tracer.exporter = exporter
+
+
+tracer = Tracer()
+
+
+def _restart_in_child() -> None:
+    # threads do not survive fork(): a worker forked from a preloaded master
+    # would queue spans nobody sends
+    if isinstance(tracer.exporter, OTLPHttpExporter):
+        tracer.exporter.start()
+
+
+os.register_at_fork(after_in_child=_restart_in_child)
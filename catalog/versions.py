@@ -0,0 +1,70 @@
+import json
+import logging
+from pathlib import Path
+
+from catalog.models import Catalog
+from catalog.watcher import Stamp, file_stamp
+
+logger = logging.getLogger(__name__)
+
+# Workers serving one catalog file share its versions through this file:
+# save_catalog writes them next to the catalog, and a worker (re)loading the
+# catalog takes them over, so every worker hands out the same ETags and
+# change feed for the same state, and no two states share a version. Both
+# happen under the catalog write lock.
+
+
+def versions_path_for(catalog_path: str | Path) -> Path:
+    path = Path(catalog_path)
+    return path.with_name(f"{path.stem}.versions.json")
+
+
+def _stamp_key(stamp: Stamp | None) -> list[int] | None:
+    return list(stamp) if stamp is not None else None
+
+
+def save_versions(catalog: Catalog, catalog_path: str | Path) -> None:
+    state = catalog.export_versions()
+    # ties the versions to the exact file they describe
+    state["stamp"] = _stamp_key(file_stamp(catalog_path))
+    path = versions_path_for(catalog_path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _read_versions(catalog_path: str | Path) -> dict | None:
+    path = versions_path_for(catalog_path)
+    if not path.is_file():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        logger.warning("Ignoring unreadable versions file: %s", path, exc_info=True)
+        return None
+
+
+def load_versions(
+    catalog: Catalog, catalog_path: str | Path, previous: Catalog | None = None
+) -> None:
+    """Give a catalog just loaded from ``catalog_path`` its saved versions.
+
+    ``previous`` is the catalog it replaces in this process, if any.
+    """
+    if previous is not None:
+        catalog.continue_from(previous)
+    state = _read_versions(catalog_path)
+    floor = previous.version if previous is not None else 0
+    if (
+        state is not None
+        and state["stamp"] == _stamp_key(file_stamp(catalog_path))
+        and state["version"] >= floor
+    ):
+        catalog.import_versions(state)
+        return
+
+    if state is not None and state["version"] >= catalog.version:
+        # the file was rewritten by something other than save_catalog: a new
+        # state, numbered after every version handed out for the old one
+        catalog.restamp(state["epoch"], state["version"] + 1)
+    save_versions(catalog, catalog_path)
@@ -0,0 +1,193 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from catalog.metrics import REGISTRY
+from catalog.models import Catalog
+
+logger = logging.getLogger(__name__)
+
+Stamp = Tuple[int, int, int]
+
+RELOADS = REGISTRY.counter(
+    "catalog_reloads_total", "Catalog reloads after the file changed", ["result"]
+)
+RELOAD_SECONDS = REGISTRY.gauge(
+    "catalog_reload_seconds", "Duration of the last catalog reload"
+)
+
+# stamps of files this process wrote itself, with the catalog it wrote, so
+# a watcher does not reload what it already has in memory
+_own_writes: Dict[str, Tuple[Stamp, int]] = {}
+
+
+def file_stamp(path: str | Path) -> Stamp | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def note_own_write(path: str | Path, catalog: Catalog) -> None:
+    stamp = file_stamp(path)
+    if stamp is not None:
+        _own_writes[os.path.abspath(path)] = (stamp, id(catalog))
+
+
+class CatalogReloadError(RuntimeError):
+    pass
+
+
+class CatalogWriteLock:
+    # One catalog writer at a time: an RLock between the threads of this
+    # process and a flock on ``<catalog>.lock`` between the processes sharing
+    # the file. Re-entrant, so a writer may nest (reload inside a write).
+
+    def __init__(self, catalog_path: str | Path):
+        self.path = Path(catalog_path).with_suffix(".lock")
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd: int | None = None
+
+    def __enter__(self) -> "CatalogWriteLock":
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            # closing the descriptor drops the flock
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+
+class CatalogWatcher:
+    # Polls the catalog file's inode, mtime and size. A new stamp must stay
+    # the same for ``debounce`` seconds before it is loaded, so a burst of
+    # rewrites costs one reload. The new catalog is built off to the side
+    # and swapped in with a single assignment; ``load`` gets the catalog it
+    # replaces, to carry its versions on.
+
+    def __init__(
+        self,
+        path: str | Path,
+        load: Callable[[Catalog], Catalog],
+        install: Callable[[Catalog], None],
+        current: Callable[[], Catalog],
+        interval: float = 1.0,
+        debounce: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        lock: AbstractContextManager | None = None,
+    ):
+        self.path = os.path.abspath(path)
+        self.load = load
+        self.install = install
+        self.current = current
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock
+        self.lock = lock or nullcontext()
+
+        self._stamp = file_stamp(self.path)
+        self._pending: Stamp | None = None
+        self._pending_since = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll_once(self) -> bool:
+        stamp = file_stamp(self.path)
+        if stamp is None or stamp == self._stamp:
+            self._pending = None
+            return False
+
+        if self._is_own(stamp):
+            return False
+
+        now = self.clock()
+        if stamp != self._pending:
+            self._pending, self._pending_since = stamp, now
+            return False
+        if now - self._pending_since < self.debounce:
+            return False
+
+        self._pending = None
+        return self.reload(stamp)
+
+    def sync(self) -> bool:
+        # for writers, under the write lock: whatever another process saved
+        # is loaded now, without waiting for the debounce, so the write that
+        # follows builds on it instead of overwriting it
+        stamp = file_stamp(self.path)
+        if stamp is None or stamp == self._stamp or self._is_own(stamp):
+            return False
+        self._pending = None
+        if not self.reload(stamp):
+            raise CatalogReloadError(f"Could not reload {self.path} before writing")
+        return True
+
+    def _is_own(self, stamp: Stamp) -> bool:
+        own = _own_writes.get(self.path)
+        if own is not None and own == (stamp, id(self.current())):
+            self._stamp = stamp
+            return True
+        return False
+
+    def reload(self, stamp: Stamp | None = None) -> bool:
+        started = time.perf_counter()
+        # not in the middle of a write, ours or another worker's
+        with self.lock:
+            try:
+                fresh = self.load(self.current())
+            except Exception:
+                # most likely a writer that does not replace the file
+                # atomically; the next change of stamp retries
+                RELOADS.inc(result="error")
+                logger.exception("Reloading %s failed", self.path)
+                return False
+
+            self.install(fresh)
+            self._stamp = stamp or file_stamp(self.path)
+
+        elapsed = time.perf_counter() - started
+        RELOADS.inc(result="ok")
+        RELOAD_SECONDS.set(elapsed)
+        logger.info("Reloaded %s (%d movies) in %.3fs", self.path, len(fresh), elapsed)
+        return True
+
+    def run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Catalog watcher poll failed")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="catalog-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+from catalog.api.api import create_app
+from catalog.config import Config
+from catalog.models import Catalog, Movie
+
+VALID_CREDS = {"username": "admin", "password": "password123"}
+API_KEY = "supersecret123"
+
+
+def default_movies() -> list[Movie]:
+    return [
+        Movie(id=1, title="Titanic", year=1992),
+        Movie(id=2, title="Heat", year=1995),
+    ]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _logs_outside_the_repo(tmp_path_factory):
+    # the defaults are relative to the working directory
+    logs = tmp_path_factory.mktemp("logs")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Config, "LOG_FILE", str(logs / "app.log"))
+        patch.setattr(Config, "TRACE_FILE", str(logs / "traces.jsonl"))
+        yield
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """Factory for an admin test client over a seeded catalog.
+
+    ``save_in`` names the module whose ``save_catalog`` is stubbed out; the
+    paths it was called with are collected in ``client.saves``. With
+    ``on_disk`` the app loads ``CATALOG_PATH`` itself instead of the seed.
+    Any other keyword overrides the app config.
+    """
+
+    def make(
+        movies: list[Movie] | None = None,
+        save_in: str | None = None,
+        on_disk: bool = False,
+        **cfg,
+    ):
+        seed = Catalog()
+        for movie in default_movies() if movies is None else movies:
+            seed.add_movie(movie)
+
+        config = {
+            "CATALOG_PATH": str(tmp_path / "movies.json"),
+            "API_KEY": API_KEY,
+            "JWT_SECRET_KEY": "super-jwt-secret",
+            "JWT_ACCESS_TOKEN_EXPIRES": False,
+            **cfg,
+        }
+
+        saves: list[str] = []
+        if not on_disk:
+            monkeypatch.setattr("catalog.api.api.load_catalog", lambda path: seed)
+        monkeypatch.setattr("catalog.api.extensions.limiter.enabled", False)
+        if save_in is not None:
+            monkeypatch.setattr(
+                f"{save_in}.save_catalog",
+                lambda catalog, path: saves.append(path) or Path(path),
+            )
+
+        app = create_app(config)
+        app.testing = True
+        client = app.test_client()
+        client.app = app
+        client.saves = saves
+
+        login_resp = client.post("/auth/login", json=VALID_CREDS)
+        token = login_resp.get_json()["access_token"]
+        client.environ_base = {
+            **client.environ_base,
+            "HTTP_X_API_KEY": API_KEY,
+            "HTTP_AUTHORIZATION": f"Bearer {token}",
+        }
+        return client
+
+    return make
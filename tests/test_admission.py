@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from catalog.admission import AdmissionController
+from catalog.models import Movie
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(
+        [Movie(id=1, title="Titanic", year=1992)],
+        ADMISSION_LATENCY_SLO=0.5,
+        ADMISSION_QUEUE_SLO=0.5,
+        ADMISSION_RETRY_AFTER=7,
+    )
+
+
+def test_controller_sheds_heavy_work_while_reads_are_slow():
+    now = [100.0]
+    ctl = AdmissionController(
+        {"heavy": 1}, latency_slo=0.2, queue_slo=1.0, alpha=1.0, clock=lambda: now[0]
+    )
+    assert ctl.admit("heavy") is None
+    assert ctl.admit("heavy") == "in_flight"
+    ctl.release("heavy", 3.0)  # slow heavy requests alone are fine
+
+    assert ctl.admit("read") is None
+    ctl.release("read", 0.5)
+    assert ctl.admit("heavy") == "latency"
+    assert ctl.admit("read") is None
+    assert ctl.admit("write") is None
+
+    # no fresh read samples: the old average no longer counts
+    now[0] += 30
+    assert ctl.admit("heavy") is None
+
+
+def test_overloaded_api_rejects_heavy_requests_only(client):
+    for _ in range(20):
+        client.app.admission.admit("read")
+        client.app.admission.release("read", 5.0)
+
+    resp = client.get("/movies/export/json")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "7"
+    assert resp.get_json()["request_class"] == "heavy"
+
+    assert client.get("/movies/1").status_code == 200
+
+
+def test_queue_time_from_proxy_header(make_client):
+    client = make_client(ADMISSION_QUEUE_SLO=0.5, ADMISSION_TRUST_REQUEST_START=True)
+    started = f"t={int((time.time() - 2) * 1000)}"  # milliseconds
+    for _ in range(20):
+        client.get("/movies/1", headers={"X-Request-Start": started})
+
+    resp = client.get("/movies/export/json")
+    assert resp.status_code == 503
+    assert resp.get_json()["reason"] == "queue"
+    assert client.app.admission.in_flight == {"read": 0, "write": 0, "heavy": 0}
+
+
+def test_request_start_is_ignored_unless_trusted(client):
+    for _ in range(20):
+        client.get("/movies/1", headers={"X-Request-Start": "t=1"})
+
+    assert client.app.admission.queue_time["read"] == 0.0
+    assert client.get("/movies/export/json").status_code == 200
+
+
+def test_queue_time_samples_are_bounded():
+    ctl = AdmissionController({}, latency_slo=1.0, queue_slo=0.5, alpha=1.0)
+
+    ctl.admit("read", -3.0)
+    assert ctl.queue_time["read"] == 0.0
+    ctl.admit("read", 3.6e8)
+    assert ctl.queue_time["read"] == 2.0
+
+
+def test_in_flight_caps_are_per_app(make_client):
+    capped = make_client(ADMISSION_MAX_HEAVY=1)
+    default = make_client()
+
+    assert capped.app.admission.max_in_flight == {"read": 0, "write": 32, "heavy": 1}
+    assert default.app.admission.max_in_flight["heavy"] == 2
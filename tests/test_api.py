@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pytest
 from catalog.api.api import create_app
+from catalog.metadata import EnrichReport
 
 VALID_CREDS = {"username": "admin", "password": "password123"}
 
@@ -214,21 +215,26 @@ def test_export_json(client):
 
 
 def test_enrich_ids(client, monkeypatch):
-    def fake_fetch_ids(cat, max_concurrency=2):
-        updated = 0
+    def fake_fetch_ids(cat, max_concurrency=2, policy=None, **kwargs):
+        report = EnrichReport()
         for m in cat:
             m.imdb_id = "ttTEST"
-            updated += 1
-        return updated
+            report.updated += 1
+        return report
 
     monkeypatch.setattr("catalog.api.enrich.enrich_ids_service", fake_fetch_ids)
 
     correct = client.application.config["API_KEY"]
     headers = {"X-API-Key": correct}
     resp = client.post("/movies/enrich/ids", json={}, headers=headers)
-    assert resp.status_code == 200
-    data = resp.get_json()
-    assert data["updated"] == 1
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job"]["id"]
+    assert resp.headers["Location"].endswith(f"/movies/enrich/jobs/{job_id}")
+
+    client.app.jobs.wait(job_id, timeout=5)
+    job = client.get(f"/movies/enrich/jobs/{job_id}", headers=headers).get_json()
+    assert job["job"]["status"] == "succeeded"
+    assert job["job"]["result"]["updated"] == 1
 
     resp2 = client.get("/movies/1", headers=headers)
     assert resp2.get_json()["movie"]["imdb_id"] == "ttTEST"
@@ -237,27 +243,41 @@ def test_enrich_ids(client, monkeypatch):
 def test_enrich_metadata(client, monkeypatch):
     client.app.catalog.movies[0].imdb_id = "ttDUMMY"
 
-    def fake_enrich(cat, max_concurrency=2):
-        enriched = 0
+    def fake_enrich(cat, max_concurrency=2, policy=None, **kwargs):
+        report = EnrichReport()
         for m in cat:
             m.poster = "url"
             m.plot = "plot"
             m.runtime = 123
-            enriched += 1
-        return enriched
+            report.updated += 1
+        return report
 
     monkeypatch.setattr("catalog.api.enrich.enrich_metadata_service", fake_enrich)
 
     correct = client.application.config["API_KEY"]
     headers = {"X-API-Key": correct}
     resp = client.post("/movies/enrich/metadata", json={}, headers=headers)
-    assert resp.status_code == 200
-    data = resp.get_json()
-    assert data["enriched"] == 1
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job"]["id"]
+
+    job = client.app.jobs.wait(job_id, timeout=5)
+    assert job.status == "succeeded"
+    assert job.result["enriched"] == 1
     m = client.app.catalog.movies[0]
     assert m.poster == "url" and m.runtime == 123
 
 
+@pytest.mark.parametrize("value", [None, [2], "3", 0, -1, 2.5, True])
+def test_enrich_rejects_bad_max_concurrency(client, value):
+    headers = {"X-API-Key": client.application.config["API_KEY"]}
+    resp = client.post(
+        "/movies/enrich/ids", json={"max_concurrency": value}, headers=headers
+    )
+    assert resp.status_code == 400
+    assert "max_concurrency" in resp.get_json()["error"]
+    assert client.app.jobs.list_jobs() == []
+
+
 def test_import_csv_file(client):
     rows = [
         ["id", "title", "year", "genres", "rating", "tags"],
@@ -93,3 +93,93 @@ def test_requires_api_key(client, method, path, data):
     else:
         # put/delete: either 200/204 or 404, but not 401
         assert resp.status_code in (200, 204, 404)
+
+
+def test_verified_claims_are_cached(client, monkeypatch):
+    from catalog.api import auth
+
+    headers = {"X-API-Key": client.application.config["API_KEY"]}
+    assert client.get("/movies/1", headers=headers).status_code == 200
+    assert len(client.application.claims_cache) == 1
+
+    # a cached token is not decoded again
+    def fail(*args, **kwargs):
+        raise AssertionError("token verified twice")
+
+    monkeypatch.setattr(auth, "verify_jwt_in_request", fail)
+    hits = auth.CLAIMS_LOOKUPS.value(result="hit")
+    assert client.get("/movies/1", headers=headers).status_code == 200
+    assert auth.CLAIMS_LOOKUPS.value(result="hit") == hits + 1
+
+
+def test_tampered_token_is_not_served_from_cache(client):
+    headers = {"X-API-Key": client.application.config["API_KEY"]}
+    assert client.get("/movies/1", headers=headers).status_code == 200
+
+    token = client.environ_base["HTTP_AUTHORIZATION"]
+    headers["Authorization"] = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+    assert client.get("/movies/1", headers=headers).status_code in (401, 422)
+
+
+def test_cached_token_is_still_checked_against_the_blocklist(client, monkeypatch):
+    from catalog.api import auth
+
+    headers = {"X-API-Key": client.application.config["API_KEY"]}
+    assert client.get("/movies/1", headers=headers).status_code == 200
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token verified twice")
+
+    monkeypatch.setattr(auth, "verify_jwt_in_request", fail)
+    jwt = client.application.extensions["flask-jwt-extended"]
+    jwt.token_in_blocklist_loader(lambda header, claims: True)
+    assert client.get("/movies/1", headers=headers).status_code == 401
+
+
+def test_cache_hit_and_miss_give_the_same_claims(client):
+    from catalog.api import auth
+
+    app = client.application
+    headers = {"Authorization": client.environ_base["HTTP_AUTHORIZATION"]}
+    misses = auth.CLAIMS_LOOKUPS.value(result="miss")
+
+    with app.test_request_context(headers=headers):
+        auth._verify_jwt()
+        verified = auth.jwt_claims()
+    with app.test_request_context(headers=headers):
+        auth._verify_jwt()
+        cached = auth.jwt_claims()
+
+    assert verified["roles"] == ["admin"]
+    assert cached == verified
+    assert auth.CLAIMS_LOOKUPS.value(result="miss") == misses + 1
+
+
+def test_uncached_tokens_count_as_misses(client):
+    from catalog.api import auth
+
+    client.application.claims_cache.maxsize = 0
+    headers = {"X-API-Key": client.application.config["API_KEY"]}
+    misses = auth.CLAIMS_LOOKUPS.value(result="miss")
+
+    for _ in range(2):
+        assert client.get("/movies/1", headers=headers).status_code == 200
+
+    assert auth.CLAIMS_LOOKUPS.value(result="miss") == misses + 2
+
+
+def test_claims_cache_respects_exp_and_size():
+    from catalog.api.auth import ClaimsCache
+
+    now = [1000.0]
+    cache = ClaimsCache(maxsize=2, ttl=60, clock=lambda: now[0])
+    cache.put(b"a", {}, {"exp": 1010})
+    cache.put(b"b", {}, {})
+    assert cache.get(b"a") is not None
+    cache.put(b"c", {}, {})
+    assert cache.get(b"b") is None  # least recently used went first
+
+    now[0] = 1010
+    assert cache.get(b"a") is None
+    now[0] = 1061
+    assert cache.get(b"c") is None
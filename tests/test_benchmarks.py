@@ -0,0 +1,65 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import suite  # noqa: E402
+from synthetic import SyntheticSpec, generate, write  # noqa: E402
+
+from catalog.io_utils import import_catalog_from_csv  # noqa: E402
+
+
+def test_same_seed_gives_the_same_catalog(tmp_path):
+    spec = SyntheticSpec(size=50, seed=7)
+
+    first = write(spec, tmp_path / "a.json").read_bytes()
+    again = write(spec, tmp_path / "b.json").read_bytes()
+    other = write(SyntheticSpec(size=50, seed=8), tmp_path / "c.json").read_bytes()
+
+    assert first == again
+    assert first != other
+    assert list(generate(spec)) == list(generate(spec))
+
+
+def test_csv_is_what_the_importer_reads(tmp_path):
+    spec = SyntheticSpec(size=20, seed=3)
+
+    catalog = import_catalog_from_csv(write(spec, tmp_path / "movies.csv"))
+
+    expected = list(generate(spec))
+    assert [m.title for m in catalog] == [m["title"] for m in expected]
+    assert [m.tags for m in catalog] == [m["tags"] for m in expected]
+
+
+def _report(path: Path, median: float) -> Path:
+    result = {"name": "io.import_json", "size": 1000, "ops": 1000}
+    result.update(min=median, median=median)
+    path.write_text(json.dumps({"results": [result]}), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "current, threshold, code",
+    [(1.05, 0.10, 0), (1.15, 0.10, 1), (1.15, 0.20, 0), (0.50, 0.10, 0)],
+)
+def test_compare_fails_only_past_the_threshold(tmp_path, current, threshold, code):
+    args = argparse.Namespace(
+        baseline=_report(tmp_path / "baseline.json", 1.0),
+        current=_report(tmp_path / "current.json", current),
+        threshold=threshold,
+        metric="median",
+    )
+
+    assert suite.compare(args) == code
+
+
+def test_compare_exit_code_from_the_command_line(tmp_path):
+    baseline = _report(tmp_path / "baseline.json", 1.0)
+    current = _report(tmp_path / "current.json", 1.5)
+
+    assert suite.main(["compare", str(baseline), str(current)]) == 1
+    assert suite.main(["compare", str(baseline), str(baseline)]) == 0
@@ -0,0 +1,108 @@
+import pytest
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(save_in="catalog.api.movies", BULK_MAX_ITEMS=5)
+
+
+def test_bulk_applies_each_item_and_saves_once(client):
+    resp = client.post(
+        "/movies/bulk",
+        json={
+            "operations": [
+                {"op": "create", "data": {"id": 3, "title": "Alien", "year": 1979}},
+                {"op": "update", "id": 1, "data": {"rating": 7.5}},
+                {"op": "delete", "id": 2},
+                {"op": "delete", "id": 42},
+                {"op": "update", "id": 1, "data": {"plot": "nope"}},
+            ]
+        },
+    )
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["committed"] is True
+    assert [r["status"] for r in body["results"]] == [201, 200, 204, 404, 400]
+    assert body["results"][4]["error"] == "Field not allowed: plot"
+    assert len(client.saves) == 1
+
+    catalog = client.app.catalog
+    assert sorted(m.id for m in catalog) == [1, 3]
+    assert catalog.find_by_id(1).rating == 7.5
+
+
+def test_bulk_atomic_rolls_back(client):
+    catalog = client.app.catalog
+    before = [(m.id, m.title, m.rating) for m in catalog]
+    version, changes = catalog.version, len(catalog.changes)
+
+    resp = client.post(
+        "/movies/bulk",
+        json={
+            "atomic": True,
+            "operations": [
+                {"op": "update", "id": 1, "data": {"rating": 9.9}},
+                {"op": "delete", "id": 2},
+                {"op": "create", "data": {"id": 3, "title": "Alien", "year": 1979}},
+                {"op": "create", "data": {"id": 1, "title": "Dup", "year": 1990}},
+            ],
+        },
+    )
+
+    assert resp.status_code == 422
+    body = resp.get_json()
+    assert body["committed"] is False
+    assert body["results"][-1]["status"] == 409
+    assert [(m.id, m.title, m.rating) for m in catalog] == before
+    assert (catalog.version, len(catalog.changes)) == (version, changes)
+    assert client.saves == []
+
+
+def test_bulk_atomic_publishes_the_whole_batch(client):
+    catalog = client.app.catalog
+    version = catalog.version
+
+    resp = client.post(
+        "/movies/bulk",
+        json={
+            "atomic": True,
+            "operations": [
+                {"op": "update", "id": 1, "data": {"rating": 9.9}},
+                {"op": "delete", "id": 2},
+                {"op": "create", "data": {"id": 3, "title": "Alien", "year": 1979}},
+            ],
+        },
+    )
+
+    assert resp.status_code == 200
+    assert resp.get_json()["committed"] is True
+    assert [(m.id, m.rating) for m in catalog] == [(1, 9.9), (3, 0.0)]
+    assert [(c.movie_id, c.op) for c in catalog.changes.since(version)] == [
+        (1, "update"),
+        (2, "delete"),
+        (3, "insert"),
+    ]
+    assert len(client.saves) == 1
+
+
+def test_bulk_validates_request(client):
+    assert client.post("/movies/bulk", json={"operations": []}).status_code == 400
+    too_many = [{"op": "delete", "id": i} for i in range(6)]
+    resp = client.post("/movies/bulk", json={"operations": too_many})
+    assert resp.status_code == 413
+
+    resp = client.post("/movies/bulk", json={"operations": [{"op": "upsert"}]})
+    assert resp.get_json()["results"][0]["status"] == 400
+    assert resp.get_json()["committed"] is False
+
+
+def test_multi_get(client):
+    resp = client.get("/movies?ids=2,99,1")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [m["id"] for m in body["movies"]] == [2, 1]
+    assert body["missing"] == [99]
+
+    assert client.get("/movies?ids=1,x").status_code == 400
+    assert client.get("/movies?ids=1,2,3,4,5,6").status_code == 400
@@ -0,0 +1,146 @@
+import threading
+
+import pytest
+from catalog.api import import_export
+from catalog.changelog import DELETE, INSERT, UPDATE, ChangeLog
+from catalog.models import Movie
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(save_in="catalog.api.movies", CHANGE_LOG_SIZE=5)
+
+
+def test_changes_since_version(client):
+    version = client.get("/movies/export/json").get_json()["version"]
+
+    client.post("/movies", json={"id": 3, "title": "Alien", "year": 1979})
+    client.put("/movies/1", json={"rating": 7.5})
+    client.put("/movies/3", json={"rating": 8.4})
+    client.delete("/movies/2")
+
+    body = client.get(f"/movies/changes?since={version}").get_json()
+    assert body["version"] == version + 4
+    assert [(c["id"], c["op"]) for c in body["changes"]] == [
+        (1, "update"),
+        (3, "insert"),
+        (2, "delete"),
+    ]
+    assert body["changes"][1]["movie"]["rating"] == 8.4
+    assert "movie" not in body["changes"][2]
+
+    empty = client.get(f"/movies/changes?since={body['version']}").get_json()
+    assert empty["changes"] == []
+
+
+def test_export_version_never_covers_writes_missing_from_the_body(client, monkeypatch):
+    real_export = import_export.export_json_service
+
+    def export_then_write(catalog):
+        movies = real_export(catalog)
+        catalog.add_movie(Movie(id=3, title="Alien", year=1979))
+        return movies
+
+    monkeypatch.setattr(import_export, "export_json_service", export_then_write)
+    snapshot = client.get("/movies/export/json").get_json()
+    assert [m["id"] for m in snapshot["movies"]] == [1, 2]
+
+    body = client.get(f"/movies/changes?since={snapshot['version']}").get_json()
+    assert [c["id"] for c in body["changes"]] == [3]
+
+
+def test_changes_version_covers_writes_landing_during_the_read(client):
+    catalog = client.app.catalog
+    real_since = catalog.changes.since
+    writer = threading.Thread(
+        target=catalog.add_movie, args=(Movie(id=3, title="Alien", year=1979),)
+    )
+
+    def since_then_write(version):
+        changes = real_since(version)
+        writer.start()
+        writer.join(0.1)  # waits for the catalog lock when that is held
+        return changes
+
+    catalog.changes.since = since_then_write
+    version = catalog.version
+    body = client.get(f"/movies/changes?since={version}").get_json()
+    writer.join()
+    del catalog.changes.since
+
+    assert body["changes"] == []
+    later = client.get(f"/movies/changes?since={body['version']}").get_json()
+    assert [c["id"] for c in later["changes"]] == [3]
+
+
+def test_changes_too_old_requires_resync(client):
+    for rating in range(6):
+        client.put("/movies/1", json={"rating": float(rating)})
+
+    resp = client.get("/movies/changes?since=0")
+    assert resp.status_code == 410
+    body = resp.get_json()
+    assert body["resync"] is True
+    assert body["snapshot"] == "/movies/export/json"
+
+
+def test_changes_after_import_requires_resync(client):
+    version = client.get("/movies/export/json").get_json()["version"]
+    client.post(
+        "/movies/import/json",
+        json={"movies": [{"id": 9, "title": "Heat", "year": 1995}]},
+    )
+
+    assert client.get(f"/movies/changes?since={version}").status_code == 410
+    snapshot = client.get("/movies/export/json").get_json()
+    resp = client.get(f"/movies/changes?since={snapshot['version']}")
+    assert resp.status_code == 200
+
+
+def test_changes_other_epoch_requires_resync(client):
+    assert client.get("/movies/changes?since=0&epoch=deadbeef").status_code == 410
+
+
+def test_changes_requires_since(client):
+    assert client.get("/movies/changes").status_code == 400
+
+
+def test_change_log_floor():
+    log = ChangeLog(maxlen=2)
+    log.record(1, 10)
+    log.record(2, 11)
+    log.record(3, 10, DELETE)
+
+    assert log.floor == 1
+    assert log.since(0) is None
+    assert [(c.movie_id, c.deleted) for c in log.since(1)] == [
+        (11, False),
+        (10, True),
+    ]
+
+    log.resize(1)
+    assert log.floor == 2
+    assert len(log.since(2)) == 1
+
+
+def test_change_log_reports_what_the_reader_has_not_seen():
+    log = ChangeLog()
+    log.record(1, 10, UPDATE)
+    log.record(2, 11, INSERT)
+    log.record(3, 11, UPDATE)
+    log.record(4, 12, DELETE)
+    log.record(5, 12, INSERT)
+    log.record(6, 13, INSERT)
+    log.record(7, 13, DELETE)
+
+    assert [(c.movie_id, c.op) for c in log.since(0)] == [
+        (10, "update"),
+        (11, "insert"),
+        (12, "update"),
+        (13, "delete"),
+    ]
+    assert [(c.movie_id, c.op) for c in log.since(2)] == [
+        (11, "update"),
+        (12, "update"),
+        (13, "delete"),
+    ]
@@ -0,0 +1,81 @@
+import gzip
+import zlib
+
+import pytest
+from catalog.api.compression import COMPRESSED
+from catalog.models import Movie
+
+
+@pytest.fixture
+def client(make_client):
+    movies = [
+        Movie(id=i, title=f"Movie {i}", year=2000, genres=["drama"])
+        for i in range(1, 101)
+    ]
+    return make_client(movies, save_in="catalog.api.movies", COMPRESS_MIN_SIZE=500)
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("gzip", gzip.decompress), ("deflate", zlib.decompress)]
+)
+def test_large_lists_are_compressed(client, encoding, decompress):
+    plain = client.get("/movies")
+    assert "Content-Encoding" not in plain.headers
+
+    resp = client.get("/movies", headers={"Accept-Encoding": f"{encoding}, br"})
+    assert resp.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert int(resp.headers["Content-Length"]) < len(plain.data)
+    assert decompress(resp.data) == plain.data
+    assert resp.headers["ETag"] == plain.headers["ETag"][:-1] + f'-{encoding}"'
+
+
+def test_small_bodies_are_sent_as_is(client):
+    resp = client.get("/movies/1", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_unchanged_lists_are_compressed_once(client):
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/movies", headers=headers)
+    cached = COMPRESSED.value(encoding="gzip", source="cache")
+
+    second = client.get("/movies", headers=headers)
+    assert COMPRESSED.value(encoding="gzip", source="cache") == cached + 1
+    assert second.data == first.data
+
+    # a write changes the ETag, so the next list is compressed afresh
+    client.put("/movies/1", json={"title": "Changed"})
+    third = client.get("/movies", headers=headers)
+    assert b"Changed" in gzip.decompress(third.data)
+
+
+def test_compressed_etag_still_validates(client):
+    # the second request is answered from the response cache
+    resp = client.get("/movies", headers={"Accept-Encoding": "gzip"})
+    again = client.get(
+        "/movies",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["ETag"]},
+    )
+    assert again.status_code == 304
+    assert again.headers["ETag"] == resp.headers["ETag"]
+
+    etag = client.get("/movies/1").headers["ETag"]
+    compressed = etag[:-1] + '-gzip"'
+    # If-Match compares strongly: a weak tag never matches
+    resp = client.put(
+        "/movies/1", json={"title": "X"}, headers={"If-Match": f"W/{etag}"}
+    )
+    assert resp.status_code == 412
+    resp = client.put(
+        "/movies/1", json={"title": "X"}, headers={"If-Match": compressed}
+    )
+    assert resp.status_code == 200
+
+
+def test_streamed_export_is_compressed(client):
+    resp = client.get("/movies/export/csv", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resp.headers
+    assert gzip.decompress(resp.data).startswith(b"id,title,year")
@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(save_in="catalog.api.movies")
+
+
+def test_list_etag_and_304(client):
+    resp = client.get("/movies")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert "Last-Modified" in resp.headers
+
+    resp = client.get("/movies", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+
+    client.post("/movies", json={"id": 3, "title": "Alien", "year": 1979})
+    resp = client.get("/movies", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_movie_etag_only_changes_with_that_movie(client):
+    etag = client.get("/movies/1").headers["ETag"]
+
+    client.put("/movies/2", json={"rating": 9.0})
+    assert client.get("/movies/1", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/movies/1", json={"rating": 7.0})
+    resp = client.get("/movies/1", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.get_json()["movie"]["rating"] == 7.0
+
+
+def test_if_modified_since(client):
+    last_modified = client.get("/movies/1").headers["Last-Modified"]
+    resp = client.get("/movies/1", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 304
+
+
+def test_put_and_delete_honour_if_match(client):
+    etag = client.get("/movies/1").headers["ETag"]
+
+    resp = client.put("/movies/1", json={"title": "X"}, headers={"If-Match": etag})
+    assert resp.status_code == 200
+    new_etag = resp.headers["ETag"]
+    assert new_etag != etag
+
+    # a second writer still holding the old ETag loses
+    resp = client.put("/movies/1", json={"title": "Y"}, headers={"If-Match": etag})
+    assert resp.status_code == 412
+    assert client.get("/movies/1").get_json()["movie"]["title"] == "X"
+
+    resp = client.delete("/movies/1", headers={"If-Match": etag})
+    assert resp.status_code == 412
+    resp = client.delete("/movies/1", headers={"If-Match": new_etag})
+    assert resp.status_code == 204
+
+
+def test_import_keeps_versions_monotonic(client):
+    before = client.app.catalog.version
+    etag = client.get("/movies").headers["ETag"]
+
+    client.post(
+        "/movies/import/json", json={"movies": [{"id": 1, "title": "A", "year": 2000}]}
+    )
+
+    assert client.app.catalog.version > before
+    assert client.get("/movies", headers={"If-None-Match": etag}).status_code == 200
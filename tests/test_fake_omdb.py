@@ -0,0 +1,72 @@
+import random
+import sys
+from pathlib import Path
+
+import catalog.metadata as meta
+import pytest
+from catalog.resilience import RetryPolicy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from fake_omdb import FakeOmdbConfig, parse_latency, running_fake_omdb  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def closed_breaker():
+    meta.omdb_breaker.reset()
+    yield
+    meta.omdb_breaker.reset()
+
+
+def test_parse_latency():
+    rng = random.Random(1)
+    assert parse_latency("none")(rng) == 0
+    assert parse_latency("fixed:0.5")(rng) == 0.5
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:1")
+
+
+@pytest.mark.asyncio
+async def test_enrichment_against_fake_server(monkeypatch):
+    async with running_fake_omdb() as (base_url, stats):
+        monkeypatch.setenv("OMDB_BASE_URL", base_url)
+
+        ids = await meta._fetch_ids(["Alien", "Heat"])
+        assert ids["Alien"].startswith("tt")
+        meta_map = await meta._enrich_all([ids["Alien"], ids["Heat"]])
+
+    assert meta_map[ids["Alien"]]["Title"] == "Alien"
+    assert meta_map[ids["Heat"]]["Runtime"].endswith("min")
+    assert stats["requests"] == 4
+
+
+@pytest.mark.asyncio
+async def test_retries_ride_out_throttling(monkeypatch):
+    config = FakeOmdbConfig(throttle_rate=0.3, seed=7)
+    policy = RetryPolicy(attempts=10, base_delay=0.001, max_delay=0.01)
+    ids = [f"tt{i:07d}" for i in range(30)]
+
+    async with running_fake_omdb(config) as (base_url, stats):
+        monkeypatch.setenv("OMDB_BASE_URL", base_url)
+        meta.omdb_breaker.failure_threshold = 1000
+        try:
+            meta_map = await meta._enrich_all(ids, max_concurrency=5, policy=policy)
+        finally:
+            meta.omdb_breaker.failure_threshold = 5
+
+    assert stats["throttled"] > 0
+    assert all("error" not in meta_map[iid] for iid in ids)
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_reported_per_id(monkeypatch):
+    config = FakeOmdbConfig(error_rate=1.0)
+    policy = RetryPolicy(attempts=1)
+
+    async with running_fake_omdb(config) as (base_url, _):
+        monkeypatch.setenv("OMDB_BASE_URL", base_url)
+        meta_map = await meta._enrich_all(["tt1", "tt2"], policy=policy)
+
+    assert set(meta_map) == {"tt1", "tt2"}
+    assert all("error" in data for data in meta_map.values())
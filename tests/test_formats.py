@@ -0,0 +1,90 @@
+import pytest
+from catalog.api.formats import BINARY_FORMATS, encode_stream
+from catalog.models import Movie
+
+msgpack = pytest.importorskip("msgpack")
+cbor2 = pytest.importorskip("cbor2")
+
+
+@pytest.fixture
+def client(make_client):
+    movies = [
+        Movie(id=1, title="Titanic", year=1997, genres=["drama"]),
+        Movie(id=2, title="Heat", year=1995, rating=8.3),
+    ]
+    return make_client(movies, save_in="catalog.services")
+
+
+@pytest.mark.parametrize(
+    "mimetype, loads",
+    [("application/msgpack", msgpack.unpackb), ("application/cbor", cbor2.loads)],
+)
+@pytest.mark.parametrize("path", ["/movies", "/movies/2", "/movies/export/json"])
+def test_binary_responses_match_json(client, path, mimetype, loads):
+    as_json = client.get(path).get_json()
+    resp = client.get(path, headers={"Accept": mimetype})
+
+    assert resp.status_code == 200
+    assert resp.mimetype == mimetype
+    assert "Accept" in resp.headers["Vary"]
+    assert loads(resp.data) == as_json
+
+
+def test_cached_json_is_not_served_to_binary_clients(client):
+    assert client.get("/movies").mimetype == "application/json"
+    resp = client.get("/movies", headers={"Accept": "application/msgpack"})
+    assert resp.mimetype == "application/msgpack"
+
+
+def test_unsupported_accept_is_406(client):
+    resp = client.get("/movies", headers={"Accept": "application/xml"})
+    assert resp.status_code == 406
+
+
+@pytest.mark.parametrize("path", ["/movies", "/movies/1"])
+def test_each_format_has_an_etag_of_its_own(client, path):
+    json_etag = client.get(path).headers["ETag"]
+    msgpack_etag = client.get(path, headers={"Accept": "application/msgpack"}).headers[
+        "ETag"
+    ]
+    assert msgpack_etag != json_etag
+
+    headers = {"Accept": "application/msgpack", "If-None-Match": json_etag}
+    assert client.get(path, headers=headers).status_code == 200
+
+    headers["If-None-Match"] = msgpack_etag
+    resp = client.get(path, headers=headers)
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == msgpack_etag
+    assert "Accept" in resp.headers["Vary"]
+
+
+def test_unsupported_accept_is_406_even_when_unchanged(client):
+    etag = client.get("/movies").headers["ETag"]
+    headers = {"Accept": "application/xml", "If-None-Match": etag}
+    assert client.get("/movies", headers=headers).status_code == 406
+
+
+def test_if_match_takes_the_etag_of_any_format(client):
+    etag = client.get("/movies/1", headers={"Accept": "application/cbor"}).headers[
+        "ETag"
+    ]
+    resp = client.put("/movies/1", json={"title": "X"}, headers={"If-Match": etag})
+    assert resp.status_code == 200
+
+
+def test_import_accepts_msgpack(client):
+    body = msgpack.packb({"movies": [{"id": 7, "title": "Alien", "year": 1979}]})
+    resp = client.post(
+        "/movies/import/json",
+        data=body,
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 201
+    assert [m.id for m in client.app.catalog] == [7]
+
+
+def test_encode_stream_handles_large_containers():
+    payload = {"movies": [{"id": i} for i in range(70_000)], "version": 3}
+    for fmt in BINARY_FORMATS.values():
+        assert fmt.decode(b"".join(encode_stream(fmt, payload))) == payload
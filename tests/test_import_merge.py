@@ -0,0 +1,99 @@
+import io
+
+import pytest
+from catalog.models import Catalog, Movie
+from catalog.services import merge_rows
+
+
+@pytest.fixture
+def client(make_client):
+    movies = [
+        Movie(id=1, title="Titanic", year=1997, plot="Ship sinks"),
+        Movie(id=2, title="Heat", year=1995),
+    ]
+    return make_client(movies, save_in="catalog.services")
+
+
+ROWS = [
+    {"id": 1, "title": "Titanic", "year": 1997, "rating": 7.9},
+    {"id": 2, "title": "Heat", "year": 1995},
+    {"id": 3, "title": "Alien", "year": 1979},
+]
+
+
+def test_merge_json_keeps_enrichment(client):
+    catalog = client.app.catalog
+    resp = client.post("/movies/import/json?mode=merge", json={"movies": ROWS})
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body["inserted"], body["updated"], body["unchanged"]) == (1, 1, 1)
+    assert body["deleted"] == 0
+    assert client.app.catalog is catalog
+    assert catalog.find_by_id(1).rating == 7.9
+    assert catalog.find_by_id(1).plot == "Ship sinks"
+    assert len(client.saves) == 1
+
+
+def test_merge_delete_missing(client):
+    resp = client.post(
+        "/movies/import/json?mode=merge&delete_missing=true",
+        json={"movies": ROWS[:1]},
+    )
+    assert resp.get_json()["deleted"] == 1
+    assert [m.id for m in client.app.catalog] == [1]
+
+
+def test_merge_rejects_bad_rows_without_changes(client):
+    version = client.app.catalog.version
+    resp = client.post(
+        "/movies/import/json?mode=merge",
+        json={"movies": [ROWS[2], {"id": 1, "title": "T", "year": 3000}]},
+    )
+    assert resp.status_code == 400
+    assert client.app.catalog.version == version
+    assert client.app.catalog.find_by_id(3) is None
+
+
+def test_merge_csv(client):
+    data = (
+        "id,title,year,genres,rating,tags\n"
+        "2,Heat,1995,crime|drama,8.3,\n"
+        "5,Matrix,1999,action,8.7,neo\n"
+    )
+    resp = client.post(
+        "/movies/import/csv?mode=merge",
+        data={"file": (io.BytesIO(data.encode()), "movies.csv")},
+        content_type="multipart/form-data",
+    )
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert (body["inserted"], body["updated"], body["unchanged"]) == (1, 1, 0)
+    assert client.app.catalog.find_by_id(2).genres == ["crime", "drama"]
+
+
+def test_repeated_import_is_skipped(client):
+    first = client.post("/movies/import/json?mode=merge", json={"movies": ROWS})
+    assert first.get_json()["inserted"] == 1
+    version = client.app.catalog.version
+
+    again = client.post("/movies/import/json?mode=merge", json={"movies": ROWS})
+    assert again.status_code == 200
+    assert again.get_json()["skipped"] is True
+    assert client.app.catalog.version == version
+    assert len(client.saves) == 1
+
+    # a local edit since the last import means the file is applied again
+    client.put("/movies/1", json={"rating": 1.0})
+    third = client.post("/movies/import/json?mode=merge", json={"movies": ROWS})
+    assert third.get_json()["updated"] == 1
+
+
+def test_bad_import_mode(client):
+    resp = client.post("/movies/import/json?mode=append", json={"movies": ROWS})
+    assert resp.status_code == 400
+
+
+def test_merge_rows_rejects_duplicates():
+    with pytest.raises(ValueError):
+        merge_rows(Catalog(), [ROWS[0], ROWS[0]])
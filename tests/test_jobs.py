@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+from catalog.jobs import (
+    CANCELLED,
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    JobConflictError,
+    JobLimitError,
+    JobManager,
+)
+
+
+def quick_runner(job, progress, cancelled):
+    progress(0, 2, 0)
+    progress(2, 2, 0)
+    return {"updated": 2}
+
+
+def test_job_runs_and_reports_progress(tmp_path):
+    jobs = JobManager(tmp_path / "jobs.json")
+    jobs.register("ids", quick_runner)
+
+    job = jobs.submit("ids", {"max_concurrency": 3})
+    jobs.wait(job.id, timeout=5)
+
+    assert job.status == SUCCEEDED
+    assert (job.done, job.total, job.failed) == (2, 2, 0)
+    assert job.result == {"updated": 2}
+    assert job.to_dict()["eta"] is None
+
+
+def test_failing_job_records_error(tmp_path):
+    def boom(job, progress, cancelled):
+        raise RuntimeError("OMDb exploded")
+
+    jobs = JobManager(tmp_path / "jobs.json")
+    jobs.register("ids", boom)
+
+    job = jobs.submit("ids")
+    jobs.wait(job.id, timeout=5)
+    assert job.status == FAILED
+    assert job.error == "OMDb exploded"
+
+
+def test_cancel_running_job(tmp_path):
+    started = threading.Event()
+
+    def slow(job, progress, cancelled):
+        started.set()
+        cancelled.wait(5)
+        return {}
+
+    jobs = JobManager(tmp_path / "jobs.json")
+    jobs.register("metadata", slow)
+
+    job = jobs.submit("metadata")
+    assert started.wait(5)
+    jobs.cancel(job.id)
+    jobs.wait(job.id, timeout=5)
+    assert job.status == CANCELLED
+
+
+def test_limits_and_conflicts(tmp_path):
+    release = threading.Event()
+
+    def blocked(job, progress, cancelled):
+        release.wait(5)
+        return {}
+
+    jobs = JobManager(tmp_path / "jobs.json", max_running=1, max_queued=1)
+    jobs.register("ids", blocked)
+    jobs.register("metadata", blocked)
+    jobs.register("other", blocked)
+
+    first = jobs.submit("ids")
+    with pytest.raises(JobConflictError):
+        jobs.submit("ids")
+
+    queued = jobs.submit("metadata")
+    with pytest.raises(JobLimitError):
+        jobs.submit("other")
+
+    jobs.cancel(queued.id)
+    assert queued.status == CANCELLED
+
+    release.set()
+    jobs.wait(first.id, timeout=5)
+    assert first.status == SUCCEEDED
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path):
+    path = tmp_path / "jobs.json"
+    release = threading.Event()
+
+    def blocked(job, progress, cancelled):
+        release.wait(5)
+        return {}
+
+    before = JobManager(path, max_running=1)
+    before.register("ids", blocked)
+    before.register("metadata", blocked)
+    before.submit("ids")
+    pending = before.submit("metadata")
+    assert pending.status == QUEUED
+
+    after = JobManager(path)
+    after.register("ids", quick_runner)
+    after.register("metadata", quick_runner)
+    after.resume()
+
+    job = after.wait(pending.id, timeout=5)
+    assert job.status == SUCCEEDED
+    assert job.result == {"updated": 2}
+    release.set()
+
+
+def test_workers_sharing_the_file_share_the_jobs(tmp_path):
+    path = tmp_path / "jobs.json"
+    started = threading.Event()
+
+    def slow(job, progress, cancelled):
+        started.set()
+        cancelled.wait(5)
+        return {}
+
+    runner = JobManager(path, max_running=2, poll_interval=0.01)
+    delegate = JobManager(path)
+    delegate.delegate()
+    for jobs in (runner, delegate):
+        jobs.register("metadata", slow)
+        jobs.register("ids", quick_runner)
+    runner.resume()
+
+    job = delegate.submit("metadata")
+    assert started.wait(5)
+    with pytest.raises(JobConflictError):
+        runner.submit("metadata")
+    # jobs of the runner are not lost to the delegate's writes, and the
+    # other way round
+    done = runner.submit("ids")
+    assert runner.wait(done.id, timeout=5).status == SUCCEEDED
+    assert delegate.get(done.id).status == SUCCEEDED
+    assert delegate.get(job.id).status == "running"
+
+    delegate.cancel(job.id)
+    assert runner.wait(job.id, timeout=5).status == CANCELLED
+    assert delegate.get(job.id).status == CANCELLED
+    runner.shutdown()
@@ -0,0 +1,110 @@
+import json
+import logging
+from queue import Queue
+
+import pytest
+from catalog.api.api import create_app
+from catalog.logging_config import (
+    DROPPED,
+    BoundedQueueHandler,
+    configure_logging,
+    request_id,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    yield path
+    shutdown_logging()
+
+
+def _queue_handlers():
+    return [
+        h for h in logging.getLogger().handlers if isinstance(h, BoundedQueueHandler)
+    ]
+
+
+def test_configure_is_idempotent(log_file):
+    configure_logging(str(log_file))
+    first = _queue_handlers()
+    configure_logging(str(log_file))
+    assert _queue_handlers() == first and len(first) == 1
+
+    configure_logging(str(log_file.with_name("other.log")))
+    assert len(_queue_handlers()) == 1
+    assert _queue_handlers() != first
+
+
+def test_records_are_json_lines_with_request_id(log_file):
+    configure_logging(str(log_file))
+    log = logging.getLogger("catalog.test")
+
+    token = request_id.set("req-42")
+    try:
+        log.debug("saved %d movies to %s", 3, "movies.json")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("import failed")
+    finally:
+        request_id.reset(token)
+    log.info("outside a request")
+    shutdown_logging()  # drains the queue
+
+    lines = [json.loads(line) for line in log_file.read_text().splitlines()]
+    saved, failed, outside = lines
+    assert saved["message"] == "saved 3 movies to movies.json"
+    assert saved["level"] == "DEBUG" and saved["logger"] == "catalog.test"
+    assert saved["request_id"] == "req-42"
+    assert failed["request_id"] == "req-42"
+    assert "ValueError: boom" in failed["exc"]
+    assert "request_id" not in outside
+
+
+def test_full_queue_drops_low_levels_first():
+    handler = BoundedQueueHandler(Queue(maxsize=1), block_timeout=0.01)
+    log = logging.getLogger("catalog.test.overflow")
+    record = log.makeRecord(log.name, logging.INFO, __file__, 1, "first", (), None)
+    handler.handle(record)
+
+    debug = DROPPED.value(level="DEBUG")
+    error = DROPPED.value(level="ERROR")
+    for level in (logging.DEBUG, logging.ERROR):
+        handler.handle(log.makeRecord(log.name, level, __file__, 1, "x", (), None))
+
+    assert DROPPED.value(level="DEBUG") == debug + 1
+    assert DROPPED.value(level="ERROR") == error + 1
+    assert handler.queue.get_nowait().getMessage() == "first"
+
+
+def test_prepare_leaves_the_callers_record_alone():
+    handler = BoundedQueueHandler(Queue())
+    log = logging.getLogger("catalog.test.prepare")
+    record = log.makeRecord(log.name, logging.INFO, __file__, 1, "%s", ("x",), None)
+
+    prepared = handler.prepare(record)
+
+    assert prepared is not record
+    assert (prepared.msg, prepared.args) == ("x", None)
+    assert (record.msg, record.args) == ("%s", ("x",))
+    assert not hasattr(record, "request_id")
+
+
+def test_requests_get_a_correlation_id(tmp_path, monkeypatch, log_file):
+    monkeypatch.setattr("catalog.api.extensions.limiter.enabled", False)
+    app = create_app(
+        {
+            "CATALOG_PATH": str(tmp_path / "movies.json"),
+            "LOG_FILE": str(log_file),
+        }
+    )
+    client = app.test_client()
+
+    echoed = client.get("/no/such/route", headers={"X-Request-Id": "edge-1"})
+    assert echoed.headers["X-Request-Id"] == "edge-1"
+
+    generated = client.get("/no/such/route", headers={"X-Request-Id": "bad id;"})
+    assert len(generated.headers["X-Request-Id"]) == 32
+    assert request_id.get() == "-"
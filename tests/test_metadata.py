@@ -1,6 +1,11 @@
+import asyncio
+from contextlib import contextmanager
+from urllib.parse import quote_plus
+
 import aiohttp
 import catalog.metadata as meta
 import pytest
+from catalog.checkpoint import EnrichCheckpoint
 from catalog.models import Catalog, Movie
 
 
@@ -92,7 +97,7 @@ async def test_fetch_metadata_http_error(monkeypatch):
 @pytest.mark.asyncio
 async def test_fetch_id_for_title_success(monkeypatch):
     title = "My Movie"
-    encoded = meta.quote_plus(title)
+    encoded = quote_plus(title)
     fake_url = f"https://www.omdbapi.com/?t={encoded}&apikey=KEY"
     fake_payload = {"imdbID": "tt12345"}
 
@@ -111,7 +116,7 @@ async def test_fetch_id_for_title_success(monkeypatch):
 @pytest.mark.asyncio
 async def test_fetch_id_for_title_not_found(monkeypatch):
     title = "Unknown"
-    encoded = meta.quote_plus(title)
+    encoded = quote_plus(title)
     fake_url = f"https://www.omdbapi.com/?t={encoded}&apikey=KEY"
 
     monkeypatch.setenv("OMDB_API_KEY", "KEY")
@@ -163,10 +168,10 @@ def test_fetch_imdb_ids_and_enrich(monkeypatch):
         ]
     )
 
-    async def fake_fetch_ids(titles, max_concurrency):
+    async def fake_fetch_ids(titles, max_concurrency, policy=None):
         return {"Movie One": "ttX", "Movie Two": None}
 
-    async def fake_enrich_all(ids, max_concurrency):
+    async def fake_enrich_all(ids, max_concurrency, policy=None):
         return {"ttX": {"Poster": "urlX", "Plot": "P", "Runtime": "45 min"}}
 
     monkeypatch.setattr(meta, "_fetch_ids", fake_fetch_ids)
@@ -185,3 +190,250 @@ def test_fetch_imdb_ids_and_enrich(monkeypatch):
     assert m2.poster is None
     assert m2.plot is None
     assert m2.runtime is None
+
+
+@pytest.mark.asyncio
+async def test__enrich_all_keeps_partial_results(monkeypatch):
+    meta.omdb_breaker.reset()
+
+    async def flaky_fetch_meta(iid, session):
+        if iid == "ttBad":
+            raise ValueError("bad payload")
+        return {"Plot": f"Plot for {iid}"}
+
+    monkeypatch.setattr(meta, "fetch_metadata", flaky_fetch_meta)
+
+    meta_map = await meta._enrich_all(["ttGood", "ttBad"], max_concurrency=2)
+    assert meta_map["ttGood"]["Plot"] == "Plot for ttGood"
+    assert meta_map["ttBad"] == {"error": "bad payload"}
+
+
+def test_enrich_catalog_reports_failures_per_movie(monkeypatch):
+    cat = Catalog(
+        [
+            Movie(id=1, title="Good", year=2000, imdb_id="tt1"),
+            Movie(id=2, title="Bad", year=2001, imdb_id="tt2"),
+        ]
+    )
+
+    async def fake_enrich_all(ids, max_concurrency, policy=None):
+        return {"tt1": {"Plot": "P", "Runtime": "90 min"}, "tt2": {"error": "boom"}}
+
+    monkeypatch.setattr(meta, "_enrich_all", fake_enrich_all)
+
+    report = meta.enrich_catalog(cat)
+    assert report.updated == 1
+    assert report.failed == {2: "boom"}
+    assert cat.find_by_id(1).runtime == 90
+
+
+def test_fetch_imdb_ids_keeps_id_on_error(monkeypatch):
+    cat = Catalog([Movie(id=1, title="Known", year=2000, imdb_id="ttOld")])
+
+    async def fake_fetch_ids(titles, max_concurrency, policy=None):
+        return {"Known": aiohttp.ClientError("down")}
+
+    monkeypatch.setattr(meta, "_fetch_ids", fake_fetch_ids)
+
+    report = meta.fetch_imdb_ids(cat)
+    assert report.updated == 0
+    assert report.failed == {1: "down"}
+    assert cat.find_by_id(1).imdb_id == "ttOld"
+
+
+def test_enrich_catalog_checkpoints_and_resumes(monkeypatch, tmp_path):
+    cat = Catalog(
+        [Movie(id=i, title=f"M{i}", year=2000, imdb_id=f"tt{i}") for i in range(1, 6)]
+    )
+    ckpt_path = tmp_path / "catalog.metadata.ckpt.json"
+    calls = []
+    saves = []
+    crash = {"on": ["tt3", "tt4"]}
+
+    async def crashing_enrich_all(ids, max_concurrency, policy=None):
+        calls.append(list(ids))
+        if list(ids) == crash["on"]:
+            raise RuntimeError("worker killed")
+        return {iid: {"Plot": f"Plot {iid}"} for iid in ids}
+
+    monkeypatch.setattr(meta, "_enrich_all", crashing_enrich_all)
+
+    with pytest.raises(RuntimeError):
+        meta.enrich_catalog(
+            cat,
+            checkpoint_path=ckpt_path,
+            persist=lambda c: saves.append([m.plot for m in c]),
+            batch_size=2,
+        )
+
+    assert saves == [["Plot tt1", "Plot tt2", None, None, None]]
+    ckpt = EnrichCheckpoint.load(ckpt_path, "metadata")
+    assert ckpt.completed == {(1, "M1"), (2, "M2")}
+    assert ckpt.cursor == 2
+
+    calls.clear()
+    crash["on"] = None
+    report = meta.enrich_catalog(cat, checkpoint_path=ckpt_path, batch_size=2)
+
+    assert calls == [["tt3", "tt4"], ["tt5"]]
+    assert report.updated == 3
+    assert report.skipped == 2
+    assert not ckpt_path.exists()
+
+
+def test_enrich_catalog_keeps_failures_for_next_run(monkeypatch, tmp_path):
+    cat = Catalog([Movie(id=1, title="A", year=2000, imdb_id="tt1")])
+    ckpt_path = tmp_path / "catalog.metadata.ckpt.json"
+
+    async def failing_enrich_all(ids, max_concurrency, policy=None):
+        return {iid: {"error": "503"} for iid in ids}
+
+    monkeypatch.setattr(meta, "_enrich_all", failing_enrich_all)
+
+    report = meta.enrich_catalog(cat, checkpoint_path=ckpt_path)
+    assert report.failed == {1: "503"}
+    assert EnrichCheckpoint.load(ckpt_path, "metadata").failures == {1: "503"}
+
+
+def test_enrich_catalog_forgets_movies_deleted_since_last_run(monkeypatch, tmp_path):
+    cat = Catalog(
+        [Movie(id=i, title=f"M{i}", year=2000, imdb_id=f"tt{i}") for i in range(1, 4)]
+    )
+    ckpt_path = tmp_path / "catalog.metadata.ckpt.json"
+
+    async def fake_enrich_all(ids, max_concurrency, policy=None):
+        return {iid: {"error": "503"} if iid == "tt2" else {"Plot": "P"} for iid in ids}
+
+    monkeypatch.setattr(meta, "_enrich_all", fake_enrich_all)
+
+    meta.enrich_catalog(cat, checkpoint_path=ckpt_path)
+    assert EnrichCheckpoint.load(ckpt_path, "metadata").failures == {2: "503"}
+
+    cat.remove(2)
+    report = meta.enrich_catalog(cat, checkpoint_path=ckpt_path)
+
+    assert report.failed == {}
+    assert not ckpt_path.exists()
+
+
+def test_finished_run_keeps_only_failures_in_the_checkpoint(monkeypatch, tmp_path):
+    cat = Catalog(
+        [Movie(id=i, title=f"M{i}", year=2000, imdb_id=f"tt{i}") for i in range(1, 4)]
+    )
+    ckpt_path = tmp_path / "catalog.metadata.ckpt.json"
+    calls = []
+
+    async def fake_enrich_all(ids, max_concurrency, policy=None):
+        calls.extend(ids)
+        return {iid: {"error": "503"} if iid == "tt2" else {"Plot": "P"} for iid in ids}
+
+    monkeypatch.setattr(meta, "_enrich_all", fake_enrich_all)
+
+    meta.enrich_catalog(cat, checkpoint_path=ckpt_path)
+    ckpt = EnrichCheckpoint.load(ckpt_path, "metadata")
+    assert (ckpt.completed, ckpt.failures, ckpt.cursor) == (set(), {2: "503"}, None)
+
+    # a movie that keeps failing does not stop the others being refreshed
+    calls.clear()
+    report = meta.enrich_catalog(cat, checkpoint_path=ckpt_path)
+    assert report.skipped == 0
+    assert sorted(calls) == ["tt1", "tt2", "tt3"]
+
+
+def test_renamed_movie_is_not_skipped_on_resume(tmp_path):
+    ckpt = EnrichCheckpoint(phase="ids", cursor=1, completed={(1, "Old"), (2, "B")})
+    movies = [Movie(id=1, title="New", year=2000), Movie(id=2, title="B", year=2000)]
+
+    ckpt.retain({(m.id, m.title) for m in movies})
+
+    assert [m.id for m in meta._select_work(movies, ckpt)] == [1]
+
+
+def test_enrich_catalog_reports_progress_and_stops(monkeypatch, tmp_path):
+    cat = Catalog(
+        [Movie(id=i, title=f"M{i}", year=2000, imdb_id=f"tt{i}") for i in range(1, 6)]
+    )
+    ckpt_path = tmp_path / "catalog.metadata.ckpt.json"
+    seen = []
+
+    async def fake_enrich_all(ids, max_concurrency, policy=None):
+        return {iid: {"Plot": "P"} for iid in ids}
+
+    monkeypatch.setattr(meta, "_enrich_all", fake_enrich_all)
+
+    report = meta.enrich_catalog(
+        cat,
+        checkpoint_path=ckpt_path,
+        batch_size=2,
+        progress=lambda done, total, failed: seen.append((done, total, failed)),
+        should_stop=lambda: len(seen) > 1,
+    )
+
+    assert seen == [(0, 5, 0), (2, 5, 0)]
+    assert report.stopped
+    assert report.updated == 2
+    assert EnrichCheckpoint.load(ckpt_path, "metadata").completed == {
+        (1, "M1"),
+        (2, "M2"),
+    }
+
+
+def test_enrich_catalog_applies_batches_to_the_catalog_current_at_write(
+    monkeypatch,
+):
+    started = Catalog([Movie(id=1, title="A", year=2000, imdb_id="tt1")])
+    # reloaded from disk while the batch was being fetched
+    current = Catalog(
+        [
+            Movie(id=1, title="A", year=2000, imdb_id="tt1"),
+            Movie(id=2, title="B", year=2001),
+        ]
+    )
+    saves = []
+
+    async def fake_enrich_all(ids, max_concurrency, policy=None):
+        return {iid: {"Plot": "P"} for iid in ids}
+
+    @contextmanager
+    def write():
+        yield current
+
+    monkeypatch.setattr(meta, "_enrich_all", fake_enrich_all)
+
+    report = meta.enrich_catalog(
+        started, persist=lambda c: saves.append(len(c)), write=write
+    )
+    assert report.updated == 1
+    assert current.find_by_id(1).plot == "P"
+    assert saves == [2]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lookups_are_coalesced(monkeypatch):
+    monkeypatch.setenv("OMDB_API_KEY", "KEY")
+    requests = []
+    release = asyncio.Event()
+
+    class SlowSession:
+        def get(self, url):
+            requests.append(url)
+            return SlowResponse()
+
+    class SlowResponse(DummyResponse):
+        async def json(self):
+            await release.wait()
+            return {"imdbID": "tt42"}
+
+    before = meta.omdb_flight.stats()["coalesced"]
+    session = SlowSession()
+    lookups = [
+        asyncio.create_task(meta.fetch_id_for_title("Same Title", session))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*lookups) == ["tt42"] * 3
+    assert len(requests) == 1
+    assert meta.omdb_flight.stats()["coalesced"] - before == 2
+    assert meta.omdb_flight.in_flight == 0
@@ -0,0 +1,139 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from catalog.api.instrumentation import REQUEST_SECONDS
+from catalog.metrics import Registry, merge_snapshots, render_text, write_snapshot
+from catalog.models import Movie
+from catalog.services import OPERATION_SECONDS, load_catalog, save_catalog
+
+
+def test_histogram_buckets_are_cumulative_when_rendered():
+    registry = Registry()
+    hist = registry.histogram("op_seconds", "Op time", ["op"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value, op="save")
+
+    text = render_text(registry)
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="save",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="save",le="1.0"} 3' in text
+    assert 'op_seconds_bucket{op="save",le="+Inf"} 4' in text
+    assert 'op_seconds_sum{op="save"} 3.65' in text
+    assert 'op_seconds_count{op="save"} 4' in text
+
+
+def test_render_escapes_label_values():
+    registry = Registry()
+    registry.counter("hits_total", "Hits", ["path"]).inc(path='a"b\\c\nd')
+    assert 'hits_total{path="a\\"b\\\\c\\nd"} 1.0' in render_text(registry)
+
+
+def test_histogram_rejects_other_buckets_for_same_name():
+    registry = Registry()
+    registry.histogram("x_seconds", "X", buckets=(1.0,))
+    with pytest.raises(ValueError):
+        registry.histogram("x_seconds", "X", buckets=(2.0,))
+
+
+def test_load_and_save_are_timed(tmp_path):
+    path = tmp_path / "movies.json"
+    saves = OPERATION_SECONDS.count(operation="save")
+    loads = OPERATION_SECONDS.count(operation="load")
+
+    save_catalog(load_catalog(str(path)), str(path))
+
+    assert OPERATION_SECONDS.count(operation="load") == loads + 1
+    assert OPERATION_SECONDS.count(operation="save") == saves + 1
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client([Movie(id=1, title="Heat", year=1995, genres=["crime"])])
+
+
+def test_requests_are_timed_per_endpoint_and_status(client):
+    labels = {"endpoint": "movies.get_movie", "method": "GET"}
+    found = REQUEST_SECONDS.count(status="200", **labels)
+    missing = REQUEST_SECONDS.count(status="404", **labels)
+
+    assert client.get("/movies/1").status_code == 200
+    assert client.get("/movies/999").status_code == 404
+
+    assert REQUEST_SECONDS.count(status="200", **labels) == found + 1
+    assert REQUEST_SECONDS.count(status="404", **labels) == missing + 1
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    client.get("/movies/1")
+    client.get("/no/such/route")
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    assert "version=0.0.4" in resp.headers["Content-Type"]
+    text = resp.get_data(as_text=True)
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'endpoint="movies.get_movie",method="GET",status="200",le="+Inf"' in text
+    assert 'endpoint="unmatched"' in text
+    assert 'http_requests_in_flight{endpoint="metrics"} 1.0' in text
+    assert "http_response_size_bytes_bucket" in text
+
+
+def _worker_registry(hits: float, busy: float, latency: float) -> Registry:
+    registry = Registry()
+    registry.counter("hits_total", "Hits", ["path"]).inc(hits, path="/movies")
+    registry.gauge("busy", "Busy").set(busy)
+    registry.histogram("op_seconds", "Op", buckets=(1.0,)).observe(latency)
+    return registry
+
+
+def test_snapshots_of_workers_are_merged(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    write_snapshot(_worker_registry(2, 1, 0.5), tmp_path, pid=os.getpid())
+    write_snapshot(_worker_registry(3, 4, 2.0), tmp_path, pid=os.getppid())
+    write_snapshot(_worker_registry(5, 9, 0.1), tmp_path, pid=exited.pid)
+
+    text = render_text(merge_snapshots(tmp_path))
+
+    # totals include the exited worker, its gauge is dropped
+    assert 'hits_total{path="/movies"} 10.0' in text
+    assert 'op_seconds_bucket{le="1.0"} 2' in text
+    assert "op_seconds_count 3" in text
+    assert f'busy{{pid="{os.getpid()}"}} 1.0' in text
+    assert f'busy{{pid="{os.getppid()}"}} 4.0' in text
+    assert f'pid="{exited.pid}"' not in text
+
+
+def test_metrics_endpoint_covers_other_workers(make_client, tmp_path):
+    metrics_dir = tmp_path / "metrics"
+    client = make_client(METRICS_DIR=str(metrics_dir))
+    other = Registry()
+    other.histogram(
+        "http_request_duration_seconds",
+        "Time to serve a request",
+        ["endpoint", "method", "status"],
+    ).observe(0.01, endpoint="movies.list_movies", method="GET", status="418")
+    write_snapshot(other, metrics_dir, pid=os.getppid())
+
+    text = client.get("/metrics").get_data(as_text=True)
+
+    assert 'endpoint="movies.list_movies",method="GET",status="418"' in text
+    assert (metrics_dir / f"{os.getpid()}.json").is_file()
+
+
+def test_metrics_need_the_api_key(client):
+    assert client.get("/metrics", headers={"X-API-Key": ""}).status_code == 401
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_token_replaces_the_api_key(make_client):
+    client = make_client(METRICS_TOKEN="scrape-me")
+    client.environ_base.pop("HTTP_X_API_KEY")
+
+    assert client.get("/metrics").status_code == 401
+    bearer = {"Authorization": "Bearer scrape-me"}
+    assert client.get("/metrics", headers=bearer).status_code == 200
@@ -80,3 +80,58 @@ def test_from_dict():
     assert m.genres == ["sci‑fi", "thriller"]
     assert m.rating == 8.8
     assert m.tags == ["dream", "mind‑bender"]
+
+
+def test_catalog_versions():
+    m1, m2, sc = seed_catalog()
+    assert sc.version == 2
+    assert sc.movie_version(1)[0] == 1
+    assert sc.movie_version(2)[0] == 2
+
+    sc.touch(1)
+    assert sc.version == 3
+    assert sc.movie_version(1)[0] == 3
+
+    sc.remove(2)
+    assert sc.version == 4
+
+    replacement = Catalog([Movie(5, "New", 2001)])
+    replacement.continue_from(sc)
+    assert replacement.epoch == sc.epoch
+    assert replacement.version == 5
+    assert replacement.movie_version(5)[0] == 5
+
+
+def test_remove_many():
+    _, _, sc = seed_catalog()
+    sc.add_movie(Movie(3, "Third", 2003))
+    version = sc.version
+
+    assert sc.remove_many([3, 1, 42]) == [1, 3]
+    assert [m.id for m in sc] == [2]
+    assert sc.version == version + 2
+    assert [(c.movie_id, c.op) for c in sc.changes.since(version)] == [
+        (1, "delete"),
+        (3, "delete"),
+    ]
+    assert sc.remove_many([42]) == []
+    assert sc.version == version + 2
+
+
+def test_apply_batch_publishes_all_or_nothing():
+    catalog = Catalog([Movie(id=1, title="Heat", year=1995)])
+
+    def rename(staged):
+        staged.update_movie(1, title="Heat 2")
+        staged.add_movie(Movie(id=2, title="Alien", year=1979))
+        return ok
+
+    ok = False
+    assert catalog.apply_batch(2, rename) is False
+    assert [m.title for m in catalog] == ["Heat"]
+    assert catalog.version == 0
+
+    ok = True
+    assert catalog.apply_batch(2, rename) is True
+    assert [m.title for m in catalog] == ["Heat 2", "Alien"]
+    assert [c.movie_id for c in catalog.changes.since(0)] == [1, 2]
@@ -0,0 +1,95 @@
+import cProfile
+import pstats
+
+import pytest
+from catalog.models import Movie
+from catalog.profiling import ProfileStore
+
+
+def _profile() -> cProfile.Profile:
+    profile = cProfile.Profile()
+    profile.enable()
+    sorted(range(1000), key=str)
+    profile.disable()
+    return profile
+
+
+def test_store_keeps_newest_profiles(tmp_path):
+    store = ProfileStore(tmp_path, keep=2)
+    ids = [store.save(_profile(), profile_id=f"{n}-abcdef") for n in range(1, 4)]
+
+    assert [p["id"] for p in store.recent()] == ids[:0:-1]
+    assert store.pstats_path(ids[0]) is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2-abcdef.json",
+        "2-abcdef.pstats",
+        "3-abcdef.json",
+        "3-abcdef.pstats",
+    ]
+
+
+def test_store_top_functions(tmp_path):
+    store = ProfileStore(tmp_path)
+    profile_id = store.save(_profile(), path="/movies")
+
+    top = store.top(profile_id, limit=50, sort="calls")
+    calls = [row["calls"] for row in top]
+    assert calls == sorted(calls, reverse=True)
+    assert any(row["function"] == "<built-in method builtins.sorted>" for row in top)
+    assert store.top("../../etc/passwd") is None
+    with pytest.raises(ValueError):
+        store.top(profile_id, sort="name")
+
+
+@pytest.fixture
+def client(make_client, tmp_path):
+    return make_client(
+        [Movie(id=1, title="Heat", year=1995, genres=["crime"])],
+        PROFILE_DIR=str(tmp_path / "profiles"),
+    )
+
+
+def test_admin_can_profile_a_request(client):
+    resp = client.get("/movies/1", headers={"X-Profile": "1"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+
+    listed = client.get("/admin/profiles").get_json()["profiles"]
+    assert [p["id"] for p in listed] == [profile_id]
+    assert listed[0]["endpoint"] == "movies.get_movie"
+    assert listed[0]["reason"] == "header"
+    assert listed[0]["status"] == 200
+
+    top = client.get(f"/admin/profiles/{profile_id}?limit=5").get_json()
+    assert len(top["functions"]) == 5
+    everything = client.get(f"/admin/profiles/{profile_id}?limit=1000").get_json()
+    assert "get_movie" in {row["function"] for row in everything["functions"]}
+
+    raw = client.get(f"/admin/profiles/{profile_id}/pstats")
+    assert raw.status_code == 200
+    path = client.app.profiles.pstats_path(profile_id)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profile_header_needs_admin(client):
+    resp = client.get(
+        "/movies/1", headers={"X-Profile": "1", "Authorization": "Bearer nope"}
+    )
+    assert resp.status_code in (401, 422)
+    assert "X-Profile-Id" not in resp.headers
+    assert client.app.profiles.recent() == []
+
+
+def test_sampling_profiles_one_in_n(client, monkeypatch):
+    monkeypatch.setitem(client.app.config, "PROFILE_SAMPLE_EVERY", 2)
+    for _ in range(6):
+        assert client.get("/movies/1").status_code == 200
+
+    profiles = client.app.profiles.recent()
+    assert len(profiles) == 3
+    assert {p["reason"] for p in profiles} == {"sampled"}
+
+
+def test_unknown_profile_is_404(client):
+    assert client.get("/admin/profiles/1-abcdef").status_code == 404
+    assert client.get("/admin/profiles/nope/pstats").status_code == 404
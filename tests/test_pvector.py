@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+from catalog.models import Catalog, Movie
+from catalog.pvector import CHUNK, PVector
+
+
+def test_updates_return_new_vectors():
+    items = list(range(3 * CHUNK + 5))
+    v = PVector(items)
+
+    assert v.set(CHUNK + 1, "x")[CHUNK + 1] == "x"
+    assert v.append("y")[-1] == "y"
+    assert v.insert(0, "z")[:2] == ["z", 0]
+    assert v.delete(CHUNK) == items[:CHUNK] + items[CHUNK + 1 :]
+    # the original is untouched by any of them
+    assert v == items
+
+
+def test_insert_and_delete_keep_indexes_consistent():
+    v = PVector[int]()
+    expected: list = []
+    for i in range(4 * CHUNK):
+        v = v.insert(i // 2, i)
+        expected.insert(i // 2, i)
+    for i in range(0, 2 * CHUNK, 3):
+        v = v.delete(i)
+        del expected[i]
+
+    assert v == expected
+    assert [v[i] for i in range(len(v))] == expected
+    with pytest.raises(IndexError):
+        v[len(v)]
+
+
+def test_readers_keep_their_snapshot():
+    catalog = Catalog([Movie(id=1, title="Heat", year=1995)])
+    snapshot = catalog.movies
+    catalog.update_movie(1, rating=8.3)
+    catalog.add_movie(Movie(id=2, title="Alien", year=1979))
+
+    assert [m.rating for m in snapshot] == [0.0]
+    assert [m.rating for m in catalog] == [8.3, 0.0]
+
+
+def test_concurrent_readers_and_writers():
+    catalog = Catalog([Movie(id=i, title=f"M{i}", year=2000) for i in range(500)])
+    stop = threading.Event()
+    errors: list = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                ids = [m.id for m in catalog]
+                assert len(ids) == len(set(ids))
+            except Exception as exc:  # pragma: no cover
+                errors.append(exc)
+                return
+
+    def write(offset):
+        for i in range(200):
+            movie_id = 1000 + offset * 1000 + i
+            catalog.add_movie(Movie(id=movie_id, title="New", year=2001))
+            catalog.update_movie(i, rating=float(offset))
+            catalog.remove(movie_id)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(2)]
+    for t in readers + writers:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    for t in readers:
+        t.join()
+
+    assert not errors
+    assert len(catalog) == 500
+    assert catalog.version == 2 * 200 * 3
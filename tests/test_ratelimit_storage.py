@@ -0,0 +1,82 @@
+import multiprocessing
+import time
+
+import pytest
+from catalog.api.api import create_app
+from catalog.api.extensions import limiter
+from catalog.ratelimit_storage import SQLiteStorage
+from limits import parse
+from limits.strategies import (
+    FixedWindowRateLimiter,
+    MovingWindowRateLimiter,
+    SlidingWindowCounterRateLimiter,
+)
+
+
+@pytest.fixture
+def uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'limits.db'}"
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [FixedWindowRateLimiter, MovingWindowRateLimiter, SlidingWindowCounterRateLimiter],
+)
+def test_strategies(uri, strategy):
+    limit = parse("3/minute")
+    rate_limiter = strategy(SQLiteStorage(uri))
+    assert [rate_limiter.hit(limit, "client") for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert rate_limiter.hit(limit, "other")
+    assert rate_limiter.get_window_stats(limit, "client").remaining == 0
+
+
+def _hit(uri, results):
+    rate_limiter = MovingWindowRateLimiter(SQLiteStorage(uri))
+    limit = parse("10/minute")
+    results.put(sum(rate_limiter.hit(limit, "client") for _ in range(10)))
+
+
+def test_workers_share_counters(uri):
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_hit, args=(uri, results)) for _ in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(10)
+
+    assert sum(results.get(timeout=5) for _ in workers) == 10
+
+
+def test_expired_keys_are_cleaned_up(uri):
+    storage = SQLiteStorage(uri, cleanup_interval=0)
+    storage.incr("old", expiry=0.01)
+    storage.acquire_entry("old-events", limit=5, expiry=0.01)
+    time.sleep(0.02)
+    assert storage.get("old") == 0
+
+    storage.incr("new", expiry=60)
+    conn = storage._connect()
+    assert conn.execute("SELECT key FROM counters").fetchall() == [("new",)]
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone() == (0,)
+
+
+def test_app_uses_configured_storage(tmp_path, uri, monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", True)
+    app = create_app(
+        {
+            "CATALOG_PATH": str(tmp_path / "movies.json"),
+            "RATELIMIT_STORAGE_URI": uri,
+            "START_BACKGROUND_TASKS": False,
+        }
+    )
+    client = app.test_client()
+    assert isinstance(limiter.storage, SQLiteStorage)
+
+    statuses = [client.get("/movies").status_code for _ in range(4)]
+    assert 429 not in statuses[:3] and statuses[3] == 429
@@ -0,0 +1,175 @@
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from werkzeug.serving import make_server
+
+from catalog.api.api import create_app
+from catalog.models import Catalog, Movie
+
+VALID_CREDS = {"username": "admin", "password": "password123"}
+
+
+def _login(client, api_key):
+    token = client.post("/auth/login", json=VALID_CREDS).get_json()["access_token"]
+    client.environ_base = {
+        **client.environ_base,
+        "HTTP_X_API_KEY": api_key,
+        "HTTP_AUTHORIZATION": f"Bearer {token}",
+    }
+    return client
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    seed = Catalog()
+    seed.add_movie(Movie(id=1, title="Titanic", year=1992))
+    seed.add_movie(Movie(id=2, title="Heat", year=1995))
+
+    cfg = {
+        "API_KEY": "supersecret123",
+        "JWT_SECRET_KEY": "super-jwt-secret",
+        "JWT_ACCESS_TOKEN_EXPIRES": False,
+    }
+    monkeypatch.setattr("catalog.api.api.load_catalog", lambda path: seed)
+    monkeypatch.setattr("catalog.api.extensions.limiter.enabled", False)
+    monkeypatch.setattr(
+        "catalog.api.movies.save_catalog", lambda catalog, path: Path(path)
+    )
+
+    primary = create_app({**cfg, "CATALOG_PATH": str(tmp_path / "primary.json")})
+    server = make_server("127.0.0.1", 0, primary, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    primary_url = f"http://127.0.0.1:{server.server_port}"
+
+    follower = create_app(
+        {
+            **cfg,
+            "CATALOG_PATH": str(tmp_path / "follower.json"),
+            "REPLICA_OF": primary_url,
+            "REPLICA_POLL_INTERVAL": 0.02,
+        }
+    )
+    primary.testing = follower.testing = True
+    yield (
+        _login(primary.test_client(), cfg["API_KEY"]),
+        _login(follower.test_client(), cfg["API_KEY"]),
+        follower,
+        primary_url,
+    )
+
+    follower.follower.stop(timeout=2)
+    server.shutdown()
+
+
+def test_follower_bootstraps_and_applies_changes(cluster):
+    primary, replica, app, _ = cluster
+    assert app.follower.ready.wait(5)
+    assert {m["id"] for m in replica.get("/movies").get_json()["movies"]} == {1, 2}
+
+    primary.post("/movies", json={"id": 3, "title": "Alien", "year": 1979})
+    primary.put("/movies/1", json={"rating": 7.5})
+    primary.delete("/movies/2")
+    version = primary.get("/movies/replication").get_json()["replication"]["version"]
+
+    assert _wait_for(lambda: app.follower.applied_version == version)
+    movies = {m["id"]: m for m in replica.get("/movies").get_json()["movies"]}
+    assert set(movies) == {1, 3}
+    assert movies[1]["rating"] == 7.5
+    # same epoch and versions, so validators are interchangeable
+    assert (
+        replica.get("/movies").headers["ETag"] == primary.get("/movies").headers["ETag"]
+    )
+
+    status = replica.get("/movies/replication").get_json()["replication"]
+    assert status["role"] == "follower"
+    assert status["connected"] is True
+    assert status["lag_seconds"] < 5
+
+
+def test_follower_redirects_writes(cluster):
+    _, replica, app, primary_url = cluster
+    assert app.follower.ready.wait(5)
+
+    resp = replica.post("/movies", json={"id": 4, "title": "Up", "year": 2009})
+    assert resp.status_code == 307
+    assert resp.headers["Location"] == f"{primary_url}/movies"
+    assert resp.headers["X-Catalog-Primary"] == primary_url
+
+
+def test_follower_resyncs_after_import(cluster):
+    primary, replica, app, _ = cluster
+    assert app.follower.ready.wait(5)
+    epoch = app.follower.epoch
+
+    primary.post(
+        "/movies/import/json",
+        json={"movies": [{"id": 7, "title": "Ran", "year": 1985}]},
+    )
+
+    assert _wait_for(lambda: [m.id for m in app.catalog] == [7])
+    assert app.follower.epoch == epoch
+
+
+def test_follower_resumes_after_primary_outage(cluster, monkeypatch):
+    primary, replica, app, _ = cluster
+    assert app.follower.ready.wait(5)
+
+    real_get = app.follower._get
+    monkeypatch.setattr(app.follower, "max_backoff", 0.05)
+    from catalog.replication import PrimaryUnavailable
+
+    def down(path, **params):
+        raise PrimaryUnavailable("connection refused")
+
+    monkeypatch.setattr(app.follower, "_get", down)
+    assert _wait_for(lambda: not app.follower.connected)
+    primary.put("/movies/1", json={"rating": 9.0})
+
+    monkeypatch.setattr(app.follower, "_get", real_get)
+    assert _wait_for(lambda: app.catalog.find_by_id(1).rating == 9.0)
+    assert app.follower.connected
+
+
+def test_follower_token_is_short_lived_and_read_only(cluster):
+    primary, _, app, _ = cluster
+    assert app.follower.ready.wait(5)
+    token = app.follower._token
+    with app.app_context():
+        claims = decode_token(token)
+
+    assert claims["roles"] == ["replica"]
+    assert claims["exp"] - claims["iat"] == app.config["REPLICA_TOKEN_TTL"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert primary.get("/movies/changes?since=0", headers=headers).status_code == 200
+    assert primary.get("/movies", headers=headers).status_code == 403
+    assert primary.delete("/movies/1", headers=headers).status_code == 403
+
+
+def test_follower_refreshes_an_expired_token(cluster):
+    primary, _, app, _ = cluster
+    assert app.follower.ready.wait(5)
+    with app.app_context():
+        expired = create_access_token(
+            identity="replica",
+            additional_claims={"roles": ["replica"]},
+            expires_delta=timedelta(seconds=-1),
+        )
+    app.follower._token = expired
+
+    primary.put("/movies/1", json={"rating": 9.0})
+    assert _wait_for(lambda: app.catalog.find_by_id(1).rating == 9.0)
+    assert app.follower._token != expired
@@ -0,0 +1,118 @@
+import asyncio
+
+import aiohttp
+import pytest
+from catalog.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_retry,
+)
+
+FAST = RetryPolicy(attempts=3, base_delay=0, max_delay=0, request_timeout=0.2)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    for attempt in range(10):
+        assert 0 <= policy.backoff(attempt) <= 4
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_recovers_from_transient_errors():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise aiohttp.ClientConnectionError("reset")
+        return "ok"
+
+    assert await call_with_retry(flaky, FAST) == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_does_not_retry_client_errors():
+    calls = []
+
+    async def not_found():
+        calls.append(1)
+        raise aiohttp.ClientResponseError(None, None, status=404)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await call_with_retry(not_found, FAST)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_times_out_slow_requests():
+    async def slow():
+        await asyncio.sleep(5)
+
+    policy = RetryPolicy(attempts=1, request_timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await call_with_retry(slow, policy)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 11
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_trial_frees_the_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 11
+
+    async def hangs():
+        await asyncio.sleep(5)
+
+    trial = asyncio.create_task(call_with_retry(hangs, FAST, breaker))
+    await asyncio.sleep(0)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()  # a new trial goes through
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    calls = []
+
+    async def down():
+        calls.append(1)
+        raise aiohttp.ClientConnectionError("refused")
+
+    with pytest.raises(CircuitOpenError):
+        await call_with_retry(down, FAST, breaker)
+    assert len(calls) == 1
@@ -0,0 +1,97 @@
+import pytest
+from catalog.cache_backend import LRUCache
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(save_in="catalog.api.movies")
+
+
+def _stats(client):
+    return client.get("/movies/cache/stats").get_json()["cache"]
+
+
+def test_list_is_served_from_cache(client, monkeypatch):
+    first = client.get("/movies")
+    before = _stats(client)
+
+    def boom(catalog):
+        raise AssertionError("should have been served from cache")
+
+    monkeypatch.setattr("catalog.api.movies.load_movies_service", boom)
+    second = client.get("/movies")
+
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert _stats(client)["hits"] == before["hits"] + 1
+
+
+def test_cached_hit_honours_if_none_match(client):
+    etag = client.get("/movies").headers["ETag"]
+    resp = client.get("/movies", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_write_invalidates_cached_responses(client):
+    client.get("/movies")
+    client.get("/movies/1")
+
+    client.put("/movies/1", json={"title": "Titanic (1997)"})
+
+    assert client.get("/movies/1").get_json()["movie"]["title"] == "Titanic (1997)"
+    titles = [m["title"] for m in client.get("/movies").get_json()["movies"]]
+    assert "Titanic (1997)" in titles
+
+
+def test_query_string_is_part_of_the_key(client):
+    client.get("/movies?a=1")
+    misses = _stats(client)["misses"]
+    client.get("/movies?a=2")
+    assert _stats(client)["misses"] == misses + 1
+
+
+def test_errors_are_not_cached(client):
+    assert client.get("/movies/99").status_code == 404
+    client.post("/movies", json={"id": 99, "title": "Alien", "year": 1979})
+    assert client.get("/movies/99").status_code == 200
+
+
+def test_disabled_cache_bypasses_backend(client):
+    client.app.config["RESPONSE_CACHE_ENABLED"] = False
+    entries = _stats(client)["entries"]
+    client.get("/movies?fresh=1")
+    assert _stats(client)["entries"] == entries
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(threshold=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+
+def test_lru_respects_byte_cap():
+    lru = LRUCache(max_bytes=100)
+    lru.set("a", (b"x" * 60, []))
+    lru.set("b", (b"y" * 60, []))
+
+    assert not lru.has("a")
+    assert lru.has("b")
+    assert lru.bytes == 60
+    assert lru.set("huge", (b"z" * 200, [])) is False
+
+
+def test_lru_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("catalog.cache_backend.time.monotonic", lambda: now[0])
+    lru = LRUCache(default_timeout=10)
+    lru.set("a", 1)
+    now[0] += 11
+    assert lru.get("a") is None
+    assert len(lru) == 0
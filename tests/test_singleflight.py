@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+from catalog.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_and_entry_released():
+    flight = SingleFlight("test-failure")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do("k", failing), flight.do("k", failing), return_exceptions=True
+    )
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight == 0
+
+    with pytest.raises(ValueError):
+        await flight.do("k", failing)
+    assert len(calls) == 2
+
+
+def test_calls_are_shared_across_event_loops():
+    flight = SingleFlight("test-threads")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    async def slow():
+        calls.append(1)
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return "value"
+
+    def run():
+        results.append(asyncio.run(flight.do("k", slow)))
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=run)
+    follower.start()
+    while flight.stats()["coalesced"] < 1:
+        pass
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == ["value", "value"]
+    assert len(calls) == 1
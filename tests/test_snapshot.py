@@ -0,0 +1,108 @@
+import gc
+import json
+
+import pytest
+from catalog.models import Catalog, Movie
+from catalog.services import bulk_service, save_catalog, update_movie_service
+from catalog.snapshot import (
+    PackedMovies,
+    load_packed_catalog,
+    open_snapshot_catalog,
+    snapshot_path_for,
+    write_snapshot,
+)
+
+
+@pytest.fixture
+def packed(tmp_path):
+    source = Catalog()
+    source.add_movie(Movie(id=3, title="Heat", year=1995))
+    source.add_movie(Movie(id=1, title="Titanic", year=1997, genres=["drama"]))
+    source.add_movie(Movie(id=2, title="Alien", year=1979))
+    path = write_snapshot(source, tmp_path / "movies.snapshot")
+    return source, open_snapshot_catalog(path)
+
+
+def test_snapshot_round_trip(packed):
+    source, catalog = packed
+    assert isinstance(catalog.movies, PackedMovies)
+    assert [m.id for m in catalog] == [3, 1, 2]
+    assert catalog.find_by_id(1).genres == ["drama"]
+    assert catalog.find_by_id(99) is None
+    assert (catalog.epoch, catalog.version) == (source.epoch, source.version)
+    assert catalog.movies.overlay_size == 0
+
+
+def test_edits_go_to_the_overlay(packed):
+    _, catalog = packed
+    update_movie_service(catalog, 2, {"rating": 8.4})
+    gc.collect()
+
+    assert catalog.find_by_id(2).rating == 8.4
+    assert catalog.movies.overlay_size == 1
+    # movies only read are not kept once nothing references them
+    catalog.find_by_id(3)
+    gc.collect()
+    assert 3 not in catalog.movies._live
+
+
+def test_structural_changes(packed):
+    _, catalog = packed
+    catalog.add_movie(Movie(id=4, title="Up", year=2009))
+    assert catalog.remove(1)
+    results, _ = bulk_service(catalog, [{"op": "delete", "id": 3}], atomic=False)
+    assert results[0]["status"] == 204
+
+    assert [m.id for m in catalog] == [2, 4]
+    assert catalog.find_by_id(1) is None
+    assert catalog.index_of(4) == 1
+
+
+def test_remove_many_keeps_the_snapshot(packed):
+    _, catalog = packed
+    update_movie_service(catalog, 1, {"rating": 7.0})
+
+    assert catalog.remove_many([1, 3]) == [3, 1]
+    assert isinstance(catalog.movies, PackedMovies)
+    assert [m.id for m in catalog] == [2]
+    assert catalog.find_by_id(1) is None
+    assert catalog.movies.overlay_size == 0
+
+
+def test_save_republishes_snapshot(tmp_path):
+    json_path = tmp_path / "movies.json"
+    json_path.write_text(json.dumps([{"id": 1, "title": "Heat", "year": 1995}]))
+
+    catalog = load_packed_catalog(json_path)
+    assert snapshot_path_for(json_path).is_file()
+    catalog.add_movie(Movie(id=2, title="Alien", year=1979))
+    save_catalog(catalog, str(json_path))
+
+    reopened = load_packed_catalog(json_path)
+    assert [m.id for m in reopened] == [1, 2]
+    assert reopened.version == catalog.version
+    assert len(json.loads(json_path.read_text())) == 2
+
+
+def test_save_serves_the_writer_from_the_new_snapshot(tmp_path):
+    json_path = tmp_path / "movies.json"
+    json_path.write_text(json.dumps([{"id": 1, "title": "Heat", "year": 1995}]))
+    catalog = load_packed_catalog(json_path)
+    catalog.add_movie(Movie(id=2, title="Alien", year=1979))
+    assert catalog.movies.overlay_size == 1
+
+    save_catalog(catalog, str(json_path))
+
+    assert catalog.movies.overlay_size == 0
+    assert [m.title for m in catalog] == ["Heat", "Alien"]
+    assert catalog.find_by_id(2).year == 1979
+
+
+def test_positions_follow_structural_changes(packed):
+    _, catalog = packed
+    catalog.add_movie(Movie(id=4, title="Up", year=2009))
+    assert catalog.index_of(4) == 3
+    catalog.update_movie(4, rating=8.0)
+    assert catalog.index_of(4) == 3
+    catalog.remove(3)
+    assert [catalog.index_of(i) for i in (1, 2, 4, 3)] == [0, 1, 2, None]
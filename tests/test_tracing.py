@@ -0,0 +1,168 @@
+import asyncio
+import io
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from catalog.tracing import NOOP, OTLPHttpExporter, Tracer, current_span, tracer
+
+
+class Collect:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+
+def test_spans_nest_and_export_once_per_trace():
+    exported = Collect()
+    t = Tracer(sample_rate=1.0, exporter=exported)
+
+    with t.span("import", filename="a.csv") as root:
+        with t.span("parse") as child:
+            child.set(rows=3)
+            assert current_span() is child
+        with t.span("save"):
+            pass
+
+    [trace] = exported.traces
+    by_name = {s.name: s for s in trace}
+    assert [s.name for s in trace] == ["parse", "save", "import"]
+    assert {s.trace_id for s in trace} == {root.trace_id}
+    assert by_name["parse"].parent_id == root.span_id
+    assert by_name["parse"].attributes == {"rows": 3}
+    assert by_name["import"].parent_id is None
+    assert by_name["import"].duration >= by_name["parse"].duration
+
+
+def test_unsampled_root_keeps_children_unsampled():
+    exported = Collect()
+    draws = iter([0.9, 0.0])
+    t = Tracer(sample_rate=0.5, exporter=exported, rand=lambda: next(draws))
+
+    with t.span("request") as root:
+        with t.span("child") as child:
+            assert root is NOOP and child is NOOP
+
+    assert exported.traces == []
+    with t.span("sampled"):
+        pass
+    assert len(exported.traces) == 1
+
+
+def test_errors_are_recorded_and_reraised():
+    exported = Collect()
+    t = Tracer(sample_rate=1.0, exporter=exported)
+
+    with pytest.raises(ValueError):
+        with t.span("save"):
+            raise ValueError("disk full")
+
+    [[span]] = exported.traces
+    assert span.error == "ValueError: disk full"
+
+
+def test_async_spans_follow_tasks():
+    exported = Collect()
+    t = Tracer(sample_rate=1.0, exporter=exported)
+
+    async def fetch(key):
+        with t.span("omdb.get", key=key):
+            await asyncio.sleep(0)
+
+    async def run():
+        with t.span("enrich") as root:
+            await asyncio.gather(fetch("a"), fetch("b"))
+        return root
+
+    root = asyncio.run(run())
+
+    [trace] = exported.traces
+    fetches = [s for s in trace if s.name == "omdb.get"]
+    assert len(fetches) == 2
+    assert all(s.parent_id == root.span_id for s in fetches)
+
+
+def test_otlp_exporter_posts_json_to_collector():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        endpoint = f"http://127.0.0.1:{server.server_port}/v1/traces"
+        exporter = OTLPHttpExporter(endpoint)
+        t = Tracer(sample_rate=1.0, exporter=exporter)
+        with t.span("import", rows=2):
+            with t.span("parse"):
+                pass
+        exporter.flush()
+    finally:
+        server.shutdown()
+
+    [(path, body)] = received
+    assert path == "/v1/traces"
+    [resource] = body["resourceSpans"]
+    spans = resource["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["parse", "import"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert spans[1]["attributes"] == [{"key": "rows", "value": {"intValue": "2"}}]
+
+
+def test_otlp_export_thread_runs_in_forked_workers(monkeypatch):
+    exporter = OTLPHttpExporter("http://127.0.0.1:9/v1/traces")
+    monkeypatch.setattr(tracer, "exporter", exporter)
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if exporter._thread.is_alive() else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+@pytest.fixture
+def client(make_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    monkeypatch.setattr(tracer, "exporter", None)
+    return make_client(TRACE_SAMPLE_RATE=1.0, TRACE_FILE=str(tmp_path / "traces.jsonl"))
+
+
+def test_csv_import_is_traced_end_to_end(client, tmp_path):
+    upload = b"id,title,year,genres,rating,tags\n5,Matrix,1999,action,8.7,neo\n"
+    resp = client.post(
+        "/movies/import/csv",
+        data={"file": (io.BytesIO(upload), "movies.csv")},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 201
+
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    [root] = [s for s in map(json.loads, lines) if s["name"].startswith("POST io.")]
+    spans = {
+        s["name"]: s
+        for s in map(json.loads, lines)
+        if s["trace_id"] == root["trace_id"]
+    }
+    assert root["name"] == "POST io.import_csv_movies"
+    assert root["parent_id"] is None
+    assert root["attributes"]["status"] == 201
+    assert spans["save_upload"]["attributes"]["bytes"] == len(upload)
+    assert spans["parse_csv"]["attributes"]["rows"] == 1
+    assert spans["parse_csv"]["parent_id"] == (
+        spans["import_catalog_from_csv"]["span_id"]
+    )
+    assert spans["save_catalog"]["attributes"]["movies"] == 1
+    assert spans["import_csv_service"]["parent_id"] == root["span_id"]
@@ -0,0 +1,178 @@
+import json
+from pathlib import Path
+
+import pytest
+from catalog.api.api import create_app
+from catalog.models import Catalog, Movie
+from catalog.services import load_catalog, save_catalog
+from catalog.versions import load_versions
+from catalog.watcher import CatalogWatcher
+
+
+def _write(path: Path, movies: list[dict]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(movies), encoding="utf-8")
+    tmp.replace(path)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def watched(tmp_path):
+    path = tmp_path / "movies.json"
+    _write(path, [{"id": 1, "title": "Heat", "year": 1995}])
+    state = {"catalog": load_catalog(str(path)), "loads": 0}
+
+    def load(previous):
+        state["loads"] += 1
+        fresh = load_catalog(str(path))
+        fresh.continue_from(previous)
+        return fresh
+
+    clock = FakeClock()
+    watcher = CatalogWatcher(
+        path,
+        load=load,
+        install=lambda c: state.update(catalog=c),
+        current=lambda: state["catalog"],
+        debounce=0.5,
+        clock=clock,
+    )
+    return path, state, watcher, clock
+
+
+def test_reload_after_debounce(watched):
+    path, state, watcher, clock = watched
+    old = state["catalog"]
+    _write(path, [{"id": 2, "title": "Alien", "year": 1979}])
+
+    assert not watcher.poll_once()
+    clock.now += 0.2
+    assert not watcher.poll_once()
+    clock.now += 0.4
+    assert watcher.poll_once()
+
+    assert [m.id for m in state["catalog"]] == [2]
+    assert state["catalog"].version > old.version
+    assert state["catalog"].epoch == old.epoch
+    assert not watcher.poll_once()
+
+
+def test_rapid_rewrites_reload_once(watched):
+    path, state, watcher, clock = watched
+    for i in range(5):
+        _write(path, [{"id": 10 + i, "title": f"M{i}", "year": 2000}] * (i + 1))
+        watcher.poll_once()
+        clock.now += 0.1
+
+    clock.now += 0.5
+    watcher.poll_once()
+    assert state["loads"] == 1
+    assert len(state["catalog"]) == 5
+
+
+def test_own_writes_are_not_reloaded(watched):
+    path, state, watcher, clock = watched
+    state["catalog"].add_movie(Movie(id=5, title="Up", year=2009))
+    save_catalog(state["catalog"], str(path))
+
+    watcher.poll_once()
+    clock.now += 1
+    assert not watcher.poll_once()
+    assert state["loads"] == 0
+
+
+def test_broken_file_keeps_current_catalog(watched):
+    path, state, watcher, clock = watched
+    old = state["catalog"]
+    path.write_text("[{not json", encoding="utf-8")
+
+    watcher.poll_once()
+    clock.now += 1
+    assert not watcher.poll_once()
+    assert state["catalog"] is old
+
+
+def test_external_rewrite_is_versioned_after_the_saved_state(tmp_path):
+    path = tmp_path / "movies.json"
+    saved = Catalog([Movie(id=1, title="Heat", year=1995)])
+    saved.touch(1)
+    save_catalog(saved, str(path))
+    _write(path, [{"id": 7, "title": "Ran", "year": 1985}])
+
+    fresh = load_catalog(str(path))
+    load_versions(fresh, path)
+    assert (fresh.epoch, fresh.version) == (saved.epoch, saved.version + 1)
+
+    again = load_catalog(str(path))
+    load_versions(again, path)
+    assert (again.epoch, again.version) == (fresh.epoch, fresh.version)
+
+
+def test_app_picks_up_external_rewrite(tmp_path, monkeypatch):
+    path = tmp_path / "movies.json"
+    _write(path, [{"id": 1, "title": "Heat", "year": 1995}])
+    monkeypatch.setattr("catalog.api.extensions.limiter.enabled", False)
+    app = create_app(
+        {
+            "CATALOG_PATH": str(path),
+            "CATALOG_WATCH": True,
+            "START_BACKGROUND_TASKS": False,
+        }
+    )
+    assert isinstance(app.catalog, Catalog)
+
+    _write(path, [{"id": 7, "title": "Ran", "year": 1985}])
+    app.watcher.debounce = 0
+    app.watcher.poll_once()
+    app.watcher.poll_once()
+    assert [m.id for m in app.catalog] == [7]
+
+
+def test_two_apps_on_one_file_keep_each_others_writes(tmp_path, make_client):
+    path = tmp_path / "movies.json"
+    _write(path, [{"id": 1, "title": "Heat", "year": 1995}])
+    first = make_client(on_disk=True)
+    second = make_client(on_disk=True)
+    stale = first.get("/movies/1").headers["ETag"]
+
+    resp = first.post("/movies", json={"id": 2, "title": "Alien", "year": 1979})
+    assert resp.status_code == 201
+    # the second app has not polled, it catches up before writing
+    resp = second.post("/movies", json={"id": 3, "title": "Ran", "year": 1985})
+    assert resp.status_code == 201
+    resp = second.put("/movies/1", json={"year": 1996})
+    assert resp.status_code == 200
+
+    resp = first.put("/movies/1", json={"year": 2000}, headers={"If-Match": stale})
+    assert resp.status_code == 412
+    saved = {m.title: m for m in load_catalog(str(path))}
+    assert sorted(saved) == ["Alien", "Heat", "Ran"]
+    assert saved["Heat"].year == 1996
+
+
+def test_two_apps_on_one_file_hand_out_the_same_versions(tmp_path, make_client):
+    path = tmp_path / "movies.json"
+    _write(path, [{"id": 1, "title": "Heat", "year": 1995}])
+    first = make_client(on_disk=True)
+    second = make_client(on_disk=True)
+    assert first.get("/movies").headers["ETag"] == second.get("/movies").headers["ETag"]
+    start = second.app.catalog.version
+
+    first.post("/movies", json={"id": 2, "title": "Alien", "year": 1979})
+    assert second.app.watcher.sync()
+
+    for url in ("/movies", "/movies/1", "/movies/2"):
+        assert first.get(url).headers["ETag"] == second.get(url).headers["ETag"]
+    resp = second.get(f"/movies/changes?since={start}")
+    assert [(c["id"], c["op"]) for c in resp.get_json()["changes"]] == [(2, "insert")]
+
+    # the next write, whichever app takes it, gets a version of its own
+    second.put("/movies/1", json={"year": 1996})
+    assert second.app.catalog.version == first.app.catalog.version + 1